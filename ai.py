@@ -0,0 +1,377 @@
+"""
+Computer paddle strategies.
+
+A strategy plays one paddle in two parts. decide() looks at the match and
+picks where the paddle should go, how fast and how close is close enough;
+all the thinking and all the randomness live here, and it only runs when
+the strategy re-plans: every decision_interval ticks, and whenever the
+ball's path changes if replan_on_trajectory is set. act() runs every tick
+and just moves the paddle toward that target. A slow decision rate models
+human reaction time, so difficulty is mostly a matter of reaction rate.
+
+STRATEGIES maps names to strategy classes. Any of them can play either
+paddle (see MatchSimulation's left_ai and right_ai); register_strategy()
+adds new ones, e.g. for a tournament.
+
+Each class keeps its tunables (idle and wrong-way odds, speed factors,
+dead zones in 1080p pixels) in a params dict. load_params() overrides
+them from PARAMS_FILE, which calibrate.py writes, and runs on import so
+the game and the headless tools play with the same values wherever they
+are started from. Replays and tournament results record the values they
+were played with (active_params(), params_digest()), so a later
+calibration does not change how they play back.
+"""
+
+import hashlib
+import json
+import math
+import os
+
+from effects import ReverseControls, ShrinkingPaddles
+from intercept_table import get_table
+from prediction import InterceptPredictor
+from units import PIXEL
+
+# next_decision of strategies that only re-plan when the ball's path changes
+NEVER = float(1 << 62)
+
+# Calibrated tunables, see calibrate.py
+PARAMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_params.json")
+
+
+class Strategy:
+    """
+    Base strategy: holds the paddle still. Subclasses override decide()
+    and set decision_interval and replan_on_trajectory.
+    """
+
+    decision_interval = 0  # Ticks between decisions, 0 for none after the first
+    replan_on_trajectory = False  # Also decide whenever the ball's path changes
+    params = {}  # Tunables by name; each subclass has its own dict
+
+    # Entries save() writes
+    STATE_SIZE = 8
+
+    def __init__(self, side):
+        if side not in ("left", "right"):
+            raise ValueError(f"Unknown paddle side: {side}")
+        self.side = side
+        self.predictor = InterceptPredictor()
+        self.reset()
+
+    def reset(self):
+        """Forget the current plan; the next tick decides afresh."""
+        self.target_y = None  # Paddle centre to move to, None to hold still
+        self.speed = 0.0
+        self.dead_zone = 0.0  # Close enough to the target to stop
+        self.next_decision = 0
+        self.seen_version = -1
+        self.predictor.invalidate()
+
+    def paddle(self, sim):
+        return sim.left_paddle if self.side == "left" else sim.right_paddle
+
+    def toward(self, sim):
+        """True while the ball moves at this strategy's paddle."""
+        return sim.ball_dx < 0 if self.side == "left" else sim.ball_dx > 0
+
+    def predict(self, sim):
+        """Where the ball will meet this paddle, wall bounces included."""
+        return self.predictor.predict(sim, self._face_x(sim))
+
+    def predict_straight(self, sim):
+        """Where the ball would meet this paddle ignoring the walls."""
+        return self.predictor.predict_straight(sim, self._face_x(sim))
+
+    def _face_x(self, sim):
+        return sim.left_paddle.right if self.side == "left" else sim.right_paddle.x
+
+    def distance(self, sim):
+        """How far the ball is from this paddle's face."""
+        return abs(self._face_x(sim) - sim.ball.x)
+
+    def aim(self, target_y, speed, dead_zone=0.0):
+        self.target_y = target_y
+        self.speed = speed
+        self.dead_zone = dead_zone
+
+    def aim_away(self, sim, paddle, speed):
+        """Move away from the ball, like a player misreading it."""
+        self.aim(2 * paddle.centery - sim.ball.centery, speed)
+
+    def aim_center(self, sim, paddle, speed):
+        """Drift back towards the middle of the table."""
+        self.aim(sim.height / 2, speed, paddle.height * 0.2)
+
+    def decide(self, sim, paddle):
+        """Pick a new target; see aim(). The default holds still."""
+        self.target_y = None
+
+    def ticks_to_decision(self, sim):
+        """
+        How many ticks from now the next decision is made, 1 being the
+        next tick, assuming the ball's path does not change meanwhile.
+        Fast-forward glides over the ticks before it with act().
+        """
+        if self.replan_on_trajectory and self.seen_version != sim.trajectory_version:
+            return 1
+        return max(self.next_decision - sim.tick, 1)
+
+    def update(self, sim):
+        """Decide if it is time to, then move one tick. Called every tick."""
+        if sim.tick >= self.next_decision or (self.replan_on_trajectory and
+                                              self.seen_version != sim.trajectory_version):
+            self.seen_version = sim.trajectory_version
+            interval = self.decision_interval
+            self.next_decision = sim.tick + interval if interval else NEVER
+            self.decide(sim, self.paddle(sim))
+
+        # act() for a single tick, kept inline as it runs every tick
+        target = self.target_y
+        if target is None:
+            return
+        paddle = sim.left_paddle if self.side == "left" else sim.right_paddle
+        center = paddle.y + paddle.height / 2
+        if target > center + self.dead_zone and paddle.y + paddle.height < sim.height:
+            paddle.y += self.speed
+        elif target < center - self.dead_zone and paddle.y > 0:
+            paddle.y -= self.speed
+
+    def act(self, sim, ticks):
+        """Move the paddle as ticks updates without a decision would, in one go."""
+        target = self.target_y
+        if target is None:
+            return
+        paddle = self.paddle(sim)
+        speed = self.speed
+        if target > paddle.centery + self.dead_zone and paddle.bottom < sim.height:
+            steps = min(ticks, math.ceil((target - self.dead_zone - paddle.centery) / speed),
+                        math.ceil((sim.height - paddle.bottom) / speed))
+            paddle.y += speed * steps
+        elif target < paddle.centery - self.dead_zone and paddle.top > 0:
+            steps = min(ticks, math.ceil((paddle.centery - self.dead_zone - target) / speed),
+                        math.ceil(paddle.top / speed))
+            paddle.y -= speed * steps
+
+    def save(self, buffer):
+        """Copy the plan into buffer, a float array of STATE_SIZE entries."""
+        predictor = self.predictor
+        buffer[:] = (math.nan if self.target_y is None else self.target_y, self.speed, self.dead_zone,
+                     self.next_decision, self.seen_version,
+                     predictor.version, predictor.raw_y, predictor.folded_y)
+
+    def load(self, buffer):
+        """Restore the plan saved by save()."""
+        target, self.speed, self.dead_zone, next_decision = (float(v) for v in buffer[:4])
+        self.target_y = None if math.isnan(target) else target
+        self.next_decision = next_decision if next_decision == NEVER else int(next_decision)
+        self.seen_version = int(buffer[4])
+        predictor = self.predictor
+        predictor.version = int(buffer[5])
+        predictor.raw_y = float(buffer[6])
+        predictor.folded_y = float(buffer[7])
+
+
+class NewBornAI(Strategy):
+    """
+    Very basic AI - reacts slowly, often not at all or the wrong way
+    """
+
+    decision_interval = 7  # About 8.5 decisions a second
+    params = {"idle": 0.4, "wrong_way": 0.3, "speed": 0.6, "wrong_way_speed": 0.5}
+
+    def decide(self, sim, paddle):
+        speed = sim.paddle_speed
+        params = self.params
+        # Sometimes do not move at all (simulate inattention)
+        if sim.rng_ai.random() < params["idle"]:
+            self.target_y = None
+        # Sometimes move in the wrong direction
+        elif sim.rng_ai.random() < params["wrong_way"]:
+            self.aim_away(sim, paddle, speed * params["wrong_way_speed"])  # Move slower than player
+        else:
+            # Otherwise move correctly but slowly
+            self.aim(sim.ball.centery, speed * params["speed"])
+
+
+class NormieAI(Strategy):
+    """
+    Standard AI - follows the ball competently but not perfectly
+    """
+
+    decision_interval = 4  # 15 decisions a second
+    params = {"speed": 0.85, "dead_zone": 10}
+
+    def decide(self, sim, paddle):
+        params = self.params
+        # Small dead zone acts as a reaction delay
+        self.aim(sim.ball.centery, sim.paddle_speed * params["speed"], params["dead_zone"] * PIXEL)
+
+
+class KnightOfHellAI(Strategy):
+    """
+    Expert AI - predicts ball trajectory, reacts instantly, and positions optimally
+    """
+
+    decision_interval = 0
+    replan_on_trajectory = True
+    params = {"speed": 1.2, "trick_shots": 0.3, "dead_zone": 5, "return_speed": 0.7}
+
+    def __init__(self, side):
+        super().__init__(side)
+        # Built or loaded now, when the match starts, not at the first trick shot
+        self.table = get_table()
+
+    def decide(self, sim, paddle):
+        speed = sim.paddle_speed
+        params = self.params
+        if self.toward(sim):
+            # Wall bounces are folded in, computed once per path
+            predicted_y = self.predict(sim)
+
+            # Add some "trick shots" - sometimes hit with the edge of the paddle
+            # that sends the ball furthest from the middle of the table
+            if sim.rng_ai.random() < params["trick_shots"]:
+                predicted_y += self.table.offset(sim.ball.y, sim.ball_dy, sim.ball_dx, self.distance(sim))
+
+            # Move faster than player and with perfect accuracy
+            self.aim(predicted_y, speed * params["speed"], params["dead_zone"] * PIXEL)
+        else:
+            # When ball moving away, return to center
+            self.aim_center(sim, paddle, speed * params["return_speed"])
+
+
+class DeceptionAI(Strategy):
+    """
+    Unpredictable AI for deception mode - much smarter and more adaptive
+    """
+
+    decision_interval = 3  # 20 decisions a second, and on every new path
+    replan_on_trajectory = True
+
+    def decide(self, sim, paddle):
+        speed = sim.paddle_speed
+        effect = sim.deception_effect
+        toward = self.toward(sim)
+        rng = sim.rng_ai
+
+        if isinstance(effect, ReverseControls):
+            # In reverse controls, AI sometimes does the opposite to confuse player
+            if rng.random() < 0.7:  # 70% chance of normal behavior
+                if toward:
+                    # Predict future position with some randomness, variable speed
+                    predicted_y = self.predict_straight(sim) + rng.randint(-20, 20) * PIXEL
+                    self.aim(predicted_y, speed * rng.uniform(1.0, 1.3), 5 * PIXEL)
+                else:
+                    self.aim_center(sim, paddle, speed * 0.7)
+            else:
+                # Deliberate wrong moves to confuse player
+                self.aim_away(sim, paddle, speed * 1.2)
+
+        elif effect.hides_right_paddle or effect.hides_ball:
+            # When AI paddle or ball is invisible, AI plays more aggressively
+            if toward:
+                self.aim(self.predict(sim), speed * 1.4, 5 * PIXEL)
+            else:
+                self.target_y = None
+
+        elif effect.decoys:
+            # Focus on the real ball with high accuracy
+            if toward:
+                self.aim(self.predict_straight(sim), speed * 1.2, 3 * PIXEL)
+            else:
+                self.target_y = None
+
+        elif isinstance(effect, ShrinkingPaddles):
+            # More aggressive to compensate for smaller paddle
+            if toward:
+                self.aim(self.predict_straight(sim), speed * 1.3, 2 * PIXEL)
+            else:
+                self.target_y = None
+
+        else:
+            # Default AI behavior - play competently with some randomness
+            if rng.random() < 0.9:  # 90% accurate
+                self.aim(sim.ball.centery, speed * rng.uniform(0.9, 1.1))
+            else:
+                # Occasional wrong move
+                self.aim_away(sim, paddle, speed * 0.8)
+
+
+STRATEGIES = {
+    "Idle": Strategy,
+    "New Born": NewBornAI,
+    "Normie": NormieAI,
+    "Knight of Hell": KnightOfHellAI,
+    "Deception": DeceptionAI,
+}
+
+
+def register_strategy(name, cls):
+    """Make a Strategy subclass available by name."""
+    if not (isinstance(cls, type) and issubclass(cls, Strategy)):
+        raise TypeError(f"{cls!r} is not a Strategy subclass")
+    STRATEGIES[name] = cls
+
+
+def load_params(path=PARAMS_FILE):
+    """
+    Override strategy tunables from a file written by calibrate.py.
+    Returns True if the file was there and read.
+    """
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path) as f:
+            strategies = json.load(f)["strategies"]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading AI parameters from {path}: {e}")
+        return False
+
+    for name, values in strategies.items():
+        cls = STRATEGIES.get(name)
+        if cls is None:
+            print(f"Ignoring parameters for unknown AI strategy: {name}")
+            continue
+        for key, value in values.items():
+            if key in cls.params:
+                cls.params[key] = float(value)
+            else:
+                print(f"Ignoring unknown {name} parameter: {key}")
+    return True
+
+
+def active_params():
+    """The tunables of every registered strategy that has any, by name."""
+    return {name: dict(cls.params) for name, cls in STRATEGIES.items() if cls.params}
+
+
+def params_digest(params=None):
+    """Short hash of active_params(), or of params, to tell calibrations apart."""
+    if params is None:
+        params = active_params()
+    text = json.dumps(params, sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def use_params(strategy, params):
+    """
+    Make one strategy instance play with the tunables recorded in params
+    (from active_params()) instead of its class's current ones.
+    """
+    for name, values in params.items():
+        cls = STRATEGIES.get(name)
+        if cls is not None and type(strategy) is cls:
+            strategy.params = {**cls.params, **{key: float(value) for key, value in values.items()}}
+
+
+def make_strategy(spec, side):
+    """A strategy for side from a registered name or a Strategy subclass."""
+    if isinstance(spec, str):
+        if spec not in STRATEGIES:
+            raise ValueError(f"Unknown AI strategy: {spec}")
+        spec = STRATEGIES[spec]
+    return spec(side)
+
+
+load_params()
@@ -0,0 +1,193 @@
+"""
+Array-backed pool for the decoy balls of the BALL_MULTIPLY and BALL_SWARM
+deception effects.
+
+Every decoy lives in a slot of preallocated NumPy arrays (position,
+velocity, size, tint, alive flag) instead of a dict holding a
+pygame.Rect. Dead slots go on a free list and are reused by the next
+spawn, so nothing is allocated while an effect runs, and movement, wall
+bounces, paddle bounces and removal are done for all decoys at once.
+"""
+
+import numpy as np
+import pygame
+
+# Number of tints decoys are drawn in; sprites are prebuilt per tint and size
+PALETTE_SIZE = 32
+
+
+def _make_palette(rng):
+    """Random light colors and alphas like the original decoys used."""
+    colors = rng.integers(200, 256, size=(PALETTE_SIZE, 3), dtype=np.uint8)
+    alphas = rng.integers(180, 256, size=PALETTE_SIZE, dtype=np.uint8)
+    return colors, alphas
+
+
+class BallPool:
+    """Fixed-capacity struct-of-arrays store of decoy balls."""
+
+    def __init__(self, capacity, rng=None):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.dx = np.zeros(capacity)
+        self.dy = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.tint = np.zeros(capacity, dtype=np.int32)  # Index into colors/alphas
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self.colors, self.alphas = _make_palette(self.rng)
+
+        # Stack of free slots; free[:free_count] are free and popped from the
+        # end, so low slots are reused first
+        self.free = np.arange(capacity - 1, -1, -1, dtype=np.intp)
+        self.free_count = capacity
+
+    def __len__(self):
+        return self.capacity - self.free_count
+
+    def clear(self):
+        """Kill every decoy."""
+        self.alive[:] = False
+        self.free[:] = np.arange(self.capacity - 1, -1, -1)
+        self.free_count = self.capacity
+
+    def spawn(self, count, x, y, speed_x, speed_y, ball_size):
+        """
+        Add up to count decoys at (x, y) with random directions, speeds
+        within 20% of (speed_x, speed_y), sizes within 20% of ball_size and
+        random tints. Returns how many were spawned.
+        """
+        count = min(count, self.free_count)
+        if count <= 0:
+            return 0
+        self.free_count -= count
+        slots = self.free[self.free_count:self.free_count + count]
+
+        rng = self.rng
+        signs = rng.choice((-1.0, 1.0), size=(2, count))
+        self.x[slots] = x
+        self.y[slots] = y
+        self.dx[slots] = signs[0] * speed_x * rng.uniform(0.8, 1.2, count)
+        self.dy[slots] = signs[1] * speed_y * rng.uniform(0.8, 1.2, count)
+        self.size[slots] = ball_size * rng.uniform(0.8, 1.2, count)
+        self.tint[slots] = rng.integers(0, PALETTE_SIZE, count)
+        self.alive[slots] = True
+        return count
+
+    def kill(self, slots):
+        """Free the given slots."""
+        self.alive[slots] = False
+        self.free[self.free_count:self.free_count + len(slots)] = slots
+        self.free_count += len(slots)
+
+    def state_size(self):
+        """Number of buffer entries save() writes."""
+        return 8 * self.capacity + 1
+
+    def save(self, buffer):
+        """Copy the pool into buffer, a float array of state_size() entries."""
+        cap = self.capacity
+        for i, array in enumerate((self.x, self.y, self.dx, self.dy, self.size, self.tint, self.alive, self.free)):
+            buffer[i * cap:(i + 1) * cap] = array
+        buffer[8 * cap] = self.free_count
+
+    def load(self, buffer):
+        """Restore the pool from a buffer written by save()."""
+        cap = self.capacity
+        for i, array in enumerate((self.x, self.y, self.dx, self.dy, self.size, self.tint, self.alive, self.free)):
+            array[:] = buffer[i * cap:(i + 1) * cap]
+        self.free_count = int(buffer[8 * cap])
+
+    def update(self, width, height, left_paddle, right_paddle):
+        """
+        Move every decoy one tick: random speed wobble, wall bounces,
+        occasional paddle bounces. Decoys that leave the table horizontally
+        are freed; returns how many were removed.
+        """
+        alive = np.flatnonzero(self.alive)
+        if alive.size == 0:
+            return 0
+        rng = self.rng
+        x, y, dx, dy, size = self.x, self.y, self.dx, self.dy, self.size
+
+        x[alive] += dx[alive]
+        y[alive] += dy[alive]
+
+        # Random speed variations for extra challenge, 2% per ball per tick
+        wobble = alive[rng.random(alive.size) < 0.02]
+        if wobble.size:
+            dx[wobble] *= rng.uniform(0.9, 1.1, wobble.size)
+            dy[wobble] *= rng.uniform(0.9, 1.1, wobble.size)
+
+        # Bounce off top and bottom walls
+        ys = y[alive]
+        sizes = size[alive]
+        top = ys <= 0
+        bottom = ys + sizes >= height
+        walls = alive[top | bottom]
+        dy[walls] *= -1
+        y[alive[top]] = 0
+        y[alive[bottom]] = height - sizes[bottom]
+
+        # Bounce off paddles occasionally (looks like they can interact)
+        xs = x[alive]
+        ys = y[alive]
+        for paddle, direction in ((left_paddle, 1.0), (right_paddle, -1.0)):
+            hit = ((xs < paddle.right) & (xs + sizes > paddle.left) &
+                   (ys < paddle.bottom) & (ys + sizes > paddle.top))
+            hit = alive[hit]
+            if hit.size:
+                hit = hit[rng.random(hit.size) < 0.7]
+                dx[hit] = direction * np.abs(dx[hit]) * rng.uniform(1.0, 1.1, hit.size)
+
+        # Remove balls that leave the table horizontally
+        gone = alive[(xs + sizes < 0) | (xs > width)]
+        if gone.size:
+            self.kill(gone)
+        return gone.size
+
+
+class BallPoolRenderer:
+    """
+    Draws a BallPool with prebuilt glow sprites and a single blits() call.
+    view is the TableView that maps the pool's table units to the screen.
+    """
+
+    def __init__(self, pool, view):
+        self.pool = pool
+        self.view = view
+        self.sprites = {}  # (tint, pixel size) -> Surface
+
+    def sprite(self, tint, size):
+        key = (tint, size)
+        surface = self.sprites.get(key)
+        if surface is None:
+            color = tuple(int(c) for c in self.pool.colors[tint])
+            alpha = int(self.pool.alphas[tint])
+            radius = size // 2
+            surface = pygame.Surface((size + 4, size + 4), pygame.SRCALPHA)
+            center = (size // 2 + 2, size // 2 + 2)
+            pygame.draw.circle(surface, (*color, alpha), center, radius)
+            # Add some glow to fake balls
+            pygame.draw.circle(surface, (*color, alpha // 2), center, radius + 2)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()  # Match the screen format for faster blits
+            self.sprites[key] = surface
+        return surface
+
+    def draw(self, screen):
+        """Draw every live decoy; returns the screen rects drawn."""
+        pool = self.pool
+        alive = np.flatnonzero(pool.alive)
+        if alive.size == 0:
+            return []
+        sprite = self.sprite
+        view = self.view
+        xs = (pool.x[alive] * view.scale_x - 2).astype(np.int32).tolist()
+        ys = (pool.y[alive] * view.scale_y - 2).astype(np.int32).tolist()
+        tints = pool.tint[alive].tolist()
+        sizes = np.maximum(pool.size[alive] * view.scale, 1).astype(np.int32).tolist()
+        return screen.blits([(sprite(t, s), (x, y)) for t, s, x, y in zip(tints, sizes, xs, ys)])
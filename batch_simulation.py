@@ -0,0 +1,490 @@
+"""
+NumPy batch simulator for evaluating AI tuning over many rallies at once.
+
+BatchSimulation keeps the ball and paddle state of N independent matches
+in arrays and advances all of them per tick with the same rules as
+MatchSimulation.step(): wall bounce, swept paddle collision with the
+relative_intersect_y angle rule and 1.05 speed-up capped at the max ball
+speed, scoring and serving. The right paddle is played by one of the PVC
+policies (New Born, Normie, Knight of Hell) and the left paddle by a
+reference player, both vectorized. The policies follow ai.py: they only
+re-plan on the decision ticks of their ai.STRATEGIES class, so most ticks
+only move the paddles toward their targets.
+
+Positions are floats in table units, like the single-match engine, so
+nothing depends on the screen size. Paddle hits, wall bounces and points only touch the few matches they
+happen in, so the per-tick cost is dominated by a handful of array ops.
+
+Run `python batch_simulation.py` for a rallies-per-second benchmark and
+`python batch_simulation.py --parity` to check a single slot against
+MatchSimulation tick for tick.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ai import STRATEGIES
+from intercept_table import get_table
+from simulation import MatchSimulation, PIXEL, INPUT_LEFT_UP, INPUT_LEFT_DOWN, table_constants, win_score_for
+
+# Policies available for either paddle
+LEFT_POLICIES = ("Idle", "Tracker", "New Born", "Normie", "Knight of Hell")
+RIGHT_POLICIES = ("New Born", "Normie", "Knight of Hell")
+
+# Default cap on ticks for run_rallies() so an evaluation always ends
+DEFAULT_MAX_TICKS = 100000
+
+
+class BatchPolicy:
+    """
+    One ai.py strategy playing one paddle in every slot: per-slot targets,
+    speeds and dead zones, re-planned in the slots whose decision is due.
+    params holds the strategy's tunables per slot, so different slots can
+    try different values side by side (see calibrate.py).
+    """
+
+    def __init__(self, name, side, count):
+        strategy = STRATEGIES[name]
+        self.name = name
+        self.side = side
+        self.interval = strategy.decision_interval or np.inf
+        self.replan_on_trajectory = strategy.replan_on_trajectory
+        self.target = np.full(count, np.nan)  # NaN holds the paddle still
+        self.speed = np.zeros(count)
+        self.dead_zone = np.zeros(count)
+        self.countdown = np.zeros(count)  # Ticks until the next decision
+        self.params = {key: np.full(count, value) for key, value in strategy.params.items()}
+        self.table = get_table() if name == "Knight of Hell" else None  # Loaded up front, see KnightOfHellAI
+
+    def reset(self, index):
+        self.target[index] = np.nan
+        self.countdown[index] = 0
+
+    def update(self, batch, paddle_y, path_changed):
+        """Decide where due, then move one tick; returns the new paddle_y."""
+        due = self.countdown <= 0
+        if self.replan_on_trajectory:
+            due |= path_changed
+        index = np.flatnonzero(due)
+        if len(index):
+            self.countdown[index] = self.interval
+            self.decide(batch, index, paddle_y[index])
+        self.countdown -= 1
+
+        center = paddle_y + batch.paddle_height / 2
+        with np.errstate(invalid="ignore"):
+            down = self.target > center + self.dead_zone
+            up = self.target < center - self.dead_zone
+        return batch._move_paddle(paddle_y, up, down, self.speed)
+
+    def decide(self, batch, index, paddle_y):
+        n = len(index)
+        speed = batch.paddle_speed
+        ball_cy = batch.ball_y[index] + batch.ball_size / 2
+        paddle_cy = paddle_y + batch.paddle_height / 2
+        params = {key: value[index] for key, value in self.params.items()}
+
+        if self.name == "Normie":
+            self.target[index] = ball_cy
+            self.speed[index] = speed * params["speed"]
+            self.dead_zone[index] = params["dead_zone"] * PIXEL
+
+        elif self.name == "New Born":
+            # Some idle, some of the rest move the wrong way, both slowly
+            roll = batch.rng.random(n)
+            idle = params["idle"]
+            wrong = roll < idle + (1 - idle) * params["wrong_way"]
+            self.target[index] = np.where(roll < idle, np.nan, np.where(wrong, 2 * paddle_cy - ball_cy, ball_cy))
+            self.speed[index] = speed * np.where(wrong, params["wrong_way_speed"], params["speed"])
+            self.dead_zone[index] = 0.0
+
+        elif self.name == "Knight of Hell":
+            if self.side == "left":
+                toward = batch.ball_dx[index] < 0
+                distance = batch.ball_x[index] - (batch.left_x + batch.paddle_width)
+            else:
+                toward = batch.ball_dx[index] > 0
+                distance = batch.right_x - batch.ball_x[index]
+
+            # Fold the predicted intercept back onto the table
+            ball_speed = np.abs(batch.ball_dx[index])
+            time_to_reach = np.divide(distance, ball_speed, out=np.zeros(n), where=ball_speed != 0)
+            predicted = batch.ball_dy[index] * time_to_reach
+            predicted += batch.ball_y[index]
+            period = 2 * batch.height
+            np.mod(predicted, period, out=predicted)
+            predicted = np.where(predicted > batch.height, period - predicted, predicted)
+
+            # Trick shots with the paddle edge that sends the ball
+            # furthest from the middle, one table lookup for all slots
+            trick = batch.rng.random(n) < params["trick_shots"]
+            if trick.any():
+                offsets = self.table.offsets(batch.ball_y[index], batch.ball_dy[index],
+                                             batch.ball_dx[index], distance)
+                predicted += np.where(trick, offsets, 0.0)
+
+            # Drift back to the centre when the ball moves away
+            self.target[index] = np.where(toward, predicted, batch.height / 2)
+            self.speed[index] = speed * np.where(toward, params["speed"], params["return_speed"])
+            self.dead_zone[index] = np.where(toward, params["dead_zone"] * PIXEL, batch.paddle_height * 0.2)
+
+        else:
+            # Idle
+            self.target[index] = np.nan
+
+
+class BatchSimulation:
+    """
+    N independent PVC matches stepped together with NumPy.
+
+    The "Tracker" reference player chases the ball at full paddle speed
+    but aims at a random offset of up to tracker_error paddle heights,
+    redrawn every time the ball turns towards it, so it misses now and
+    then like a person would. With tracker_error=0 it is a perfect player
+    and rallies against Normie or Knight of Hell may never end, which is
+    why run_rallies() always stops after max_ticks.
+    """
+
+    def __init__(self, count, difficulty="Normie", left_policy="Tracker", seed=None, tracker_error=0.6):
+        if difficulty not in RIGHT_POLICIES:
+            raise ValueError(f"Unknown AI difficulty: {difficulty}")
+        if left_policy not in LEFT_POLICIES:
+            raise ValueError(f"Unknown left paddle policy: {left_policy}")
+
+        self.count = count
+        self.difficulty = difficulty
+        self.left_policy = left_policy
+        self.tracker_error = tracker_error
+        self.rng = np.random.default_rng(seed)
+
+        # Same table parameters as MatchSimulation
+        constants = table_constants()
+        self.width = constants["width"]
+        self.height = constants["height"]
+        self.paddle_width = constants["paddle_width"]
+        self.paddle_height = constants["paddle_height"]
+        self.ball_size = constants["ball_size"]
+        self.paddle_speed = constants["paddle_speed"]
+        self.ball_speed_x = constants["ball_speed_x"]
+        self.ball_speed_y = constants["ball_speed_y"]
+        self.max_ball_speed = constants["max_ball_speed"]
+        self.win_score = win_score_for("PVC", difficulty)
+
+        # Paddles only move vertically
+        self.left_x = constants["left_paddle_x"]
+        self.right_x = constants["right_paddle_x"]
+
+        n = count
+        self.ball_x = np.empty(n)
+        self.ball_y = np.empty(n)
+        self.ball_dx = np.empty(n)
+        self.ball_dy = np.empty(n)
+        self.left_y = np.empty(n)
+        self.right_y = np.empty(n)
+        self.left_score = np.zeros(n, dtype=np.int64)
+        self.right_score = np.zeros(n, dtype=np.int64)
+        self.left_aim_error = np.zeros(n)
+        # Slots whose ball changed path last tick, for the re-planning policies
+        self.path_changed = np.zeros(n, dtype=bool)
+
+        self.right_ai = BatchPolicy(difficulty, "right", n)
+        self.left_ai = None if left_policy == "Tracker" else BatchPolicy(left_policy, "left", n)
+
+        # Totals across every match played in each slot
+        self.left_wins = np.zeros(n, dtype=np.int64)
+        self.right_wins = np.zeros(n, dtype=np.int64)
+        self.left_points = np.zeros(n, dtype=np.int64)
+        self.right_points = np.zeros(n, dtype=np.int64)
+        self.paddle_hits = np.zeros(n, dtype=np.int64)
+        self.rallies = 0
+        self.ticks = 0
+
+        self.reset()
+
+    def reset(self, index=None):
+        """Start fresh matches in every slot, or only in the given slots."""
+        if index is None:
+            index = slice(None)
+        self.left_y[index] = self.height / 2 - self.paddle_height / 2
+        self.right_y[index] = self.height / 2 - self.paddle_height / 2
+        self.ball_x[index] = self.width / 2 - self.ball_size / 2
+        self.ball_y[index] = self.height / 2 - self.ball_size / 2
+        self.ball_dx[index] = self.ball_speed_x
+        self.ball_dy[index] = self.ball_speed_y
+        self.left_score[index] = 0
+        self.right_score[index] = 0
+        self.path_changed[index] = True
+        self.right_ai.reset(index)
+        if self.left_ai is not None:
+            self.left_ai.reset(index)
+
+    def reset_ball(self, index):
+        """Serve the ball from the centre in the given slots."""
+        self.ball_x[index] = self.width / 2 - self.ball_size / 2
+        self.ball_y[index] = self.height / 2 - self.ball_size / 2
+        self.ball_dx[index] = np.where(self.ball_dx[index] < 0, -self.ball_speed_x, self.ball_speed_x)
+
+        # Randomize y direction but never too slow
+        dy = self.rng.uniform(-self.ball_speed_y, self.ball_speed_y, len(index))
+        slow = np.abs(dy) < self.ball_speed_y * 0.3
+        dy[slow] = np.where(dy[slow] >= 0, 1.0, -1.0) * self.ball_speed_y * 0.3
+        self.ball_dy[index] = dy
+        self.path_changed[index] = True
+
+    def _new_aim_error(self, index):
+        """Redraw the reference player's aim offset for the given slots."""
+        if self.left_policy == "Tracker" and len(index):
+            spread = self.tracker_error * self.paddle_height
+            self.left_aim_error[index] = self.rng.uniform(-spread, spread, len(index))
+
+    def _move_paddle(self, paddle_y, up, down, amount):
+        """Move paddles up/down by amount, respecting the original edge checks."""
+        delta = np.where(up & (paddle_y > 0), -amount, 0.0)
+        delta += np.where(down & (paddle_y + self.paddle_height < self.height), amount, 0.0)
+        delta += paddle_y
+        return delta
+
+    def _tracker(self, paddle_y):
+        """Reference player holding W/S toward where it thinks the ball is."""
+        speed = self.paddle_speed
+        ball_cy = self.ball_y + self.ball_size / 2 + self.left_aim_error
+        paddle_cy = paddle_y + self.paddle_height / 2
+        return self._move_paddle(paddle_y, ball_cy < paddle_cy - speed, ball_cy > paddle_cy + speed, speed)
+
+    def _knight_of_hell_effects(self):
+        """Vectorized speed bursts and teleports from Knight of Hell mode."""
+        rng = self.rng
+        # Each match fires with 0.3% chance per tick - only draw for the ones that do
+        fired = rng.binomial(self.count, 0.003)
+        if not fired:
+            return
+        index = np.unique(rng.integers(0, self.count, fired))
+        burst = rng.random(len(index)) < 0.5
+        cap = self.max_ball_speed
+
+        slots = index[burst]
+        self.ball_dx[slots] = np.clip(self.ball_dx[slots] * 1.5, -cap, cap)
+        self.ball_dy[slots] = np.clip(self.ball_dy[slots] * 1.5, -cap, cap)
+        self.path_changed[slots] = True
+
+        slots = index[~burst]
+        slots = slots[self.ball_dx[slots] > 0]
+        if len(slots):
+            safe_x = min(max(self.left_x + self.paddle_width * 3, 0), self.width - self.ball_size)
+            safe_y = rng.uniform(self.paddle_height, self.height - self.paddle_height, len(slots))
+            self.ball_x[slots] = safe_x
+            self.ball_y[slots] = np.clip(safe_y, 0, self.height - self.ball_size)
+            self.path_changed[slots] = True
+
+    def _sweep(self, x, y, dx, dy, paddle_x, top):
+        """
+        Fraction of the move (dx, dy) from (x, y) at which each ball first
+        touches the paddle, inf where it does not; the vectorized Box.sweep().
+        """
+        size, width = self.ball_size, self.paddle_width
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tx0 = (paddle_x - size - x) / dx
+            tx1 = (paddle_x + width - x) / dx
+            ty0 = (top - size - y) / dy
+            ty1 = (top + self.paddle_height - y) / dy
+        # Level balls are beside the paddle the whole tick or never
+        level = dy == 0
+        if level.any():
+            beside = (y < top + self.paddle_height) & (y + size > top)
+            ty0 = np.where(level, np.where(beside, -np.inf, np.inf), ty0)
+            ty1 = np.where(level, np.inf, ty1)
+
+        enter = np.maximum(np.maximum(np.minimum(tx0, tx1), np.minimum(ty0, ty1)), 0.0)
+        leave = np.minimum(np.minimum(np.maximum(tx0, tx1), np.maximum(ty0, ty1)), 1.0)
+        return np.where(enter < leave, enter, np.inf)
+
+    def _paddle_hits(self, paddle_x, paddle_y, near, swept):
+        """
+        Slots among near where the ball overlaps the paddle, like
+        Box.colliderect, plus the swept slots that stopped against it.
+        """
+        x = self.ball_x[near]
+        y = self.ball_y[near]
+        top = paddle_y[near]
+        hit = near[(x < paddle_x + self.paddle_width) & (x + self.ball_size > paddle_x) &
+                   (y < top + self.paddle_height) & (y + self.ball_size > top)]
+        if len(swept):
+            return np.union1d(hit, swept)
+        return hit
+
+    def step(self, left_inputs=None):
+        """
+        Advance every match by one tick. left_inputs, an array of per-slot
+        INPUT_LEFT_UP / INPUT_LEFT_DOWN bits, moves the left paddles like a
+        player holding W/S instead of the left policy.
+        """
+        self.ticks += 1
+        height = self.height
+        ball_size = self.ball_size
+        cap = self.max_ball_speed
+        half = self.paddle_height / 2
+
+        # Paddles
+        changed = self.path_changed
+        if left_inputs is not None:
+            self.left_y = self._move_paddle(self.left_y, (left_inputs & INPUT_LEFT_UP) != 0,
+                                            (left_inputs & INPUT_LEFT_DOWN) != 0, self.paddle_speed)
+        elif self.left_ai is None:
+            self.left_y = self._tracker(self.left_y)
+        elif self.left_policy != "Idle":
+            self.left_y = self.left_ai.update(self, self.left_y, changed)
+        self.right_y = self.right_ai.update(self, self.right_y, changed)
+        changed[:] = False
+
+        # Move balls. Only the ones that end up in a paddle's column can
+        # touch a paddle this tick; those are swept against the paddle they
+        # head for and stopped where they first meet it, so fast balls
+        # cannot pass through
+        new_x = self.ball_x + self.ball_dx
+        near = np.flatnonzero((new_x < self.left_x + self.paddle_width) | (new_x + ball_size > self.right_x))
+        x, y = self.ball_x[near], self.ball_y[near]
+        self.ball_x = new_x
+        self.ball_y += self.ball_dy
+
+        swept_left = swept_right = near[:0]
+        if len(near):
+            dx, dy = self.ball_dx[near], self.ball_dy[near]
+            heading_left = dx < 0
+            impact = np.where(heading_left, self._sweep(x, y, dx, dy, self.left_x, self.left_y[near]),
+                              self._sweep(x, y, dx, dy, self.right_x, self.right_y[near]))
+            swept = impact <= 1
+            if swept.any():
+                contact_x = x[swept] + dx[swept] * impact[swept]
+                self.ball_x[near[swept]] = contact_x
+                self.ball_y[near[swept]] = y[swept] + dy[swept] * impact[swept]
+                swept_left = near[swept & heading_left]
+                swept_right = near[swept & ~heading_left]
+
+        if self.difficulty == "Knight of Hell":
+            self._knight_of_hell_effects()
+            # Teleported balls never got to the paddle; only right-bound ones teleport
+            if len(swept_right):
+                swept_right = swept_right[self.ball_x[swept_right] == contact_x[~heading_left[swept]]]
+
+        # Walls
+        wall = np.flatnonzero((self.ball_y <= 0) | (self.ball_y + ball_size >= height))
+        if len(wall):
+            self.ball_dy[wall] *= -1
+            self.ball_y[wall] = np.clip(self.ball_y[wall], 0, height - ball_size)
+            self.path_changed[wall] = True
+
+        # Paddle hits - angle from where the ball meets the paddle, 5% faster each time
+        hit = self._paddle_hits(self.left_x, self.left_y, near, swept_left)
+        if len(hit):
+            rel = ((self.left_y[hit] + half) - (self.ball_y[hit] + ball_size / 2)) / half
+            self.ball_dx[hit] = np.minimum(np.abs(self.ball_dx[hit]) * 1.05, cap)
+            self.ball_dy[hit] = -rel * self.ball_speed_y
+            self.ball_x[hit] = self.left_x + self.paddle_width
+            self.paddle_hits[hit] += 1
+            self.path_changed[hit] = True
+
+        hit = self._paddle_hits(self.right_x, self.right_y, near, swept_right)
+        if len(hit):
+            rel = ((self.right_y[hit] + half) - (self.ball_y[hit] + ball_size / 2)) / half
+            self.ball_dx[hit] = np.maximum(-np.abs(self.ball_dx[hit]) * 1.05, -cap)
+            self.ball_dy[hit] = -rel * self.ball_speed_y
+            self.ball_x[hit] = self.right_x - ball_size
+            self.paddle_hits[hit] += 1
+            self.path_changed[hit] = True
+            self._new_aim_error(hit)
+
+        np.clip(self.ball_dy, -cap, cap, out=self.ball_dy)
+
+        # Scoring
+        right_point = np.flatnonzero(self.ball_x <= 0)
+        if len(right_point):
+            self.right_score[right_point] += 1
+            self.right_points[right_point] += 1
+            self.reset_ball(right_point)
+        left_point = np.flatnonzero(self.ball_x + ball_size >= self.width)
+        if len(left_point):
+            self.left_score[left_point] += 1
+            self.left_points[left_point] += 1
+            self.reset_ball(left_point)
+
+        scored = len(right_point) + len(left_point)
+        if scored:
+            self.rallies += scored
+            # Serves towards the reference player get a fresh aim error
+            served = np.concatenate((right_point, left_point))
+            self._new_aim_error(served[self.ball_dx[served] < 0])
+
+            # Finished matches start over in the same slot
+            left_won = served[self.left_score[served] >= self.win_score]
+            right_won = served[self.right_score[served] >= self.win_score]
+            if len(left_won) or len(right_won):
+                self.left_wins[left_won] += 1
+                self.right_wins[right_won] += 1
+                self.reset(np.concatenate((left_won, right_won)))
+
+    def run_rallies(self, rallies, max_ticks=DEFAULT_MAX_TICKS):
+        """Step until at least rallies points were played or max_ticks have passed."""
+        while self.rallies < rallies and self.ticks < max_ticks:
+            self.step()
+        return self.stats()
+
+    def stats(self):
+        """Totals over every match slot."""
+        rallies = self.rallies
+        return {
+            "rallies": rallies,
+            "left_points": int(self.left_points.sum()),
+            "right_points": int(self.right_points.sum()),
+            "left_wins": int(self.left_wins.sum()),
+            "right_wins": int(self.right_wins.sum()),
+            "mean_hits_per_rally": float(self.paddle_hits.sum()) / rallies if rallies else 0.0,
+            "ticks": self.ticks,
+        }
+
+
+def check_parity(max_ticks=5000):
+    """
+    Step a deterministic Normie-vs-Idle slot next to MatchSimulation until
+    the first point and return the first tick where they disagree, or None.
+    """
+    match = MatchSimulation("PVC", "Normie")
+    batch = BatchSimulation(1, "Normie", "Idle", seed=0)
+    for tick in range(1, max_ticks + 1):
+        match.step(0)
+        batch.step()
+        if match.left_score or match.right_score:
+            return None if batch.rallies == 1 else tick
+        single = (match.ball.x, match.ball.y, match.ball_dx, match.ball_dy, match.right_paddle.y)
+        batched = (batch.ball_x[0], batch.ball_y[0], batch.ball_dx[0], batch.ball_dy[0], batch.right_y[0])
+        if not np.allclose(single, batched):
+            return tick
+    return None
+
+
+def benchmark(count, rallies, max_ticks):
+    """Print rallies per second for each AI difficulty against the reference player."""
+    for difficulty in RIGHT_POLICIES:
+        batch = BatchSimulation(count, difficulty, "Tracker", seed=0)
+        start = time.perf_counter()
+        stats = batch.run_rallies(rallies, max_ticks)
+        elapsed = time.perf_counter() - start
+        print(f"{difficulty:<15} {stats['rallies']:>9} rallies in {stats['ticks']:>6} ticks "
+              f"{stats['rallies'] / elapsed:>10.0f} rallies/s  "
+              f"player {stats['left_points']} / AI {stats['right_points']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch simulator benchmark and parity check")
+    parser.add_argument("--matches", type=int, default=50000)
+    parser.add_argument("--rallies", type=int, default=1000000)
+    parser.add_argument("--max-ticks", type=int, default=3000)
+    parser.add_argument("--parity", action="store_true", help="compare against MatchSimulation instead")
+    args = parser.parse_args()
+
+    if args.parity:
+        tick = check_parity()
+        print("ok" if tick is None else f"diverged at tick {tick}")
+        raise SystemExit(1 if tick is not None else 0)
+
+    benchmark(args.matches, args.rallies, args.max_ticks)
@@ -0,0 +1,215 @@
+"""
+Offline calibration of the computer difficulty levels.
+
+Searches each PVC level's tunables (ai.py's params) for the values at
+which the batch engine's reference player, the "Tracker" of
+batch_simulation.py, wins a target share of matches against it. Every
+round tries many candidate settings side by side in one BatchSimulation,
+a block of slots each, then narrows the search around the best; the
+levels are calibrated in parallel worker processes. The result goes to
+ai.PARAMS_FILE, which ai.py loads on start-up.
+
+Candidates are compared on the point win rate that gives the target
+match win rate for the level's points to win, assuming independent
+points, so a candidate needs points played rather than whole matches
+finished. Of those within measurement noise of it, the closest to the
+current values is kept.
+Everything runs in table units, so one calibration holds at any
+resolution.
+
+    python calibrate.py
+    python calibrate.py --target "Knight of Hell=0.05" --tracker-error 0.4
+"""
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ai import PARAMS_FILE, STRATEGIES
+from batch_simulation import BatchSimulation, RIGHT_POLICIES
+
+# Share of matches the reference player should win against each level
+DEFAULT_TARGETS = {"New Born": 0.8, "Normie": 0.5, "Knight of Hell": 0.1}
+
+# Search range of each tunable; the others keep their current values
+RANGES = {
+    "New Born": {"idle": (0.0, 0.9), "wrong_way": (0.0, 0.9), "speed": (0.2, 2.0)},
+    "Normie": {"speed": (0.3, 1.5), "dead_zone": (0.0, 60.0)},
+    "Knight of Hell": {"speed": (0.3, 2.0), "trick_shots": (0.0, 1.0), "dead_zone": (0.0, 40.0)},
+}
+
+# Candidates with fewer points played than this are not trusted
+MIN_POINTS = 50
+
+# Final match win rates further than this from the target get a warning
+MISS_WARNING = 0.1
+
+
+def match_win_rate(p, points):
+    """Chance of winning a first-to-points match with point win rate p."""
+    # Win the last point after losing any k < points of the others
+    return sum(math.comb(points - 1 + k, k) * p ** points * (1 - p) ** k for k in range(points))
+
+
+def point_win_rate(match_rate, points):
+    """The point win rate giving match_rate in first-to-points matches."""
+    low, high = 0.0, 1.0
+    for _ in range(50):
+        middle = (low + high) / 2
+        if match_win_rate(middle, points) < match_rate:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def evaluate(level, candidates, slots, ticks, seed, tracker_error):
+    """
+    Play every candidate (a dict of tunables) on slots slots for ticks
+    ticks. Returns the points the player won and the points played per
+    candidate, and the points needed to win a match.
+    """
+    batch = BatchSimulation(len(candidates) * slots, level, "Tracker", seed=seed, tracker_error=tracker_error)
+    params = batch.right_ai.params
+    for i, candidate in enumerate(candidates):
+        for key, value in candidate.items():
+            params[key][i * slots:(i + 1) * slots] = value
+    for _ in range(ticks):
+        batch.step()
+
+    won = batch.left_points.reshape(len(candidates), slots).sum(axis=1)
+    lost = batch.right_points.reshape(len(candidates), slots).sum(axis=1)
+    return won, won + lost, batch.win_score
+
+
+def calibrate(level, target, candidates=16, slots=512, ticks=20000, rounds=4, seed=0, tracker_error=0.6):
+    """
+    Search level's RANGES for tunables at which the player wins target of
+    the matches. Of the candidates that hit the target within their
+    measurement noise, the one closest to the current values wins, so
+    the level keeps its character. Returns the tunables and the player's
+    match win rate and points played before and after, measured on a
+    last run over every slot.
+    """
+    rng = np.random.default_rng(seed)
+    ranges = RANGES[level]
+    start = dict(STRATEGIES[level].params)
+    best = start
+    best_score = (2, 0.0)
+
+    def distance(candidate):
+        return math.sqrt(sum(((candidate[key] - start[key]) / (high - low)) ** 2
+                             for key, (low, high) in ranges.items()))
+
+    for round_number in range(rounds):
+        # Anywhere in range at first, then closer and closer to the best
+        shrink = 0.5 ** round_number
+        tried = [best]
+        for _ in range(candidates - 1):
+            candidate = dict(best)
+            for key, (low, high) in ranges.items():
+                spread = (high - low) * shrink
+                candidate[key] = float(np.clip(rng.uniform(best[key] - spread, best[key] + spread), low, high))
+            tried.append(candidate)
+
+        # Fresh seed each round so the best is re-measured, not kept for one lucky run
+        won, played, points = evaluate(level, tried, slots, ticks, seed + round_number, tracker_error)
+        target_p = point_win_rate(target, points)
+        best_score = (2, 0.0)
+        for candidate, candidate_won, candidate_played in zip(tried, won, played):
+            if candidate_played < MIN_POINTS:
+                continue
+            p = candidate_won / candidate_played
+            noise = 2 * math.sqrt(max(p * (1 - p), 0.01) / candidate_played)
+            miss = abs(p - target_p)
+            score = (0, distance(candidate)) if miss <= noise else (1, miss)
+            if score < best_score:
+                best, best_score = candidate, score
+
+    # Measure the start and the winner on every slot of a last run
+    won, played, points = evaluate(level, [start, best], candidates * slots // 2, ticks, seed + rounds, tracker_error)
+    before, after = (match_win_rate(w / n, points) if n else 0.0 for w, n in zip(won, played))
+    return best, before, after, int(played[1])
+
+
+def _calibrate_job(job):
+    level, target, options = job
+    start = time.perf_counter()
+    params, before, rate, played = calibrate(level, target, **options)
+    return level, target, params, before, rate, played, time.perf_counter() - start
+
+
+def write_params(path, calibrated, reference):
+    """
+    Merge calibrated {level: (params, target, rate, points)} into the
+    parameter file at path, keeping entries of other strategies.
+    """
+    data = {"strategies": {}, "calibration": {}}
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                data.update(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error reading {path}, starting it over: {e}")
+
+    for level, (params, target, rate, played) in calibrated.items():
+        data["strategies"][level] = params
+        data["calibration"][level] = {"target": target, "player_win_rate": round(rate, 4), "points": played,
+                                      **reference}
+
+    # Written under another name first so the game never reads half a file
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(partial, path)
+
+
+def parse_target(text):
+    level, _, rate = text.rpartition("=")
+    if level not in RIGHT_POLICIES:
+        raise argparse.ArgumentTypeError(f"unknown level {level!r}, expected one of {', '.join(RIGHT_POLICIES)}")
+    try:
+        return level, float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad win rate {rate!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the AI levels to target player win rates")
+    parser.add_argument("--target", type=parse_target, action="append", default=[],
+                        help='LEVEL=RATE, player match win rate to aim for, e.g. "Normie=0.5" (default: '
+                             + ", ".join(f"{level}={rate}" for level, rate in DEFAULT_TARGETS.items()) + ")")
+    parser.add_argument("--candidates", type=int, default=16, help="settings tried per round")
+    parser.add_argument("--slots", type=int, default=512, help="matches played per candidate")
+    parser.add_argument("--ticks", type=int, default=20000,
+                        help="ticks each round is played for; rallies against good levels run to thousands")
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracker-error", type=float, default=0.6,
+                        help="reference player's aim error in paddle heights; lower is a stronger player")
+    parser.add_argument("--output", default=PARAMS_FILE)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per level)")
+    args = parser.parse_args()
+
+    targets = dict(args.target) or DEFAULT_TARGETS
+    options = {"candidates": args.candidates, "slots": args.slots, "ticks": args.ticks, "rounds": args.rounds,
+               "seed": args.seed, "tracker_error": args.tracker_error}
+    jobs = [(level, target, options) for level, target in targets.items()]
+
+    calibrated = {}
+    with ProcessPoolExecutor(args.workers or len(jobs)) as pool:
+        for level, target, params, before, rate, played, elapsed in pool.map(_calibrate_job, jobs):
+            values = ", ".join(f"{key} {value:.3g}" for key, value in params.items())
+            print(f"{level:<15} target {target:>5.0%}  was {before:>6.1%}  now {rate:>6.1%} over {played} points "
+                  f"in {elapsed:.1f}s: {values}")
+            if abs(rate - target) > MISS_WARNING:
+                print(f"{level} cannot reach its target within RANGES; widen them or change the target")
+            calibrated[level] = (params, target, rate, played)
+
+    write_params(args.output, calibrated, {"reference": "Tracker", "tracker_error": args.tracker_error})
+    print(f"Wrote {args.output}")
@@ -0,0 +1,121 @@
+"""
+State checksums for catching desyncs and behaviour changes.
+
+state_checksums() takes a snapshot of a match and returns one crc32 per
+group of fields (ball, paddles, scores, ...), so a mismatch says both that
+the state differs and roughly where. Replays can carry these sampled every
+few hundred ticks (cheap enough to leave on in the field) and verify()
+plays a replay back and reports the first sample that disagrees.
+first_divergence() compares two matches fed the same inputs tick by tick,
+for checking a refactor of the physics or the AI against the old code.
+
+    python checksum.py FILE   # verify a replay's checksums
+"""
+
+import sys
+import zlib
+
+from simulation import GameState
+
+# Fields hashed together, by snapshot field name
+CHECKSUM_GROUPS = (
+    ("ball", ("ball", "ball_dx", "ball_dy")),
+    ("paddles", ("left_paddle", "right_paddle")),
+    ("scores", ("left_score", "right_score", "winner", "game_over", "consecutive_ai_scores")),
+    ("effect", ("current_deception_effect", "deception_effect_start_tick",
+                "original_paddle_height", "is_reverse_controls")),
+    ("timing", ("tick", "trajectory_version", "knight_effect_due")),
+    ("ai", ("left_ai", "right_ai")),
+    ("decoys", ("deception_balls",)),
+)
+GROUP_NAMES = tuple(name for name, _ in CHECKSUM_GROUPS)
+
+# Ticks between checksums written into replays; every 5 seconds of play
+DEFAULT_CHECKSUM_INTERVAL = 300
+
+_LAYOUT = GameState.state_layout()
+_GROUP_SLICES = tuple(tuple(_LAYOUT[field] for field in fields) for _, fields in CHECKSUM_GROUPS)
+
+
+def state_checksums(match, buffer):
+    """One crc32 per CHECKSUM_GROUPS entry for the current state of match."""
+    match.snapshot(buffer)
+    crc32 = zlib.crc32
+    checksums = []
+    for slices in _GROUP_SLICES:
+        crc = 0
+        for part in slices:
+            crc = crc32(buffer[part], crc)
+        checksums.append(crc)
+    return tuple(checksums)
+
+
+def differing_groups(expected, actual):
+    """Names of the groups whose checksums differ."""
+    return [name for name, a, b in zip(GROUP_NAMES, expected, actual) if a != b]
+
+
+def first_divergence(match_a, match_b, inputs):
+    """
+    Step two matches with the same inputs and compare them every tick.
+    Returns (tick, differing groups) at the first mismatch, or None.
+    """
+    from replay import apply_inputs
+    buffer_a = match_a.new_state_buffer()
+    buffer_b = match_b.new_state_buffer()
+    for tick, value in enumerate(inputs, 1):
+        apply_inputs(match_a, value)
+        apply_inputs(match_b, value)
+        a = state_checksums(match_a, buffer_a)
+        b = state_checksums(match_b, buffer_b)
+        if a != b:
+            return tick, differing_groups(a, b)
+    return None
+
+
+def verify(replay, match=None):
+    """
+    Play a replay and compare against its recorded checksums. Returns None
+    if all agree, else (first bad tick, last good tick, differing groups);
+    the state first went wrong somewhere after the last good tick.
+    """
+    from replay import apply_inputs
+    if match is None:
+        match = replay.new_match()
+    buffer = match.new_state_buffer()
+    expected = iter(replay.checksums)
+    next_check = next(expected, None)
+    last_good = 0
+    for tick, value in enumerate(replay.inputs(), 1):
+        if next_check is None:
+            break
+        apply_inputs(match, value)
+        if tick == next_check[0]:
+            actual = state_checksums(match, buffer)
+            if actual != next_check[1]:
+                return tick, last_good, differing_groups(next_check[1], actual)
+            last_good = tick
+            next_check = next(expected, None)
+    return None
+
+
+if __name__ == "__main__":
+    from replay import Replay
+    if len(sys.argv) < 2:
+        print("Usage: python checksum.py FILE")
+        sys.exit(1)
+    try:
+        replay = Replay.load(sys.argv[1])
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"Error loading replay: {e}")
+        sys.exit(1)
+    if not replay.checksums:
+        print("Replay has no checksums")
+        sys.exit(1)
+    result = verify(replay)
+    if result is None:
+        print(f"OK: {len(replay.checksums)} checksums match")
+    else:
+        tick, last_good, groups = result
+        print(f"Diverged between tick {last_good} and {tick}: {', '.join(groups)}")
+        sys.exit(1)
@@ -0,0 +1,57 @@
+"""
+Dirty-rectangle bookkeeping for the match screen.
+
+Most frames of a match only move two paddles and a ball and maybe change
+a score, so repainting and flipping the whole screen is wasted work on
+big displays. DirtyRects remembers the screen rects drawn last frame and
+this frame: the game erases last frame's rects, draws the moving things
+and HUD text while add()ing their rects, and present() pushes just those
+regions with pygame.display.update(). A frame that has to repaint
+everything (the first one, after another screen was shown, effects that
+wash over the whole table) takes the full path and ends in a flip.
+"""
+
+import pygame
+
+
+class DirtyRects:
+    """Screen regions drawn in the last two frames."""
+
+    def __init__(self):
+        self.previous = []  # Drawn last frame: erased and pushed this frame
+        self.current = []  # Drawn this frame
+        self.full = True  # This frame repaints and flips the whole screen
+        self.covered = False  # This frame drew over everything, so the next one repaints too
+
+    def invalidate(self):
+        """Repaint the whole screen next frame, e.g. after another screen was shown."""
+        self.full = True
+
+    def begin(self, full=False, covered=False):
+        """
+        Start a frame. Returns True if the caller has to repaint the whole
+        screen, else it should erase every rect in previous first. covered
+        says this frame draws over the whole screen (colour washes,
+        overlays), which the next frame then has to clean up.
+        """
+        self.full = self.full or full or covered
+        self.covered = covered
+        self.current = []
+        return self.full
+
+    def add(self, rect):
+        """Note a rect drawn this frame; returns it."""
+        self.current.append(rect)
+        return rect
+
+    def extend(self, rects):
+        self.current.extend(rects)
+
+    def present(self):
+        """Push this frame to the display."""
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous = self.current
+        self.full = self.covered
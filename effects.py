@@ -0,0 +1,200 @@
+"""
+Deception mode effects.
+
+Every effect is an object with hooks the match calls: enter() when the
+effect starts, tick() on every tick it is active and exit() when it ends.
+The game window also calls render() to draw extras on top of the table
+and reads the flags to know what to hide; the headless engine never
+touches those. Effects without behaviour of their own are plain
+DeceptionEffect instances that only set flags.
+
+simulation.DECEPTION_EFFECTS is the registry of effects in play. Adding an
+effect means writing its hooks here and listing an instance there.
+"""
+
+import pygame
+
+
+class DeceptionEffect:
+    """An effect that only changes what is drawn; the base of all effects."""
+
+    per_tick = False  # tick() changes the match, so fast-forward has to step it
+    decoys = False  # Decoy balls are out
+    hides_left_paddle = False
+    hides_right_paddle = False
+    hides_ball = False
+    full_screen = False  # render() draws over the whole screen, so no dirty-rect frames
+    warning = None  # Shown to the player while the effect is active
+
+    def __init__(self, name, **flags):
+        self.name = name
+        for flag, value in flags.items():
+            if not hasattr(self, flag):
+                raise TypeError(f"Unknown effect flag: {flag}")
+            setattr(self, flag, value)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+    def enter(self, sim):
+        pass
+
+    def tick(self, sim):
+        pass
+
+    def exit(self, sim):
+        pass
+
+    def render(self, screen, match, decoys):
+        """
+        Draw on top of the table; decoys is the match's BallPoolRenderer.
+        Returns the screen rects drawn, if any.
+        """
+        return None
+
+
+# Active when no deception effect is, so callers never need a None check
+NO_EFFECT = DeceptionEffect(None)
+
+
+class DecoyBalls(DeceptionEffect):
+    """Decoys spawn at the centre and fly around with the real ball."""
+
+    per_tick = True
+    decoys = True
+
+    def __init__(self, name, count, **flags):
+        super().__init__(name, **flags)
+        self.count = count  # A number, or a (low, high) range to draw from
+
+    def enter(self, sim):
+        count = self.count
+        if isinstance(count, tuple):
+            count = sim.rng_effects.randint(*count)
+        sim.spawn_deception_balls(count)
+
+    def tick(self, sim):
+        sim.update_deception_balls()
+
+    def exit(self, sim):
+        sim.deception_balls.clear()
+
+    def render(self, screen, match, decoys):
+        return decoys.draw(screen)
+
+
+class ReverseControls(DeceptionEffect):
+    """Up moves the player's paddle down and the other way round."""
+
+    warning = "CONTROLS REVERSED!"
+
+    def enter(self, sim):
+        sim.is_reverse_controls = True
+
+    def exit(self, sim):
+        sim.is_reverse_controls = False
+
+
+class ShrinkingPaddles(DeceptionEffect):
+    """Both paddles shrink a little every tick, down to a quarter."""
+
+    per_tick = True
+
+    def __init__(self, name, factor, **flags):
+        super().__init__(name, **flags)
+        self.factor = factor
+
+    def enter(self, sim):
+        sim.original_paddle_height = sim.paddle_height
+
+    def tick(self, sim):
+        # Gradually shrink paddles, keeping them centered
+        smallest = sim.paddle_height / 4
+        for paddle in (sim.left_paddle, sim.right_paddle):
+            center = paddle.centery
+            paddle.height = max(paddle.height * self.factor, smallest)
+            paddle.y = center - paddle.height / 2
+
+    def exit(self, sim):
+        # Restore original paddle sizes and recenter paddles
+        for paddle in (sim.left_paddle, sim.right_paddle):
+            center = paddle.centery
+            paddle.height = sim.original_paddle_height
+            paddle.y = center - paddle.height / 2
+
+
+class TeleportingBall(DeceptionEffect):
+    """The ball now and then jumps to a random spot away from the paddles."""
+
+    per_tick = True
+
+    def __init__(self, name, chance, **flags):
+        super().__init__(name, **flags)
+        self.chance = chance  # Per tick
+
+    def tick(self, sim):
+        rng = sim.rng_effects
+        if rng.random() < self.chance:
+            safe_margin = sim.width / 5
+            sim.ball.x = rng.uniform(safe_margin, sim.width - safe_margin)
+            sim.ball.y = rng.uniform(sim.ball_size, sim.height - sim.ball_size)
+            sim.trajectory_version += 1
+
+
+class SpeedChanges(DeceptionEffect):
+    """The ball now and then speeds up or slows down."""
+
+    per_tick = True
+
+    def __init__(self, name, chance, low, high, **flags):
+        super().__init__(name, **flags)
+        self.chance = chance  # Per tick
+        self.low = low
+        self.high = high
+
+    def tick(self, sim):
+        rng = sim.rng_effects
+        if rng.random() < self.chance:
+            speed_factor = rng.uniform(self.low, self.high)
+            max_speed = sim.max_ball_speed
+            sim.ball_dx = max(min(sim.ball_dx * speed_factor, max_speed), -max_speed)
+            sim.ball_dy = max(min(sim.ball_dy * speed_factor, max_speed), -max_speed)
+            sim.trajectory_version += 1
+
+
+class GravityShift(DeceptionEffect):
+    """The ball falls towards the bottom and drifts sideways a little."""
+
+    per_tick = True
+
+    def __init__(self, name, gravity, drift, drift_chance, **flags):
+        super().__init__(name, **flags)
+        self.gravity = gravity  # Added to ball_dy every tick
+        self.drift = drift  # Largest change to ball_dx per drift
+        self.drift_chance = drift_chance  # Per tick
+
+    def tick(self, sim):
+        max_speed = sim.max_ball_speed
+        sim.ball_dy = min(sim.ball_dy + self.gravity, max_speed)
+        sim.trajectory_version += 1
+
+        rng = sim.rng_effects
+        if rng.random() < self.drift_chance:
+            sim.ball_dx += rng.uniform(-self.drift, self.drift)
+            sim.ball_dx = max(min(sim.ball_dx, max_speed), -max_speed)
+
+
+class ColorChaos(DeceptionEffect):
+    """A random colour wash over the table every frame."""
+
+    full_screen = True
+
+    def __init__(self, name, alpha, **flags):
+        super().__init__(name, **flags)
+        self.alpha = alpha
+
+    def render(self, screen, match, decoys):
+        overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        rng = match.rng_cosmetic
+        overlay.fill((rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255), self.alpha))
+        return [screen.blit(overlay, (0, 0))]
@@ -7,6 +7,14 @@ import time
 import gc  # Garbage collection
 from login import start_login_interface
 from users import update_stats
+from ball_pool import BallPoolRenderer
+from dirty_rects import DirtyRects
+from text_cache import TEXT_CACHE, render_text
+from table_view import TableView
+from replay import ReplayRecorder, INPUT_RESTART, apply_inputs
+from simulation import (MatchSimulation, TICK_RATE, INPUT_LEFT_UP, INPUT_LEFT_DOWN, INPUT_RIGHT_UP, INPUT_RIGHT_DOWN,
+                        EVENT_WALL_HIT, EVENT_PADDLE_HIT, EVENT_LEFT_SCORED, EVENT_RIGHT_SCORED,
+                        EVENT_GAME_OVER, EVENT_EFFECT_CHANGED)
 
 # Initialize Pygame
 pygame.init()
@@ -16,6 +24,17 @@ infoObject = pygame.display.Info()
 WIDTH, HEIGHT = infoObject.current_w, infoObject.current_h
 FULLSCREEN = True
 
+# The match is simulated in table units and scaled to the screen when drawn
+VIEW = TableView(WIDTH, HEIGHT)
+
+# Timing: physics always runs TICK_RATE ticks per second, rendering runs at
+# RENDER_FPS (0 = uncapped) and draws positions interpolated between ticks
+TICK_TIME = 1.0 / TICK_RATE
+RENDER_FPS = 144
+MAX_TICKS_PER_FRAME = 8  # Catch-up limit after a slow frame
+MAX_FRAME_TIME = 0.25  # Longer pauses (e.g. quote screens) are not caught up
+DIRTY_RECTS = True  # Push only the regions that changed instead of flipping the whole screen
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -32,32 +51,6 @@ NEON_RED = (255, 50, 50)
 NEON_GREEN = (0, 255, 128)
 NEON_PURPLE = (200, 0, 255)
 
-# Game parameters - adjusted for screen size
-PADDLE_WIDTH = int(WIDTH * 0.01)  # 1% of screen width
-PADDLE_HEIGHT = int(HEIGHT * 0.15)  # 15% of screen height
-BALL_SIZE = int(min(WIDTH, HEIGHT) * 0.025)  # 2.5% of smaller screen dimension
-PADDLE_SPEED = int(HEIGHT * 0.01)  # 1% of screen height
-BALL_SPEED_X = int(WIDTH * 0.005)  # 0.5% of screen width
-BALL_SPEED_Y = int(HEIGHT * 0.01)  # 1% of screen height
-
-# Maximum ball speed to prevent instability
-MAX_BALL_SPEED = int(min(WIDTH, HEIGHT) * 0.02)  # Cap at 2% of screen dimension
-
-# Deception mode parameters
-DECEPTION_EFFECT_DURATION = 10  # Duration of each effect in seconds
-DECEPTION_EFFECTS = [
-    "INVISIBLE_ENEMY",      # Enemy paddle is invisible but still works
-    "INVISIBLE_PLAYER",     # Player paddle is invisible but still works
-    "BALL_MULTIPLY",        # Multiple balls appear
-    "INVISIBLE_BALL",       # Ball becomes invisible
-    "REVERSE_CONTROLS",     # Player controls are reversed
-    "SHRINKING_PADDLES",    # Paddles get smaller over time
-    "TELEPORTING_BALL",     # Ball randomly teleports
-    "SPEED_CHANGES",        # Ball randomly changes speed
-    "GRAVITY_SHIFT",        # Ball path affected by "gravity"
-    "COLOR_CHAOS"           # Screen colors rapidly change
-]
-
 # Font setup
 try:
     # First try to load the Alumni Sans SC font
@@ -105,8 +98,8 @@ def pre_render_text():
     """Pre-render commonly used text surfaces to improve performance"""
     global GAME_OVER_TEXT, RESTART_TEXT
     try:
-        GAME_OVER_TEXT = FONT.render("GAME OVER", True, NEON_RED)
-        RESTART_TEXT = FONT_SMALL.render("PRESS 'R' TO RESTART", True, NEON_BLUE)
+        GAME_OVER_TEXT = render_text(FONT, "GAME OVER", NEON_RED)
+        RESTART_TEXT = render_text(FONT_SMALL, "PRESS 'R' TO RESTART", NEON_BLUE)
     except Exception as e:
         print(f"Error pre-rendering text: {e}")
         # Create empty surfaces as fallback
@@ -149,22 +142,20 @@ def load_difficulty_logos():
 game_mode = None
 current_user = None
 opponent_user = "Computer"  # Default for PVC mode
-left_score = 0
-right_score = 0
-winner = None
+match = None  # MatchSimulation for the current match
+decoy_renderer = None  # Draws the decoy balls of the current match
+winner = None  # Display name of the winner once the match is over
 game_over = False
 ai_difficulty = None  # Initialize as None, will be set based on mode
 pvc_difficulty_selected = False  # Flag to track if difficulty has been selected
 consecutive_defeats = 0  # Track consecutive defeats in Knight of Hell mode
-consecutive_ai_scores = 0  # Track consecutive AI scores without player scoring
 displayed_thresholds = set()  # Track which quote thresholds have already been displayed
 
-# Deception mode variables
-current_deception_effect = None
-deception_effect_start_time = 0
-deception_balls = []  # For ball multiplication effect
-original_paddle_height = 0  # For shrinking paddles effect
-is_reverse_controls = False  # For reverse controls effect
+# Replay recording
+REPLAY_DIR = "replays"
+recorder = None  # ReplayRecorder for the current match, None while watching a replay
+replay_path = None  # Where the current recording is saved
+
 
 # Motivational quotes for consecutive defeats in Knight of Hell mode
 defeat_quotes = {
@@ -205,47 +196,62 @@ def play_other_sound():
     except:
         pass  # Silently fail if sound can't be played
 
-def reset_game():
-    global left_paddle, right_paddle, ball, ball_dx, ball_dy, left_score, right_score, winner, game_over, consecutive_ai_scores, displayed_thresholds
-    
-    # Paddle positions
-    left_paddle = pygame.Rect(30, HEIGHT//2 - PADDLE_HEIGHT//2, PADDLE_WIDTH, PADDLE_HEIGHT)
-    right_paddle = pygame.Rect(WIDTH-40, HEIGHT//2 - PADDLE_HEIGHT//2, PADDLE_WIDTH, PADDLE_HEIGHT)
-    
-    # Ball position
-    ball = pygame.Rect(WIDTH//2 - BALL_SIZE//2, HEIGHT//2 - BALL_SIZE//2, BALL_SIZE, BALL_SIZE)
-    
-    # Ball direction - use constants for stability
-    ball_dx = BALL_SPEED_X
-    ball_dy = BALL_SPEED_Y
-    
-    # Reset scores
-    left_score = 0
-    right_score = 0
+def save_replay():
+    """Write the current recording to disk, if there is anything to save."""
+    if recorder is None or recorder.ticks == 0:
+        return
+    try:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        recorder.save(replay_path)
+    except Exception as e:
+        print(f"Error saving replay: {e}")
+
+def reset_game(restart=False, replay=None):
+    global match, decoy_renderer, recorder, replay_path, winner, game_over, displayed_thresholds
+    
+    if restart and match is not None and match.mode == game_mode and match.difficulty == ai_difficulty:
+        # Same settings: restart in place so the recording carries on
+        match.reset()
+        if recorder is not None:
+            recorder.record(INPUT_RESTART, match)
+    elif replay is not None:
+        # Watching a replay: rebuild the recorded match, record nothing
+        save_replay()
+        match = replay.new_match()
+        recorder = None
+    else:
+        # Fresh match with paddles, ball and scores at their starting positions
+        save_replay()
+        match = MatchSimulation(game_mode, ai_difficulty)
+        recorder = ReplayRecorder.for_match(match, current_user)
+        replay_path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{game_mode}-{match.seed:016x}.brpl")
+    decoy_renderer = BallPoolRenderer(match.deception_balls, VIEW)
     
     # Reset game state
     winner = None
     game_over = False
-    consecutive_ai_scores = 0  # Reset consecutive AI scores
     displayed_thresholds = set()  # Reset displayed thresholds
     
     # Force garbage collection to clear memory
     gc.collect()
 
-def reset_ball():
-    global ball, ball_dx, ball_dy
-    ball.x = WIDTH//2 - BALL_SIZE//2
-    ball.y = HEIGHT//2 - BALL_SIZE//2
-    
-    # Reset to default speeds for stability
-    ball_dx = BALL_SPEED_X * (-1 if ball_dx < 0 else 1)
-    
-    # Randomize y direction slightly but with controlled range
-    ball_dy = random.uniform(-BALL_SPEED_Y, BALL_SPEED_Y)
-    
-    # Ensure ball is never moving too slowly in Y direction
-    if abs(ball_dy) < BALL_SPEED_Y * 0.3:
-        ball_dy = BALL_SPEED_Y * 0.3 * (1 if ball_dy >= 0 else -1)
+def interpolated_rects(previous_positions, alpha):
+    """
+    Screen rects of the paddles and ball drawn alpha of the way from their
+    positions before the last tick to the current ones. Serves and
+    teleports are not smoothed.
+    """
+    left, right, ball = match.left_paddle.copy(), match.right_paddle.copy(), match.ball.copy()
+    if previous_positions is None or alpha <= 0:
+        return VIEW.rect(left), VIEW.rect(right), VIEW.rect(ball)
+    left_y, right_y, ball_x, ball_y = previous_positions
+    alpha = min(alpha, 1.0)
+    left.y = left_y + (left.y - left_y) * alpha
+    right.y = right_y + (right.y - right_y) * alpha
+    if abs(ball.x - ball_x) <= 2 * match.max_ball_speed and abs(ball.y - ball_y) <= 2 * match.max_ball_speed:
+        ball.x = ball_x + (ball.x - ball_x) * alpha
+        ball.y = ball_y + (ball.y - ball_y) * alpha
+    return VIEW.rect(left), VIEW.rect(right), VIEW.rect(ball)
 
 def check_performance():
     global performance_issue_detected, last_gc_time, frame_times
@@ -278,404 +284,6 @@ def check_performance():
             # Emergency memory cleanup
             gc.collect()
 
-def computer_ai():
-    # Different AI behaviors based on difficulty
-    if game_mode == "PVC":
-        if ai_difficulty == "New Born":
-            new_born_ai()
-        elif ai_difficulty == "Normie":
-            normie_ai()
-        elif ai_difficulty == "Knight of Hell":
-            knight_of_hell_ai()
-    elif game_mode == "DECEPTION":
-        deception_ai()
-
-def new_born_ai():
-    """
-    Very basic AI - moves randomly and slowly, often misses the ball
-    """
-    # 40% chance to not move at all (simulate inattention)
-    if random.random() < 0.4:
-        return
-    
-    # 30% chance to move in wrong direction
-    if random.random() < 0.3:
-        if ball.centery > right_paddle.centery and right_paddle.top > 0:
-            right_paddle.y -= PADDLE_SPEED * 0.5  # Move slower than player
-        elif ball.centery < right_paddle.centery and right_paddle.bottom < HEIGHT:
-            right_paddle.y += PADDLE_SPEED * 0.5
-    else:
-        # Otherwise move correctly but slowly
-        if ball.centery > right_paddle.centery and right_paddle.bottom < HEIGHT:
-            right_paddle.y += PADDLE_SPEED * 0.6
-        elif ball.centery < right_paddle.centery and right_paddle.top > 0:
-            right_paddle.y -= PADDLE_SPEED * 0.6
-
-def normie_ai():
-    """
-    Standard AI - follows the ball competently but not perfectly
-    """
-    # Calculate target position with some offset based on ball direction
-    target_y = ball.centery
-    
-    # Add a small reaction delay
-    if ball.centery > right_paddle.centery + 10 and right_paddle.bottom < HEIGHT:
-        right_paddle.y += PADDLE_SPEED * 0.85
-    elif ball.centery < right_paddle.centery - 10 and right_paddle.top > 0:
-        right_paddle.y -= PADDLE_SPEED * 0.85
-
-def knight_of_hell_ai():
-    """
-    Expert AI - predicts ball trajectory, reacts quickly, and positions optimally
-    """
-    # Predict where the ball will be when it reaches the paddle's x position
-    if ball_dx > 0:  # Only predict when ball is moving toward AI paddle
-        # Calculate time to reach paddle
-        distance = right_paddle.x - ball.x
-        time_to_reach = distance / ball_dx if ball_dx != 0 else 0
-        
-        # Predict y position
-        predicted_y = ball.y + (ball_dy * time_to_reach)
-        
-        # Account for bounces off top/bottom walls
-        while predicted_y < 0 or predicted_y > HEIGHT:
-            if predicted_y < 0:
-                predicted_y = -predicted_y  # Reflect off top
-            if predicted_y > HEIGHT:
-                predicted_y = 2 * HEIGHT - predicted_y  # Reflect off bottom
-        
-        # Move faster than player and with perfect accuracy
-        speed_multiplier = 1.2
-        
-        # Add some "trick shots" - sometimes aim to hit with edge of paddle for more angle
-        if random.random() < 0.3:
-            if random.random() < 0.5:
-                # Aim to hit with top edge
-                predicted_y -= PADDLE_HEIGHT * 0.4
-            else:
-                # Aim to hit with bottom edge
-                predicted_y += PADDLE_HEIGHT * 0.4
-        
-        # Move toward predicted position
-        if predicted_y > right_paddle.centery + 5 and right_paddle.bottom < HEIGHT:
-            right_paddle.y += PADDLE_SPEED * speed_multiplier
-        elif predicted_y < right_paddle.centery - 5 and right_paddle.top > 0:
-            right_paddle.y -= PADDLE_SPEED * speed_multiplier
-    else:
-        # When ball moving away, return to center with some randomness
-        center_y = HEIGHT // 2 - PADDLE_HEIGHT // 2
-        if abs(right_paddle.y - center_y) > PADDLE_HEIGHT * 0.2:
-            if right_paddle.y > center_y:
-                right_paddle.y -= PADDLE_SPEED * 0.7
-            else:
-                right_paddle.y += PADDLE_SPEED * 0.7
-
-def deception_ai():
-    """
-    Unpredictable AI for deception mode - much smarter and more adaptive
-    """
-    global right_paddle, ball
-    
-    # Different behaviors based on the active deception effect
-    if current_deception_effect == "REVERSE_CONTROLS":
-        # In reverse controls, AI sometimes does the opposite to confuse player
-        if random.random() < 0.7:  # 70% chance of normal behavior (increased from 80%)
-            # Predict ball trajectory with added difficulty
-            if ball_dx > 0:  # Ball moving toward AI
-                # Predict future position with some randomness
-                distance = right_paddle.x - ball.x
-                time_to_reach = distance / ball_dx if ball_dx != 0 else 0
-                predicted_y = ball.y + (ball_dy * time_to_reach)
-                
-                # Add some randomness to prediction
-                predicted_y += random.randint(-20, 20)
-                
-                # Move toward predicted position with faster speed
-                speed_multiplier = random.uniform(1.0, 1.3)  # Variable speed
-                if predicted_y > right_paddle.centery + 5 and right_paddle.bottom < HEIGHT:
-                    right_paddle.y += PADDLE_SPEED * speed_multiplier
-                elif predicted_y < right_paddle.centery - 5 and right_paddle.top > 0:
-                    right_paddle.y -= PADDLE_SPEED * speed_multiplier
-            else:
-                # Return to center when ball moving away
-                center_y = HEIGHT // 2 - PADDLE_HEIGHT // 2
-                if abs(right_paddle.y - center_y) > PADDLE_HEIGHT * 0.2:
-                    if right_paddle.y > center_y:
-                        right_paddle.y -= PADDLE_SPEED * 0.7
-                    else:
-                        right_paddle.y += PADDLE_SPEED * 0.7
-        else:
-            # Deliberate wrong moves to confuse player
-            if ball.centery > right_paddle.centery and right_paddle.top > 0:
-                right_paddle.y -= PADDLE_SPEED * 1.2  # Move opposite with higher speed
-            elif ball.centery < right_paddle.centery and right_paddle.bottom < HEIGHT:
-                right_paddle.y += PADDLE_SPEED * 1.2
-    
-    elif current_deception_effect == "INVISIBLE_ENEMY" or current_deception_effect == "INVISIBLE_BALL":
-        # When AI paddle or ball is invisible, AI plays more aggressively
-        if ball_dx > 0:  # Ball moving toward AI
-            # Perfect prediction with higher speed
-            distance = right_paddle.x - ball.x
-            time_to_reach = distance / ball_dx if ball_dx != 0 else 0
-            predicted_y = ball.y + (ball_dy * time_to_reach)
-            
-            # Account for bounces
-            while predicted_y < 0 or predicted_y > HEIGHT:
-                if predicted_y < 0:
-                    predicted_y = -predicted_y
-                if predicted_y > HEIGHT:
-                    predicted_y = 2 * HEIGHT - predicted_y
-            
-            # Move with higher speed for advantage
-            speed_multiplier = 1.4
-            if predicted_y > right_paddle.centery + 5 and right_paddle.bottom < HEIGHT:
-                right_paddle.y += PADDLE_SPEED * speed_multiplier
-            elif predicted_y < right_paddle.centery - 5 and right_paddle.top > 0:
-                right_paddle.y -= PADDLE_SPEED * speed_multiplier
-    
-    elif current_deception_effect == "BALL_MULTIPLY":
-        # Focus on the real ball with high accuracy
-        if ball_dx > 0:
-            distance = right_paddle.x - ball.x
-            time_to_reach = distance / ball_dx if ball_dx != 0 else 0
-            predicted_y = ball.y + (ball_dy * time_to_reach)
-            
-            # More precise movement
-            if predicted_y > right_paddle.centery + 3 and right_paddle.bottom < HEIGHT:
-                right_paddle.y += PADDLE_SPEED * 1.2
-            elif predicted_y < right_paddle.centery - 3 and right_paddle.top > 0:
-                right_paddle.y -= PADDLE_SPEED * 1.2
-    
-    elif current_deception_effect == "SHRINKING_PADDLES":
-        # More aggressive to compensate for smaller paddle
-        if ball_dx > 0:
-            distance = right_paddle.x - ball.x
-            time_to_reach = distance / ball_dx if ball_dx != 0 else 0
-            predicted_y = ball.y + (ball_dy * time_to_reach)
-            
-            # Faster movement to compensate for smaller paddle
-            if predicted_y > right_paddle.centery + 2 and right_paddle.bottom < HEIGHT:
-                right_paddle.y += PADDLE_SPEED * 1.3
-            elif predicted_y < right_paddle.centery - 2 and right_paddle.top > 0:
-                right_paddle.y -= PADDLE_SPEED * 1.3
-    
-    else:
-        # Default AI behavior - play competently with some randomness
-        if random.random() < 0.9:  # 90% accurate
-            if ball.centery > right_paddle.centery and right_paddle.bottom < HEIGHT:
-                right_paddle.y += PADDLE_SPEED * random.uniform(0.9, 1.1)
-            elif ball.centery < right_paddle.centery and right_paddle.top > 0:
-                right_paddle.y -= PADDLE_SPEED * random.uniform(0.9, 1.1)
-        else:
-            # Occasional wrong move
-            if ball.centery > right_paddle.centery and right_paddle.top > 0:
-                right_paddle.y -= PADDLE_SPEED * 0.8
-            elif ball.centery < right_paddle.centery and right_paddle.bottom < HEIGHT:
-                right_paddle.y += PADDLE_SPEED * 0.8
-
-def handle_deception_effects():
-    global ball_dx, ball_dy, ball, left_paddle, right_paddle, current_deception_effect, deception_effect_start_time
-    global deception_balls, original_paddle_height, is_reverse_controls
-    
-    current_time = time.time()
-    
-    # Initialize effect if none is active
-    if current_deception_effect is None:
-        current_deception_effect = random.choice(DECEPTION_EFFECTS)
-        deception_effect_start_time = current_time
-        print(f"Starting deception effect: {current_deception_effect}")
-        
-        # Initialize effect-specific variables
-        if current_deception_effect == "BALL_MULTIPLY":
-            # Create 3-4 additional balls (increased from 2)
-            for _ in range(random.randint(3, 4)):
-                new_ball = pygame.Rect(WIDTH//2, HEIGHT//2, BALL_SIZE, BALL_SIZE)
-                new_dx = random.choice([-1, 1]) * BALL_SPEED_X * random.uniform(0.8, 1.2)
-                new_dy = random.choice([-1, 1]) * BALL_SPEED_Y * random.uniform(0.8, 1.2)
-                # Make some fake balls larger or smaller for added confusion
-                size_multiplier = random.uniform(0.8, 1.2)
-                new_size = int(BALL_SIZE * size_multiplier)
-                new_ball.width = new_ball.height = new_size
-                deception_balls.append({
-                    "ball": new_ball,
-                    "dx": new_dx,
-                    "dy": new_dy,
-                    "color": (
-                        random.randint(200, 255),
-                        random.randint(200, 255),
-                        random.randint(200, 255)
-                    ),
-                    "alpha": random.randint(180, 255),
-                    "size": new_size
-                })
-        elif current_deception_effect == "SHRINKING_PADDLES":
-            original_paddle_height = PADDLE_HEIGHT
-        elif current_deception_effect == "REVERSE_CONTROLS":
-            is_reverse_controls = True
-    
-    # Check if it's time to change the effect (every DECEPTION_EFFECT_DURATION seconds)
-    if current_time - deception_effect_start_time >= DECEPTION_EFFECT_DURATION:
-        # Clean up current effect
-        if current_deception_effect == "BALL_MULTIPLY":
-            deception_balls = []
-        elif current_deception_effect == "SHRINKING_PADDLES":
-            # Restore original paddle sizes
-            left_paddle.height = original_paddle_height
-            right_paddle.height = original_paddle_height
-            # Recenter paddles
-            left_paddle.y = left_paddle.centery - left_paddle.height // 2
-            right_paddle.y = right_paddle.centery - right_paddle.height // 2
-        elif current_deception_effect == "REVERSE_CONTROLS":
-            is_reverse_controls = False
-        
-        # Choose a new effect (different from the current one)
-        available_effects = [e for e in DECEPTION_EFFECTS if e != current_deception_effect]
-        current_deception_effect = random.choice(available_effects)
-        deception_effect_start_time = current_time
-        print(f"Changing to deception effect: {current_deception_effect}")
-        
-        # Initialize new effect
-        if current_deception_effect == "BALL_MULTIPLY":
-            # Create 3-4 additional balls with varying properties
-            for _ in range(random.randint(3, 4)):
-                new_ball = pygame.Rect(WIDTH//2, HEIGHT//2, BALL_SIZE, BALL_SIZE)
-                new_dx = random.choice([-1, 1]) * BALL_SPEED_X * random.uniform(0.8, 1.2)
-                new_dy = random.choice([-1, 1]) * BALL_SPEED_Y * random.uniform(0.8, 1.2)
-                # Make some fake balls larger or smaller for added confusion
-                size_multiplier = random.uniform(0.8, 1.2)
-                new_size = int(BALL_SIZE * size_multiplier)
-                new_ball.width = new_ball.height = new_size
-                deception_balls.append({
-                    "ball": new_ball,
-                    "dx": new_dx,
-                    "dy": new_dy,
-                    "color": (
-                        random.randint(200, 255),
-                        random.randint(200, 255),
-                        random.randint(200, 255)
-                    ),
-                    "alpha": random.randint(180, 255),
-                    "size": new_size
-                })
-        elif current_deception_effect == "SHRINKING_PADDLES":
-            original_paddle_height = PADDLE_HEIGHT
-        elif current_deception_effect == "REVERSE_CONTROLS":
-            is_reverse_controls = True
-    
-    # Apply the current effect
-    if current_deception_effect == "GRAVITY_SHIFT":
-        # Apply gravity effect to ball
-        ball_dy += 0.15  # Increased from 0.1 for more challenge
-        ball_dy = min(ball_dy, MAX_BALL_SPEED)  # Cap speed
-        
-        # Add slight horizontal drift for extra challenge
-        if random.random() < 0.05:  # 5% chance per frame
-            ball_dx += random.uniform(-0.1, 0.1)
-            ball_dx = max(min(ball_dx, MAX_BALL_SPEED), -MAX_BALL_SPEED)  # Cap speed
-    
-    elif current_deception_effect == "TELEPORTING_BALL":
-        # Random chance of teleporting
-        if random.random() < 0.02:  # 2% chance per frame (increased from 1%)
-            # Teleport ball to a random position that's not too close to paddles
-            safe_margin = WIDTH // 5  # Decreased safe margin to make it harder
-            ball.x = random.randint(safe_margin, WIDTH - safe_margin)
-            ball.y = random.randint(BALL_SIZE, HEIGHT - BALL_SIZE)
-    
-    elif current_deception_effect == "SPEED_CHANGES":
-        # Random chance of changing speed
-        if random.random() < 0.03:  # 3% chance per frame (increased from 2%)
-            speed_factor = random.uniform(0.7, 1.6)  # Wider range for more unpredictability
-            ball_dx *= speed_factor
-            ball_dy *= speed_factor
-            # Apply speed caps
-            ball_dx = max(min(ball_dx, MAX_BALL_SPEED), -MAX_BALL_SPEED)
-            ball_dy = max(min(ball_dy, MAX_BALL_SPEED), -MAX_BALL_SPEED)
-    
-    elif current_deception_effect == "SHRINKING_PADDLES":
-        # Gradually shrink paddles
-        shrink_factor = 0.9996  # Slightly faster shrinking (was 0.9998)
-        left_paddle.height = max(int(left_paddle.height * shrink_factor), PADDLE_HEIGHT // 4)  # Smaller minimum (was 1/3)
-        right_paddle.height = max(int(right_paddle.height * shrink_factor), PADDLE_HEIGHT // 4)
-        
-        # Keep paddles centered at their current position
-        left_paddle.y = left_paddle.centery - left_paddle.height // 2
-        right_paddle.y = right_paddle.centery - right_paddle.height // 2
-    
-    elif current_deception_effect == "BALL_MULTIPLY":
-        # Update all additional balls
-        for ball_data in deception_balls[:]:  # Use a copy to allow modifications
-            fake_ball = ball_data["ball"]
-            fake_ball.x += ball_data["dx"]
-            fake_ball.y += ball_data["dy"]
-            
-            # Random speed variations for extra challenge
-            if random.random() < 0.02:  # 2% chance per frame
-                ball_data["dx"] *= random.uniform(0.9, 1.1)
-                ball_data["dy"] *= random.uniform(0.9, 1.1)
-            
-            # Bounce off top and bottom walls
-            if fake_ball.top <= 0 or fake_ball.bottom >= HEIGHT:
-                ball_data["dy"] *= -1
-                if fake_ball.top < 0:
-                    fake_ball.y = 0
-                elif fake_ball.bottom > HEIGHT:
-                    fake_ball.y = HEIGHT - fake_ball.height
-            
-            # Bounce off paddles occasionally (looks like they can interact)
-            if fake_ball.colliderect(left_paddle) and random.random() < 0.7:
-                ball_data["dx"] = abs(ball_data["dx"]) * random.uniform(1.0, 1.1)
-            if fake_ball.colliderect(right_paddle) and random.random() < 0.7:
-                ball_data["dx"] = -abs(ball_data["dx"]) * random.uniform(1.0, 1.1)
-            
-            # Remove ball if it goes out of bounds horizontally
-            if fake_ball.right < 0 or fake_ball.left > WIDTH:
-                deception_balls.remove(ball_data)
-                
-                # Create a new ball to replace the removed one (maintain challenge)
-                if random.random() < 0.7:  # 70% chance to replace
-                    new_ball = pygame.Rect(WIDTH//2, HEIGHT//2, BALL_SIZE, BALL_SIZE)
-                    new_dx = random.choice([-1, 1]) * BALL_SPEED_X * random.uniform(0.8, 1.2)
-                    new_dy = random.choice([-1, 1]) * BALL_SPEED_Y * random.uniform(0.8, 1.2)
-                    size_multiplier = random.uniform(0.8, 1.2)
-                    new_size = int(BALL_SIZE * size_multiplier)
-                    new_ball.width = new_ball.height = new_size
-                    deception_balls.append({
-                        "ball": new_ball,
-                        "dx": new_dx,
-                        "dy": new_dy,
-                        "color": (
-                            random.randint(200, 255),
-                            random.randint(200, 255),
-                            random.randint(200, 255)
-                        ),
-                        "alpha": random.randint(180, 255),
-                        "size": new_size
-                    })
-
-def handle_knight_of_hell_effects():
-    global ball_dx, ball_dy, ball, left_paddle
-    
-    # Special effects for Knight of Hell mode with stability limits
-    if random.random() < 0.003:  # 0.3% chance per frame
-        effect = random.choice(["speed_burst", "ball_teleport"])
-        
-        if effect == "speed_burst":
-            # Sudden speed increase with cap
-            ball_dx *= 1.5
-            ball_dy *= 1.5
-            # Apply speed caps
-            ball_dx = max(min(ball_dx, MAX_BALL_SPEED), -MAX_BALL_SPEED)
-            ball_dy = max(min(ball_dy, MAX_BALL_SPEED), -MAX_BALL_SPEED)
-        elif effect == "ball_teleport" and ball_dx > 0:
-            # Teleport ball closer to player's paddle
-            safe_x = left_paddle.x + PADDLE_WIDTH * 3
-            safe_y = random.randint(PADDLE_HEIGHT, HEIGHT - PADDLE_HEIGHT)
-            # Ensure coordinates are within bounds
-            safe_x = max(min(safe_x, WIDTH - BALL_SIZE), 0)
-            safe_y = max(min(safe_y, HEIGHT - BALL_SIZE), 0)
-            ball.x = safe_x
-            ball.y = safe_y
-
 class AnimatedBackground:
     def __init__(self, width, height):
         self.width = width
@@ -748,14 +356,133 @@ class AnimatedBackground:
             # Fallback to simple fill
             screen.fill(BLACK)
 
-def draw_dashed_line():
+def draw_dashed_line(surface):
     for y in range(0, HEIGHT, 20):
-        pygame.draw.rect(screen, WHITE, (WIDTH//2 - 2, y, 4, 10))
+        pygame.draw.rect(surface, WHITE, (WIDTH//2 - 2, y, 4, 10))
 
-def draw_borders():
+def draw_borders(surface):
     for x in range(0, WIDTH, 20):
-        pygame.draw.rect(screen, WHITE, (x, 0, 10, 4))
-        pygame.draw.rect(screen, WHITE, (x, HEIGHT-4, 10, 4))
+        pygame.draw.rect(surface, WHITE, (x, 0, 10, 4))
+        pygame.draw.rect(surface, WHITE, (x, HEIGHT-4, 10, 4))
+
+# The empty table, drawn once: (size and colours it was drawn for, Surface)
+playfield = None
+
+def playfield_layer():
+    """
+    The empty table (background, center line and borders) as one surface
+    in the screen's format, rebuilt only when the resolution or colours change.
+    """
+    global playfield
+    key = (screen.get_size(), BLACK, WHITE)
+    if playfield is None or playfield[0] != key:
+        surface = pygame.Surface(key[0]).convert()
+        surface.fill(BLACK)
+        draw_dashed_line(surface)
+        draw_borders(surface)
+        playfield = (key, surface)
+    return playfield[1]
+
+def restore_playfield(rect):
+    """Repaint the empty table inside rect."""
+    screen.blit(playfield_layer(), rect, rect)
+
+# Game over scanlines: a white line every SCANLINE_SPACING rows, its alpha a
+# sine wave along y (SCANLINE_WAVE radians a row) moving SCANLINE_SPEED
+# radians per unit of animation time
+SCANLINE_SPACING = 4
+SCANLINE_WAVE = 0.01
+SCANLINE_SPEED = 2
+
+class GameOverScreen:
+    """
+    The game over overlay, panel, texts and restart button, built once when
+    a match ends. Animating it only scrolls the scanline texture and changes
+    the surface alpha of the panel's glow layers.
+    """
+    def __init__(self, winner, winner_color):
+        # Dark overlay and scanlines with a wave period of extra rows to scroll through
+        self.period = 2 * math.pi / SCANLINE_WAVE
+        rows = HEIGHT + SCANLINE_SPACING * (int(self.period // SCANLINE_SPACING) + 1)
+        overlay = pygame.Surface((WIDTH, rows), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 150))
+        for y in range(0, rows, SCANLINE_SPACING):
+            scan_alpha = 30 + int(20 * math.sin(y * SCANLINE_WAVE))
+            pygame.draw.line(overlay, (255, 255, 255, scan_alpha), (0, y), (WIDTH, y), 1)
+        self.scanlines = overlay.convert_alpha()
+
+        # Central panel
+        panel_width = int(WIDTH * 0.5)
+        panel_height = int(HEIGHT * 0.4)
+        panel_x = WIDTH//2 - panel_width//2
+        panel_y = HEIGHT//2 - panel_height//2
+
+        # Glow fill, inner and outer border. Their alpha pulses, this far below the
+        # outer border's; all are the same colour, so one surface is blitted in strips
+        self.glow_surface = pygame.Surface((panel_width, panel_height)).convert()
+        self.glow_surface.fill(NEON_RED)
+        self.glow = []
+        for i, fade in ((2, 80), (1, 40), (0, 0)):
+            rect = pygame.Rect(panel_x + i, panel_y + i, panel_width - i*2, panel_height - i*2)
+            if i == 2:
+                strips = [rect]
+            else:
+                strips = [pygame.Rect(rect.left, rect.top, rect.width, 1),
+                          pygame.Rect(rect.left, rect.bottom - 1, rect.width, 1),
+                          pygame.Rect(rect.left, rect.top + 1, 1, rect.height - 2),
+                          pygame.Rect(rect.right - 1, rect.top + 1, 1, rect.height - 2)]
+            self.glow.append((fade, strips))
+
+        # Diagonal corner accents
+        accent_length = 20
+        self.accents = pygame.Surface((panel_width, panel_height)).convert()
+        self.accents.fill(BLACK)
+        self.accents.set_colorkey(BLACK, pygame.RLEACCEL)
+        for x, y, dx, dy in ((0, 0, 1, 1), (panel_width, 0, -1, 1), (0, panel_height, 1, -1),
+                             (panel_width, panel_height, -1, -1)):
+            pygame.draw.line(self.accents, NEON_RED, (x, y), (x + dx * accent_length, y), 2)
+            pygame.draw.line(self.accents, NEON_RED, (x, y), (x, y + dy * accent_length), 2)
+        self.panel_pos = (panel_x, panel_y)
+
+        # "GAME OVER" and the winner with their glow layers, in one surface
+        blits = []
+        for font, text, color, center in ((FONT, "GAME OVER", NEON_RED, (WIDTH//2, panel_y + 50)),
+                                          (FONT_MEDIUM, f"{winner} WINS!", winner_color,
+                                           (WIDTH//2, panel_y + panel_height//2))):
+            for i in range(3):
+                glow_surf = render_text(font, text, color, glow=150 - i*40)
+                blits.append((glow_surf, glow_surf.get_rect(center=center).move(i, i)))
+            text_surf = render_text(font, text, color)
+            blits.append((text_surf, text_surf.get_rect(center=center)))
+        bounds = blits[0][1].unionall([rect for _, rect in blits])
+        self.texts = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        for surface, rect in blits:
+            self.texts.blit(surface, rect.move(-bounds.x, -bounds.y))
+        self.texts = self.texts.convert_alpha()
+        self.texts_pos = bounds.topleft
+
+        # Restart prompt with button styling
+        self.restart_button = AAA_Button(WIDTH//2 - 100, panel_y + panel_height - 60,
+                                         200, 40, "PRESS 'R' TO RESTART", NEON_BLUE)
+
+    def draw(self, screen, time_val):
+        # Scroll the scanlines by whole lines to the wave's current phase
+        offset = (time_val * SCANLINE_SPEED / SCANLINE_WAVE) % self.period
+        offset = SCANLINE_SPACING * round(offset / SCANLINE_SPACING)
+        screen.blit(self.scanlines, (0, 0), (0, offset, WIDTH, HEIGHT))
+
+        # Panel with pulsing border glow
+        border_alpha = 150 + int(50 * math.sin(time_val * 3))
+        for fade, strips in self.glow:
+            self.glow_surface.set_alpha(border_alpha - fade)
+            for rect in strips:
+                screen.blit(self.glow_surface, rect, (0, 0, rect.width, rect.height))
+        screen.blit(self.accents, self.panel_pos)
+
+        screen.blit(self.texts, self.texts_pos)
+
+        self.restart_button.update(time_val)
+        self.restart_button.draw(screen)
 
 def difficulty_selection_screen():
     global ai_difficulty, pvc_difficulty_selected
@@ -922,15 +649,15 @@ def difficulty_selection_screen():
                     screen.blit(logo, logo_rect)
                 else:
                     # Fallback if image not available
-                    no_image_text = FONT_SMALL.render("Image not available", True, WHITE)
+                    no_image_text = render_text(FONT_SMALL, "Image not available", WHITE)
                     screen.blit(no_image_text, (WIDTH//2 - no_image_text.get_width()//2, HEIGHT//2))
                 
                 # Draw difficulty description
-                desc_text = FONT_SMALL.render(difficulty_descriptions[selected_difficulty], True, color)
+                desc_text = render_text(FONT_SMALL, difficulty_descriptions[selected_difficulty], color)
                 screen.blit(desc_text, (WIDTH//2 - desc_text.get_width()//2, HEIGHT*3//4))
                 
                 # Draw navigation hint
-                backspace_hint = FONT_TINY.render("Press BACKSPACE to go back", True, (100, 100, 100))
+                backspace_hint = render_text(FONT_TINY, "Press BACKSPACE to go back", (100, 100, 100))
                 screen.blit(backspace_hint, (20, HEIGHT - backspace_hint.get_height() - 10))
                 
                 # Show for 3 seconds then proceed
@@ -942,7 +669,7 @@ def difficulty_selection_screen():
                 # Draw countdown
                 remaining_time = 3 - int((current_time_ms - difficulty_selection_time) / 1000)
                 if remaining_time > 0:
-                    time_text = FONT_SMALL.render(f"Starting in {remaining_time}...", True, WHITE)
+                    time_text = render_text(FONT_SMALL, f"Starting in {remaining_time}...", WHITE)
                     screen.blit(time_text, (WIDTH//2 - time_text.get_width()//2, HEIGHT*7//8))
         
         pygame.display.flip()
@@ -1026,7 +753,7 @@ def display_defeat_quote(screen, quote_text, defeat_count, force_exit=False):
             
             # Display a title
             title_text = "DEFEAT MESSAGE"
-            title_surf = FONT_LARGE.render(title_text, True, NEON_RED)
+            title_surf = render_text(FONT_LARGE, title_text, NEON_RED)
             title_rect = title_surf.get_rect(center=(WIDTH // 2, HEIGHT // 8))
             screen.blit(title_surf, title_rect)
             
@@ -1062,14 +789,14 @@ def display_defeat_quote(screen, quote_text, defeat_count, force_exit=False):
                     
                     # Special words highlighting
                     if "DANGEROUS" in line:
-                        line_surf = FONT.render(line, True, NEON_BLUE)
+                        line_surf = render_text(FONT, line, NEON_BLUE)
                     elif "STUPID" in line:
-                        line_surf = FONT.render(line, True, NEON_GREEN)
+                        line_surf = render_text(FONT, line, NEON_GREEN)
                     elif "SMART" in line:
-                        line_surf = FONT.render(line, True, NEON_GREEN)
+                        line_surf = render_text(FONT, line, NEON_GREEN)
                     else:
                         # Use smaller font for regular text
-                        line_surf = FONT_MEDIUM.render(line, True, color)
+                        line_surf = render_text(FONT_MEDIUM, line, color)
                     
                     # Center align all text
                     line_rect = line_surf.get_rect(center=(quote_x, y_offset))
@@ -1124,11 +851,11 @@ def display_defeat_quote(screen, quote_text, defeat_count, force_exit=False):
                 
                 # Draw each line
                 for line in lines:
-                    line_surf = font.render(line, True, NEON_RED)
+                    line_surf = render_text(font, line, NEON_RED)
                     line_rect = line_surf.get_rect(center=(quote_x, y_offset))
                     
                     # Simpler glow effect
-                    glow_surf = font.render(line, True, (NEON_RED[0]//2, NEON_RED[1]//2, NEON_RED[2]//2))
+                    glow_surf = render_text(font, line, (NEON_RED[0]//2, NEON_RED[1]//2, NEON_RED[2]//2))
                     glow_rect = glow_surf.get_rect(center=(quote_x+2, y_offset+2))
                     screen.blit(glow_surf, glow_rect)
                     
@@ -1141,14 +868,14 @@ def display_defeat_quote(screen, quote_text, defeat_count, force_exit=False):
             
             # Display defeat counter
             defeat_counter_text = f"Consecutive scores: {defeat_count}"
-            counter_surf = FONT_SMALL.render(defeat_counter_text, True, NEON_BLUE)
+            counter_surf = render_text(FONT_SMALL, defeat_counter_text, NEON_BLUE)
             counter_rect = counter_surf.get_rect(center=(WIDTH // 2, HEIGHT - 100))
             screen.blit(counter_surf, counter_rect)
             
             # Special warning for threshold 30
             if defeat_count >= 30:
                 warning_text = "YOU HAVE BEEN DEFEATED TOO MANY TIMES"
-                warning_surf = FONT_SMALL.render(warning_text, True, NEON_RED)
+                warning_surf = render_text(FONT_SMALL, warning_text, NEON_RED)
                 warning_rect = warning_surf.get_rect(center=(WIDTH // 2, HEIGHT - 150))
                 screen.blit(warning_surf, warning_rect)
             
@@ -1156,7 +883,7 @@ def display_defeat_quote(screen, quote_text, defeat_count, force_exit=False):
             if force_exit:
                 # For 30th defeat or higher, only allow exit
                 continue_text = "PRESS X TO EXIT GAME"
-                continue_surf = FONT_MEDIUM.render(continue_text, True, NEON_RED)
+                continue_surf = render_text(FONT_MEDIUM, continue_text, NEON_RED)
                 continue_rect = continue_surf.get_rect(center=(WIDTH // 2, HEIGHT - 50))
                 
                 # Pulsing effect
@@ -1165,12 +892,12 @@ def display_defeat_quote(screen, quote_text, defeat_count, force_exit=False):
                               min(255, NEON_RED[1] + pulse_intensity),
                               min(255, NEON_RED[2] + pulse_intensity))
                 
-                pulse_surf = FONT_MEDIUM.render(continue_text, True, pulse_color)
+                pulse_surf = render_text(FONT_MEDIUM, continue_text, pulse_color)
                 screen.blit(pulse_surf, continue_rect)
             else:
                 # Normal continue prompt
                 continue_text = "Press SPACE to continue"
-                continue_surf = FONT_SMALL.render(continue_text, True, WHITE)
+                continue_surf = render_text(FONT_SMALL, continue_text, WHITE)
                 continue_rect = continue_surf.get_rect(center=(WIDTH // 2, HEIGHT - 50))
                 screen.blit(continue_surf, continue_rect)
             
@@ -1190,7 +917,7 @@ def display_defeat_quote(screen, quote_text, defeat_count, force_exit=False):
             # Last resort emergency display if all else fails
             try:
                 screen.fill(BLACK)
-                error_text = FONT_SMALL.render("Error displaying quote. Press SPACE to continue.", True, WHITE)
+                error_text = render_text(FONT_SMALL, "Error displaying quote. Press SPACE to continue.", WHITE)
                 screen.blit(error_text, (WIDTH//2 - error_text.get_width()//2, HEIGHT//2))
                 pygame.display.flip()
             except:
@@ -1212,11 +939,14 @@ def display_defeat_quote(screen, quote_text, defeat_count, force_exit=False):
     
     return True  # Default to continue
 
-def run_game():
-    global screen, ball_dx, ball_dy, left_score, right_score, winner, game_over
+def run_game(replay=None):
+    """
+    Run the game. With a Replay the login and difficulty screens are
+    skipped and the recorded inputs are played back in real time.
+    """
+    global screen, winner, game_over
     global game_mode, current_user, opponent_user, ai_difficulty, pvc_difficulty_selected
-    global last_gc_time, performance_issue_detected, consecutive_defeats, consecutive_ai_scores, displayed_thresholds
-    global current_deception_effect, deception_effect_start_time, deception_balls, original_paddle_height, is_reverse_controls
+    global last_gc_time, performance_issue_detected, consecutive_defeats, displayed_thresholds
     
     try:
         # Set up display in fullscreen mode
@@ -1232,17 +962,22 @@ def run_game():
         
         # Main game loop with login screen handling
         while True:
-            # Login screen
-            game_mode, current_user = start_login_interface()
+            if replay is not None:
+                # Watching a replay: the settings come from the recording
+                game_mode, current_user = replay.mode, "Replay"
+            else:
+                # Login screen
+                game_mode, current_user = start_login_interface()
             
             if not game_mode or not current_user:
                 break  # User quit during login
             
-            # Initialize game objects
-            reset_game()
-            
             # Set opponent name and show difficulty selection for PVC mode
-            if game_mode == "PVC":
+            if game_mode == "PVC" and replay is not None:
+                opponent_user = "Computer"
+                ai_difficulty = replay.difficulty
+                pvc_difficulty_selected = True
+            elif game_mode == "PVC":
                 opponent_user = "Computer"
                 ai_difficulty = "Normie"  # Default AI difficulty for PVC mode
                 pvc_difficulty_selected = False
@@ -1259,8 +994,13 @@ def run_game():
                     ai_difficulty = "Deception"  # Set for deception mode
                 pvc_difficulty_selected = True  # Skip difficulty selection for other modes
             
-            # Create animated background for game
-            background = AnimatedBackground(WIDTH, HEIGHT)
+            # Initialize game objects
+            reset_game(replay=replay)
+            replay_ticks = replay.inputs() if replay is not None else None
+            replay_hold = 0  # Frames the game over screen has been shown during a replay
+            
+            dirty = DirtyRects()  # What to erase and push on the next frame
+            game_over_screen = None  # Built when the match ends
             
             # Force garbage collection before starting game loop
             gc.collect()
@@ -1270,12 +1010,14 @@ def run_game():
             clock = pygame.time.Clock()
             running = True
             current_time = 0
+            accumulator = 0.0  # Real time not yet simulated
+            last_frame_time = time.perf_counter()
+            previous_positions = None  # Paddle and ball positions before the last tick
             
             print(f"Starting game. defeat_quotes keys: {sorted(defeat_quotes.keys())}")
             
             while running:
                 frame_start_time = time.time()
-                current_time += 0.02
                 
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
@@ -1290,442 +1032,292 @@ def run_game():
                         # For testing, force display a quote when T is pressed
                         elif event.key == pygame.K_t:
                             print("TEST: Forcing quote display")
-                            consecutive_ai_scores = 5
+                            match.consecutive_ai_scores = 5
                             displayed_thresholds = set()  # Reset displayed thresholds for testing
-                            continue_game = display_defeat_quote(screen, defeat_quotes[5], consecutive_ai_scores)
+                            continue_game = display_defeat_quote(screen, defeat_quotes[5], match.consecutive_ai_scores)
+                            dirty.invalidate()
                             displayed_thresholds.add(5)  # Mark this threshold as displayed
                             if not continue_game:
                                 running = False
                                 return  # Exit the entire game
                         # Handle restart on game over
-                        elif game_over and event.key == pygame.K_r:
-                            # Reset the game and either restart or go back to difficulty selection
-                            reset_game()
+                        elif game_over and event.key == pygame.K_r and replay is None:
+                            # Either restart or go back to difficulty selection
                             if game_mode == "PVC":
                                 pvc_difficulty_selected = False  # Allow re-selecting difficulty
                                 # Show difficulty selection and check if user wants to go back
                                 if not difficulty_selection_screen():
                                     break  # Break out of game loop to go back to login screen
-                            # If not PVC or difficulty was selected, continue with the reset game
+                            # Start the new match once the difficulty is known
+                            reset_game(restart=True)
+                            previous_positions = None
+                            dirty.invalidate()
                 
-                if not game_over and pvc_difficulty_selected:
-                    # Key Presses for player 1 (left paddle)
-                    keys = pygame.key.get_pressed()
-                    
-                    # Handle regular or reversed controls
-                    if not is_reverse_controls:
-                        if keys[pygame.K_w] and left_paddle.top > 0:
-                            left_paddle.y -= PADDLE_SPEED
-                        if keys[pygame.K_s] and left_paddle.bottom < HEIGHT:
-                            left_paddle.y += PADDLE_SPEED
-                    else:
-                        # Reversed controls in deception mode
-                        if keys[pygame.K_s] and left_paddle.top > 0:
-                            left_paddle.y -= PADDLE_SPEED
-                        if keys[pygame.K_w] and left_paddle.bottom < HEIGHT:
-                            left_paddle.y += PADDLE_SPEED
-                    
-                    # Controls for player 2 (right paddle) in PVP mode
-                    if game_mode == "PVP":
-                        if keys[pygame.K_UP] and right_paddle.top > 0:
-                            right_paddle.y -= PADDLE_SPEED
-                        if keys[pygame.K_DOWN] and right_paddle.bottom < HEIGHT:
-                            right_paddle.y += PADDLE_SPEED
-                    else:
-                        # Computer controls right paddle in PVC and DECEPTION modes
-                        computer_ai()
-                    
-                    # Move Ball
-                    ball.x += ball_dx
-                    ball.y += ball_dy
-                    
-                    # Special effects for different modes
-                    if game_mode == "DECEPTION":
-                        handle_deception_effects()
-                    elif game_mode == "PVC" and ai_difficulty == "Knight of Hell":
-                        handle_knight_of_hell_effects()
-                    
-                    # Collisions with top and bottom walls
-                    if ball.top <= 0 or ball.bottom >= HEIGHT:
-                        ball_dy *= -1
-                        # Keep ball within bounds to prevent getting stuck
-                        if ball.top < 0:
-                            ball.y = 0
-                        elif ball.bottom > HEIGHT:
-                            ball.y = HEIGHT - BALL_SIZE
-                        play_other_sound()
-                    
-                    # Paddle collisions
-                    if ball.colliderect(left_paddle):
-                        # Calculate collision point for angle
-                        relative_intersect_y = (left_paddle.centery - ball.centery) / (PADDLE_HEIGHT / 2)
-                        
-                        # Ensure ball moves right
-                        ball_dx = abs(ball_dx)
-                        
-                        # Add a small increase to speed with each hit, up to a max
-                        ball_dx = min(ball_dx * 1.05, MAX_BALL_SPEED)
-                        
-                        # Adjust angle based on where the ball hits the paddle
-                        ball_dy = -relative_intersect_y * BALL_SPEED_Y
+                # Run every simulation tick that is due since the last frame
+                now = time.perf_counter()
+                frame_time = min(now - last_frame_time, MAX_FRAME_TIME)
+                accumulator += frame_time
+                last_frame_time = now
+                current_time += frame_time * 1.2  # Animation clock, same pace as before at 60 FPS
+                ticks_due = min(int(accumulator / TICK_TIME), MAX_TICKS_PER_FRAME)
+                accumulator = min(accumulator - ticks_due * TICK_TIME, TICK_TIME)
+                
+                for _ in range(ticks_due):
+                    if replay_ticks is not None and game_over:
+                        # Show the result for a moment, then follow the recording
+                        replay_hold += 1
+                        if replay_hold >= 120:
+                            replay_hold = 0
+                            inputs = next(replay_ticks, None)
+                            if inputs is None:
+                                running = False  # Replay finished
+                                break
+                            if inputs & INPUT_RESTART:
+                                reset_game(restart=True)
+                                previous_positions = None
+                
+                    if not game_over and pvc_difficulty_selected:
+                        # Remember where things were for render interpolation
+                        previous_positions = (match.left_paddle.y, match.right_paddle.y, match.ball.x, match.ball.y)
                         
-                        # Ensure ball doesn't get stuck in paddle
-                        ball.x = left_paddle.right
+                        if replay_ticks is not None:
+                            # Recorded inputs instead of the keyboard
+                            inputs = next(replay_ticks, None)
+                            if inputs is None:
+                                running = False  # Replay finished
+                                break
+                            events = apply_inputs(match, inputs)
+                        else:
+                            # Key Presses for both players, packed into simulation input bits
+                            keys = pygame.key.get_pressed()
+                            inputs = 0
+                            if keys[pygame.K_w]:
+                                inputs |= INPUT_LEFT_UP
+                            if keys[pygame.K_s]:
+                                inputs |= INPUT_LEFT_DOWN
+                            if keys[pygame.K_UP]:
+                                inputs |= INPUT_RIGHT_UP
+                            if keys[pygame.K_DOWN]:
+                                inputs |= INPUT_RIGHT_DOWN
                         
-                        play_paddle_hit_sound()
+                            # Advance physics, AI and effects by one tick
+                            events = match.step(inputs)
+                            recorder.record(inputs, match)
+                            if events & EVENT_GAME_OVER:
+                                save_replay()  # Keep finished matches even if the game is killed later
                     
-                    if ball.colliderect(right_paddle):
-                        # Calculate collision point for angle
-                        relative_intersect_y = (right_paddle.centery - ball.centery) / (PADDLE_HEIGHT / 2)
-                        
-                        # Ensure ball moves left
-                        ball_dx = -abs(ball_dx)
-                        
-                        # Add a small increase to speed with each hit, up to a max
-                        ball_dx = max(ball_dx * 1.05, -MAX_BALL_SPEED)
-                        
-                        # Adjust angle based on where the ball hits the paddle
-                        ball_dy = -relative_intersect_y * BALL_SPEED_Y
-                        
-                        # Ensure ball doesn't get stuck in paddle
-                        ball.x = right_paddle.left - BALL_SIZE
-                        
-                        play_paddle_hit_sound()
+                        if events & EVENT_EFFECT_CHANGED:
+                            print(f"Deception effect: {match.current_deception_effect}")
                     
-                    # Ensure ball speed in Y direction is capped
-                    ball_dy = max(min(ball_dy, MAX_BALL_SPEED), -MAX_BALL_SPEED)
+                        if events & EVENT_PADDLE_HIT:
+                            play_paddle_hit_sound()
+                        if events & (EVENT_WALL_HIT | EVENT_LEFT_SCORED | EVENT_RIGHT_SCORED):
+                            play_other_sound()
                     
-                    # Score
-                    if ball.left <= 0:
-                        right_score += 1
-                        play_other_sound()
-                        
-                        # For Knight of Hell mode, track consecutive AI scores
-                        if game_mode == "PVC" and ai_difficulty == "Knight of Hell":
-                            consecutive_ai_scores += 1
+                        # For Knight of Hell mode, show quotes for consecutive AI scores
+                        if events & EVENT_RIGHT_SCORED and game_mode == "PVC" and ai_difficulty == "Knight of Hell":
+                            consecutive_ai_scores = match.consecutive_ai_scores
                             print(f"DEBUG: AI scored! Consecutive AI scores: {consecutive_ai_scores}")
-                            
+                        
                             # Find the highest threshold that has been reached but not yet displayed
                             reached_threshold = None
                             quote_text = ""
                             force_exit = False
-                            
+                        
                             # Check thresholds in descending order
                             for threshold in sorted(defeat_quotes.keys(), reverse=True):
                                 if consecutive_ai_scores >= threshold and threshold not in displayed_thresholds:
                                     reached_threshold = threshold
                                     quote_text = defeat_quotes[threshold]
-                                    
+                                
                                     # Force exit only at 30th score
                                     if threshold >= 30:
                                         force_exit = True
                                         print("DEBUG: Force exit enabled at 30+ consecutive scores")
-                                    
+                                
                                     break
-                            
+                        
                             # Display quote if a new threshold has been reached
                             if reached_threshold is not None:
                                 print(f"DEBUG: New threshold {reached_threshold} reached with {consecutive_ai_scores} consecutive AI scores")
                                 # Pause and display the quote
                                 continue_game = display_defeat_quote(screen, quote_text, consecutive_ai_scores, force_exit)
+                                dirty.invalidate()
                                 # Mark this threshold as displayed
                                 displayed_thresholds.add(reached_threshold)
                                 print(f"DEBUG: Displayed thresholds now: {sorted(displayed_thresholds)}")
-                                
+                            
                                 if not continue_game:
                                     print("DEBUG: User chose to exit")
                                     running = False
-                                    continue  # Skip rest of loop
-                        
-                        reset_ball()
+                                    break  # Skip rest of loop
                     
-                    if ball.right >= WIDTH:
-                        left_score += 1
-                        play_other_sound()
-                        
-                        # Reset consecutive AI scores and displayed thresholds when player scores
-                        if game_mode == "PVC" and ai_difficulty == "Knight of Hell":
-                            consecutive_ai_scores = 0
-                            displayed_thresholds = set()  # Reset displayed thresholds
+                        # Reset displayed thresholds when player scores
+                        if events & EVENT_LEFT_SCORED and game_mode == "PVC" and ai_difficulty == "Knight of Hell":
+                            displayed_thresholds = set()
                             print(f"DEBUG: Player scored! Reset consecutive AI scores to 0 and cleared displayed thresholds")
-                        
-                        reset_ball()
                     
-                    # Check for winner based on difficulty level
-                    if game_mode == "PVC":
-                        # Different win scores based on difficulty
-                        if ai_difficulty == "New Born":
-                            win_score = 10
-                        elif ai_difficulty == "Normie":
-                            win_score = 20
-                        else:  # Knight of Hell
-                            win_score = 50
-                    else:
-                        # Default win score for PVP and DECEPTION modes
-                        win_score = 5
-                    
-                    # Check for winner
-                    if left_score >= win_score:
-                        winner = current_user
-                        game_over = True
-                        print(f"DEBUG: Player won")
-                        # Reset consecutive defeats if player wins against Knight of Hell
-                        if game_mode == "PVC" and ai_difficulty == "Knight of Hell":
-                            consecutive_defeats = 0
-                            consecutive_ai_scores = 0
-                            displayed_thresholds = set()  # Reset displayed thresholds
-                            print(f"DEBUG: Reset consecutive_defeats, consecutive_ai_scores to 0, and cleared displayed thresholds")
-                        # Update user stats
-                        try:
-                            update_stats(current_user, win=True)
-                        except:
-                            pass  # Continue even if stats update fails
-                    elif right_score >= win_score:
-                        if game_mode == "PVP":
-                            winner = opponent_user
-                        elif game_mode == "DECEPTION":
-                            winner = "DECEPTION AI"  # Custom name for deception mode
-                        else:
-                            winner = f"{ai_difficulty} AI"  # Only use difficulty name in PVC mode
+                        # Check for winner
+                        if events & EVENT_GAME_OVER and match.winner == "left":
+                            winner = current_user
+                            game_over = True
+                            print(f"DEBUG: Player won")
+                            # Reset consecutive defeats if player wins against Knight of Hell
+                            if game_mode == "PVC" and ai_difficulty == "Knight of Hell":
+                                consecutive_defeats = 0
+                                displayed_thresholds = set()  # Reset displayed thresholds
+                                print(f"DEBUG: Reset consecutive_defeats, consecutive_ai_scores to 0, and cleared displayed thresholds")
+                            # Update user stats (not for replays)
+                            try:
+                                if replay is None:
+                                    update_stats(current_user, win=True)
+                            except:
+                                pass  # Continue even if stats update fails
+                        elif events & EVENT_GAME_OVER:
+                            if game_mode == "PVP":
+                                winner = opponent_user
+                            elif game_mode == "DECEPTION":
+                                winner = "DECEPTION AI"  # Custom name for deception mode
+                            else:
+                                winner = f"{ai_difficulty} AI"  # Only use difficulty name in PVC mode
                         
-                        game_over = True
-                        print(f"DEBUG: AI/Opponent won")
+                            game_over = True
+                            print(f"DEBUG: AI/Opponent won")
                         
-                        # Check for consecutive defeats in Knight of Hell mode
-                        if game_mode == "PVC" and ai_difficulty == "Knight of Hell":
-                            consecutive_defeats += 1
-                            print(f"DEBUG: Increased consecutive_defeats to {consecutive_defeats}")
+                            # Check for consecutive defeats in Knight of Hell mode
+                            if game_mode == "PVC" and ai_difficulty == "Knight of Hell":
+                                consecutive_defeats += 1
+                                print(f"DEBUG: Increased consecutive_defeats to {consecutive_defeats}")
                             
-                            # Find the highest threshold that has been reached but not yet displayed
-                            reached_threshold = None
-                            quote_text = ""
-                            force_exit = False
+                                # Find the highest threshold that has been reached but not yet displayed
+                                reached_threshold = None
+                                quote_text = ""
+                                force_exit = False
                             
-                            # Check thresholds in descending order
-                            for threshold in sorted(defeat_quotes.keys(), reverse=True):
-                                if consecutive_defeats >= threshold and threshold not in displayed_thresholds:
-                                    reached_threshold = threshold
-                                    quote_text = defeat_quotes[threshold]
+                                # Check thresholds in descending order
+                                for threshold in sorted(defeat_quotes.keys(), reverse=True):
+                                    if consecutive_defeats >= threshold and threshold not in displayed_thresholds:
+                                        reached_threshold = threshold
+                                        quote_text = defeat_quotes[threshold]
                                     
-                                    # Force exit only at 30th defeat
-                                    if threshold >= 30:
-                                        force_exit = True
-                                        print("DEBUG: Force exit enabled at 30+ consecutive defeats")
+                                        # Force exit only at 30th defeat
+                                        if threshold >= 30:
+                                            force_exit = True
+                                            print("DEBUG: Force exit enabled at 30+ consecutive defeats")
                                     
-                                    break
+                                        break
                             
-                            # Display quote if a new threshold has been reached
-                            if reached_threshold is not None:
-                                print(f"DEBUG: New threshold {reached_threshold} reached with {consecutive_defeats} consecutive defeats")
-                                # Pause and display the quote
-                                continue_game = display_defeat_quote(screen, quote_text, consecutive_defeats, force_exit)
-                                # Mark this threshold as displayed
-                                displayed_thresholds.add(reached_threshold)
-                                print(f"DEBUG: Displayed thresholds now: {sorted(displayed_thresholds)}")
+                                # Display quote if a new threshold has been reached
+                                if reached_threshold is not None:
+                                    print(f"DEBUG: New threshold {reached_threshold} reached with {consecutive_defeats} consecutive defeats")
+                                    # Pause and display the quote
+                                    continue_game = display_defeat_quote(screen, quote_text, consecutive_defeats, force_exit)
+                                    dirty.invalidate()
+                                    # Mark this threshold as displayed
+                                    displayed_thresholds.add(reached_threshold)
+                                    print(f"DEBUG: Displayed thresholds now: {sorted(displayed_thresholds)}")
                                 
-                                if not continue_game:
-                                    print("DEBUG: User chose to exit")
-                                    running = False
-                                    continue  # Skip rest of loop
+                                    if not continue_game:
+                                        print("DEBUG: User chose to exit")
+                                        running = False
+                                        break  # Skip rest of loop
+                                else:
+                                    print(f"DEBUG: No quote found for {consecutive_defeats} defeats")
                             else:
-                                print(f"DEBUG: No quote found for {consecutive_defeats} defeats")
-                        else:
-                            print(f"DEBUG: Not Knight of Hell mode, no quote shown")
+                                print(f"DEBUG: Not Knight of Hell mode, no quote shown")
                         
-                        # Update user stats
-                        try:
-                            update_stats(current_user, win=False)
-                        except Exception as e:
-                            print(f"DEBUG: Failed to update stats: {e}")
+                            # Update user stats (not for replays)
+                            try:
+                                if replay is None:
+                                    update_stats(current_user, win=False)
+                            except Exception as e:
+                                print(f"DEBUG: Failed to update stats: {e}")
                 
-                # Update background
-                background.update()
+                if not running:
+                    continue  # Skip rendering, the game loop is ending
                 
                 # Drawing
+                effect = match.deception_effect
+                left_paddle, right_paddle, ball = interpolated_rects(previous_positions, accumulator / TICK_TIME)
                 try:
-                    # Clear screen with background
-                    screen.fill(BLACK)
-                    
-                    # Draw the animated background
-                    background.update()
-                    background.draw(screen)
-                    
-                    # Draw center line
-                    draw_dashed_line()
-                    
-                    # Draw borders
-                    draw_borders()
-                    
-                    # Apply color chaos effect if active
-                    if current_deception_effect == "COLOR_CHAOS" and not game_over:
-                        # Draw random colored overlay with low opacity
-                        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                        chaos_color = (
-                            random.randint(0, 255),
-                            random.randint(0, 255),
-                            random.randint(0, 255),
-                            50  # Low opacity
-                        )
-                        overlay.fill(chaos_color)
-                        screen.blit(overlay, (0, 0))
+                    # Color chaos and the game over overlay cover the whole screen,
+                    # anything else only redraws what moved or changed
+                    covered = game_over or effect.full_screen
+                    if dirty.begin(full=not DIRTY_RECTS, covered=covered):
+                        # Background, center line and borders in one blit
+                        screen.blit(playfield_layer(), (0, 0))
+                    else:
+                        # Erase last frame's paddles, ball, decoys and text
+                        for rect in dirty.previous:
+                            restore_playfield(rect)
                     
                     # Draw paddles (unless invisible in deception mode)
-                    if not (current_deception_effect == "INVISIBLE_PLAYER"):
-                        pygame.draw.rect(screen, GREEN, left_paddle)
-                    if not (current_deception_effect == "INVISIBLE_ENEMY"):
-                        pygame.draw.rect(screen, RED, right_paddle)
+                    if not effect.hides_left_paddle:
+                        dirty.add(pygame.draw.rect(screen, GREEN, left_paddle))
+                    if not effect.hides_right_paddle:
+                        dirty.add(pygame.draw.rect(screen, RED, right_paddle))
                     
                     # Draw ball (unless invisible in deception mode)
-                    if not (current_deception_effect == "INVISIBLE_BALL"):
-                        pygame.draw.circle(screen, WHITE, ball.center, BALL_SIZE // 2)
+                    if not effect.hides_ball:
+                        dirty.add(pygame.draw.circle(screen, WHITE, ball.center, VIEW.size(match.ball_size) // 2))
                     
-                    # Draw additional balls for multiplier effect
-                    if current_deception_effect == "BALL_MULTIPLY" and not game_over:
-                        for ball_data in deception_balls:
-                            fake_ball = ball_data["ball"]
-                            # Draw with varying colors, sizes, and alpha to make it more disorienting
-                            ball_color = ball_data.get("color", (200, 200, 255))
-                            ball_alpha = ball_data.get("alpha", 200)
-                            ball_radius = ball_data.get("size", BALL_SIZE) // 2
-                            
-                            # Create surface for the fake ball with alpha
-                            fake_ball_surface = pygame.Surface((fake_ball.width + 4, fake_ball.height + 4), pygame.SRCALPHA)
-                            pygame.draw.circle(fake_ball_surface, (*ball_color, ball_alpha), 
-                                            (fake_ball.width//2 + 2, fake_ball.height//2 + 2), ball_radius)
-                            
-                            # Add some glow to fake balls
-                            glow_radius = ball_radius + 2
-                            pygame.draw.circle(fake_ball_surface, (*ball_color, ball_alpha//2), 
-                                            (fake_ball.width//2 + 2, fake_ball.height//2 + 2), glow_radius)
-                            
-                            screen.blit(fake_ball_surface, (fake_ball.x - 2, fake_ball.y - 2))
+                    # Deception effect extras: decoy balls, color chaos
+                    if not game_over:
+                        dirty.extend(effect.render(screen, match, decoy_renderer) or ())
                     
                     # Draw scores
-                    left_score_text = FONT_LARGE.render(str(left_score), True, WHITE)
-                    right_score_text = FONT_LARGE.render(str(right_score), True, WHITE)
-                    screen.blit(left_score_text, (WIDTH//4, 20))
-                    screen.blit(right_score_text, (WIDTH - WIDTH//4 - right_score_text.get_width(), 20))
+                    left_score_text = render_text(FONT_LARGE, str(match.left_score), WHITE)
+                    right_score_text = render_text(FONT_LARGE, str(match.right_score), WHITE)
+                    dirty.add(screen.blit(left_score_text, (WIDTH//4, 20)))
+                    dirty.add(screen.blit(right_score_text, (WIDTH - WIDTH//4 - right_score_text.get_width(), 20)))
                     
                     # Draw player names
-                    left_name_text = FONT_SMALL.render(current_user, True, GREEN)
-                    right_name_text = FONT_SMALL.render(opponent_user, True, RED)
-                    screen.blit(left_name_text, (WIDTH//4, 80))
-                    screen.blit(right_name_text, (WIDTH - WIDTH//4 - right_name_text.get_width(), 80))
+                    left_name_text = render_text(FONT_SMALL, current_user, GREEN)
+                    right_name_text = render_text(FONT_SMALL, opponent_user, RED)
+                    dirty.add(screen.blit(left_name_text, (WIDTH//4, 80)))
+                    dirty.add(screen.blit(right_name_text, (WIDTH - WIDTH//4 - right_name_text.get_width(), 80)))
                     
                     # Display current deception effect if in deception mode
                     if game_mode == "DECEPTION" and not game_over:
                         # Don't show the active effect name to player
                         effect_text = "DECEPTION MODE ACTIVE"
-                        effect_surface = FONT_SMALL.render(effect_text, True, NEON_PURPLE)
-                        screen.blit(effect_surface, (WIDTH // 2 - effect_surface.get_width() // 2, 10))
+                        effect_surface = render_text(FONT_SMALL, effect_text, NEON_PURPLE)
+                        dirty.add(screen.blit(effect_surface, (WIDTH // 2 - effect_surface.get_width() // 2, 10)))
                         
                         # Show effect timer without naming the effect
-                        time_left = int(DECEPTION_EFFECT_DURATION - (time.time() - deception_effect_start_time))
+                        time_left = int(match.deception_time_left())
                         timer_text = f"Effect changes in: {time_left}s"
-                        timer_surface = FONT_TINY.render(timer_text, True, NEON_BLUE)
-                        screen.blit(timer_surface, (WIDTH // 2 - timer_surface.get_width() // 2, 50))
+                        timer_surface = render_text(FONT_TINY, timer_text, NEON_BLUE)
+                        dirty.add(screen.blit(timer_surface, (WIDTH // 2 - timer_surface.get_width() // 2, 50)))
                         
                         # Show visual indicator for reversed controls only (player needs to know this)
-                        if current_deception_effect == "REVERSE_CONTROLS":
-                            controls_text = "CONTROLS REVERSED!"
-                            controls_surface = FONT_TINY.render(controls_text, True, NEON_RED)
-                            screen.blit(controls_surface, (20, HEIGHT - 50))
+                        if effect.warning:
+                            controls_surface = render_text(FONT_TINY, effect.warning, NEON_RED)
+                            dirty.add(screen.blit(controls_surface, (20, HEIGHT - 50)))
                     
                     # Draw debug info
-                    debug_surf = FONT_TINY.render(f"Mode: {game_mode}, AI Scores: {consecutive_ai_scores}, Displayed: {sorted(displayed_thresholds) if displayed_thresholds else 'None'}", True, WHITE)
-                    screen.blit(debug_surf, (10, 10))
+                    debug_surf = render_text(FONT_TINY, f"Mode: {game_mode}, AI Scores: {match.consecutive_ai_scores}, Displayed: {sorted(displayed_thresholds) if displayed_thresholds else 'None'}", WHITE)
+                    dirty.add(screen.blit(debug_surf, (10, 10)))
                     
-                    # Draw game over screen with AAA styling
-                    if game_over:
-                        # Create animated overlay with scan lines effect
-                        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                        overlay.fill((0, 0, 0, 150))
-                        
-                        # Add scan lines
-                        for y in range(0, HEIGHT, 4):
-                            scan_alpha = 30 + int(20 * math.sin(current_time * 2 + y * 0.01))
-                            pygame.draw.line(overlay, (255, 255, 255, scan_alpha), (0, y), (WIDTH, y), 1)
-                        
-                        screen.blit(overlay, (0, 0))
-                        
-                        # Create central panel
-                        panel_width = int(WIDTH * 0.5)
-                        panel_height = int(HEIGHT * 0.4)
-                        panel_x = WIDTH//2 - panel_width//2
-                        panel_y = HEIGHT//2 - panel_height//2
-                        
-                        # Draw panel background
-                        panel_surface = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-                        pygame.draw.rect(panel_surface, (20, 20, 30, 220), pygame.Rect(0, 0, panel_width, panel_height))
-                        
-                        # Add panel border with glow
-                        border_alpha = 150 + int(50 * math.sin(current_time * 3))
-                        for i in range(3):
-                            border_width = 2 - i
-                            alpha = border_alpha - (i * 40)
-                            if alpha > 0:
-                                pygame.draw.rect(panel_surface, (NEON_RED[0], NEON_RED[1], NEON_RED[2], alpha), 
-                                              pygame.Rect(i, i, panel_width-i*2, panel_height-i*2), border_width)
-                        
-                        # Add diagonal corner accents to panel
-                        accent_length = 20
-                        pygame.draw.line(panel_surface, NEON_RED, (0, 0), (accent_length, 0), 2)
-                        pygame.draw.line(panel_surface, NEON_RED, (0, 0), (0, accent_length), 2)
-                        pygame.draw.line(panel_surface, NEON_RED, (panel_width, 0), (panel_width-accent_length, 0), 2)
-                        pygame.draw.line(panel_surface, NEON_RED, (panel_width, 0), (panel_width, accent_length), 2)
-                        pygame.draw.line(panel_surface, NEON_RED, (0, panel_height), (accent_length, panel_height), 2)
-                        pygame.draw.line(panel_surface, NEON_RED, (0, panel_height), (0, panel_height-accent_length), 2)
-                        pygame.draw.line(panel_surface, NEON_RED, (panel_width, panel_height), (panel_width-accent_length, panel_height), 2)
-                        pygame.draw.line(panel_surface, NEON_RED, (panel_width, panel_height), (panel_width, panel_height-accent_length), 2)
-                        
-                        screen.blit(panel_surface, (panel_x, panel_y))
-                        
-                        # Draw "GAME OVER" text
-                        game_over_text = FONT.render("GAME OVER", True, NEON_RED)
-                        game_over_rect = game_over_text.get_rect(center=(WIDTH//2, panel_y + 50))
-                        
-                        # Add glow effect to game over text
-                        for i in range(3):
-                            glow_surf = FONT.render("GAME OVER", True, (*NEON_RED, 150 - i*40))
-                            glow_rect = glow_surf.get_rect(center=game_over_rect.center)
-                            glow_rect.x += i
-                            glow_rect.y += i
-                            screen.blit(glow_surf, glow_rect)
-                        
-                        screen.blit(game_over_text, game_over_rect)
-                        
-                        # Draw winner text
-                        if winner == current_user:
-                            winner_color = NEON_BLUE
-                        elif winner == opponent_user:
-                            winner_color = NEON_GREEN
-                        else:  # AI winner
-                            winner_color = NEON_RED
-                            # Consecutive defeats only count for Knight of Hell
-                            if not (game_mode == "PVC" and ai_difficulty == "Knight of Hell"):
-                                consecutive_defeats = 0
-                        
-                        winner_text = FONT_MEDIUM.render(f"{winner} WINS!", True, winner_color)
-                        winner_rect = winner_text.get_rect(center=(WIDTH//2, panel_y + panel_height//2))
-                        
-                        # Add glow to winner text
-                        for i in range(3):
-                            glow_surf = FONT_MEDIUM.render(f"{winner} WINS!", True, (*winner_color, 150 - i*40))
-                            glow_rect = glow_surf.get_rect(center=winner_rect.center)
-                            glow_rect.x += i
-                            glow_rect.y += i
-                            screen.blit(glow_surf, glow_rect)
-                        
-                        screen.blit(winner_text, winner_rect)
-                        
-                        # Draw restart prompt with button styling
-                        restart_button = AAA_Button(WIDTH//2 - 100, panel_y + panel_height - 60, 
-                                                 200, 40, "PRESS 'R' TO RESTART", NEON_BLUE)
-                        restart_button.update(current_time)
-                        restart_button.draw(screen)
+                    # Draw game over screen with AAA styling, built once per game over
+                    if not game_over:
+                        game_over_screen = None
+                    else:
+                        if game_over_screen is None:
+                            if winner == current_user:
+                                winner_color = NEON_BLUE
+                            elif winner == opponent_user:
+                                winner_color = NEON_GREEN
+                            else:  # AI winner
+                                winner_color = NEON_RED
+                                # Consecutive defeats only count for Knight of Hell
+                                if not (game_mode == "PVC" and ai_difficulty == "Knight of Hell"):
+                                    consecutive_defeats = 0
+                            game_over_screen = GameOverScreen(winner, winner_color)
+                        game_over_screen.draw(screen, current_time)
                     
-                    pygame.display.flip()
-                    clock.tick(60)
+                    dirty.present()
+                    clock.tick(RENDER_FPS)
                     
                 except Exception as e:
                     print(f"Error in game loop: {e}")
@@ -1733,10 +1325,11 @@ def run_game():
                     try:
                         # Simplified fallback rendering
                         screen.fill(BLACK)
-                        pygame.draw.rect(screen, WHITE, left_paddle)
-                        pygame.draw.rect(screen, WHITE, right_paddle)
-                        pygame.draw.ellipse(screen, WHITE, ball)
+                        pygame.draw.rect(screen, WHITE, VIEW.rect(match.left_paddle))
+                        pygame.draw.rect(screen, WHITE, VIEW.rect(match.right_paddle))
+                        pygame.draw.ellipse(screen, WHITE, VIEW.rect(match.ball))
                         pygame.display.flip()
+                        dirty.invalidate()
                         clock.tick(30)  # Slower framerate for recovery
                     except:
                         # If even fallback rendering fails, try to exit gracefully
@@ -1746,11 +1339,18 @@ def run_game():
                 check_performance()
             
             # End of game loop
+            
+            if replay is not None:
+                break  # Nothing to go back to after a replay
         
     except Exception as e:
         print(f"Critical error: {e}")
     
     finally:
+        # Keep the recording of the last match
+        save_replay()
+        print(f"DEBUG: Text cache {TEXT_CACHE.stats()}")
+        
         # Clean up resources
         try:
             pygame.quit()
@@ -1759,7 +1359,7 @@ def run_game():
 
 def draw_aaa_text(screen, text, x, y, color=NEON_BLUE, font=FONT_LARGE, glow=True, align='center'):
     """Draw text with AAA-style glow effect"""
-    text_surf = font.render(text, True, color)
+    text_surf = render_text(font, text, color)
     
     if align == 'center':
         text_rect = text_surf.get_rect(center=(x, y))
@@ -1771,7 +1371,7 @@ def draw_aaa_text(screen, text, x, y, color=NEON_BLUE, font=FONT_LARGE, glow=Tru
     if glow:
         # Draw glow layers
         for i in range(3):
-            glow_surf = font.render(text, True, (*color, 100 - i*30))
+            glow_surf = render_text(font, text, color, glow=100 - i*30)
             glow_rect = glow_surf.get_rect(center=text_rect.center)
             glow_rect.x += i
             glow_rect.y += i
@@ -1840,10 +1440,10 @@ class AAA_Button:
             pygame.draw.rect(screen, self.color, accent_rect)
             
             # Draw text with shadow
-            text_surf = FONT_MEDIUM.render(self.text, True, self.text_color)
+            text_surf = render_text(FONT_MEDIUM, self.text, self.text_color)
             
             # Shadow
-            shadow_surf = FONT_MEDIUM.render(self.text, True, (30, 30, 30))
+            shadow_surf = render_text(FONT_MEDIUM, self.text, (30, 30, 30))
             shadow_rect = shadow_surf.get_rect(center=(self.rect.center[0] + 2, self.rect.center[1] + 2))
             screen.blit(shadow_surf, shadow_rect)
             
@@ -1855,7 +1455,7 @@ class AAA_Button:
             # Fallback to simple button
             try:
                 pygame.draw.rect(screen, self.color, self.rect, 2)
-                text_surf = FONT_SMALL.render(self.text, True, WHITE)
+                text_surf = render_text(FONT_SMALL, self.text, WHITE)
                 text_rect = text_surf.get_rect(center=self.rect.center)
                 screen.blit(text_surf, text_rect)
             except:
@@ -1911,7 +1511,7 @@ def draw_difficulty_card(screen, difficulty, x, y, width, height, selected=False
     draw_aaa_text(screen, difficulty, x + width//2, y + 30, color, FONT_MEDIUM)
     
     # Draw difficulty description
-    desc_text = FONT_TINY.render(difficulty_descriptions[difficulty], True, WHITE)
+    desc_text = render_text(FONT_TINY, difficulty_descriptions[difficulty], WHITE)
     screen.blit(desc_text, (x + width//2 - desc_text.get_width()//2, y + height - 40))
     
     # Draw difficulty logo if available
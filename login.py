@@ -2,9 +2,10 @@ import pygame
 import sys
 import os
 import json
-import math
 import random
 from users import create_user, authenticate_user, get_top_scores
+from text_cache import render_text
+import widget_textures
 
 # Initialize Pygame
 pygame.init()
@@ -91,7 +92,7 @@ class InputBox:
         self.active_border = NEON_BLUE
         self.text = text
         self.placeholder = placeholder
-        self.txt_surface = FONT_SMALL.render(text, True, WHITE)
+        self.txt_surface = render_text(FONT_SMALL, text, WHITE)
         self.active = False
         self.password = password
         self.blink_timer = 0
@@ -150,9 +151,9 @@ class InputBox:
                 
                 # Re-render the text
                 if self.password:
-                    self.txt_surface = FONT_SMALL.render('•' * len(self.text), True, WHITE)
+                    self.txt_surface = render_text(FONT_SMALL, '•' * len(self.text), WHITE)
                 else:
-                    self.txt_surface = FONT_SMALL.render(self.text, True, WHITE)
+                    self.txt_surface = render_text(FONT_SMALL, self.text, WHITE)
         
         return None
 
@@ -209,26 +210,10 @@ class InputBox:
         else:
             current_border = self.border_color
         
-        # Create a gradient background
-        box_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        for y in range(self.rect.height):
-            # Subtle gradient
-            alpha = 220 - int(y * 0.5)
-            if alpha < 180: alpha = 180
-            pygame.draw.line(box_surface, (*self.color, alpha), 
-                           (0, y), (self.rect.width, y))
-        
-        # Draw the input box background with rounded corners
-        pygame.draw.rect(screen, self.color, self.rect, border_radius=4)
-        screen.blit(box_surface, self.rect)
-        
-        # Draw border with animation
+        # Gradient background, border with animation and inner highlight, prebuilt
         border_thickness = 1 + int(self.focus_animation * 1)
-        pygame.draw.rect(screen, current_border, self.rect, border_thickness, border_radius=4)
-        
-        # Add subtle inner highlight
-        inner_rect = self.rect.inflate(-4, -4)
-        pygame.draw.rect(screen, (255, 255, 255, 20), inner_rect, 1, border_radius=3)
+        screen.blit(widget_textures.input_box(self.rect.width, self.rect.height, self.color,
+                                              current_border, border_thickness), self.rect)
         
         # Draw icon if available
         text_offset = 0
@@ -238,7 +223,7 @@ class InputBox:
         
         # Show placeholder if no text and not active
         if not self.text and not self.active:
-            placeholder_surface = FONT_SMALL.render(self.placeholder, True, (120, 120, 120))
+            placeholder_surface = render_text(FONT_SMALL, self.placeholder, (120, 120, 120))
             screen.blit(placeholder_surface, (self.rect.x + 10 + text_offset, self.rect.y + (self.rect.height - placeholder_surface.get_height()) // 2))
         else:
             # Blit the text
@@ -280,10 +265,8 @@ class Button:
         self.icon = icon
         
         # Use smaller font for professional look
-        if len(text) > 12:
-            self.text_surface = FONT_TINY.render(text, True, WHITE)
-        else:
-            self.text_surface = FONT_SMALL.render(text, True, WHITE)
+        self.font = FONT_TINY if len(text) > 12 else FONT_SMALL
+        self.text_surface = render_text(self.font, text, WHITE)
             
         self.text_rect = self.text_surface.get_rect(center=self.rect.center)
         self.pill_shaped = pill_shaped
@@ -308,185 +291,51 @@ class Button:
     def draw(self, screen):
         self.animation_time += 0.05
         
-        # Create main button surface with transparency
-        button_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        
+        # Prebuilt gradient, border, highlights and glow for the current state
         if self.circle:
-            # Draw a circular button with professional styling
-            radius = min(self.rect.width, self.rect.height) // 2
-            center = (self.rect.width // 2, self.rect.height // 2)
-            
-            # Create gradient effect for background
-            for r in range(radius, 0, -1):
-                alpha = 180 - int((radius - r) * 1.5)
-                if alpha < 0: alpha = 0
-                pygame.draw.circle(button_surface, (*self.color, alpha), center, r)
-            
-            # Add outer glow if hovered
-            if self.hover:
-                for r in range(radius + 3, radius, -1):
-                    alpha = 40 - ((r - radius) * 10)
-                    if alpha < 0: alpha = 0
-                    pygame.draw.circle(button_surface, (*self.color, alpha), center, r)
-            
-            # Add border
-            pygame.draw.circle(button_surface, (*self.color, 255), center, radius, 2)
-            
-            # Add thin white border for contrast
-            pygame.draw.circle(button_surface, (255, 255, 255, 120), center, radius, 1)
-            
-            # Add inner highlight
-            pygame.draw.circle(button_surface, (255, 255, 255, 30), 
-                             (center[0] - 1, center[1] - 1), radius - 2, 1)
-            
-            # Apply ripple effect if active
-            if self.ripple_effect:
+            button_surface = widget_textures.circle_button(self.rect.width, self.rect.height, self.color, self.hover)
+        else:
+            color = self.color
+            if self.pressed:
+                color = self.pressed_color
+            elif self.hover:
+                color = self.hover_color
+            button_surface = widget_textures.button(self.rect.width, self.rect.height, self.color, color,
+                                                    self.pill_shaped, self.has_dot)
+        
+        # Apply ripple effect if active, to a copy: the texture is shared
+        if self.ripple_effect:
+            button_surface = button_surface.copy()
+            if self.circle:
                 pygame.draw.circle(button_surface, self.ripple_color,
                                  self.ripple_pos, self.ripple_radius)
                 self.ripple_radius += 1
                 self.ripple_alpha -= 2
-                if self.ripple_alpha <= 0:
-                    self.ripple_effect = False
-                self.ripple_color = (255, 255, 255, self.ripple_alpha)
-            
-            # Apply to screen
-            screen.blit(button_surface, self.rect)
-            
-            return
-        
-        # Non-circular buttons
-        if self.pill_shaped:
-            # Draw a professional pill-shaped button with subtle gradient
-            border_radius = self.rect.height // 2
-            
-            # Fill with gradient
-            for y in range(self.rect.height):
-                # Create vertical gradient
-                alpha = 220 - int(y * 0.8)
-                if alpha < 160: alpha = 160  # Keep minimum opacity
-                
-                color = self.color
-                if self.pressed:
-                    color = self.pressed_color
-                elif self.hover:
-                    color = self.hover_color
-                    
-                pygame.draw.line(button_surface, (*color, alpha), 
-                               (border_radius, y), (self.rect.width - border_radius, y))
-                
-                # Draw rounded ends of pill
-                if y < border_radius:
-                    # Calculate how far from the edge we need to draw
-                    dx = int(border_radius - math.sqrt(border_radius**2 - (y - border_radius)**2))
-                    if dx < 0: dx = 0
-                    pygame.draw.line(button_surface, (*color, alpha), 
-                                   (dx, y), (border_radius, y))
-                    pygame.draw.line(button_surface, (*color, alpha), 
-                                   (self.rect.width - border_radius, y), (self.rect.width - dx, y))
-                    
-                if y > self.rect.height - border_radius:
-                    bottom_y = self.rect.height - y - 1
-                    dx = int(border_radius - math.sqrt(border_radius**2 - (bottom_y - border_radius)**2))
-                    if dx < 0: dx = 0
-                    pygame.draw.line(button_surface, (*color, alpha), 
-                                   (dx, y), (border_radius, y))
-                    pygame.draw.line(button_surface, (*color, alpha), 
-                                   (self.rect.width - border_radius, y), (self.rect.width - dx, y))
-            
-            # Outer border
-            pygame.draw.rect(button_surface, self.color, button_surface.get_rect(), 2, 
-                          border_radius=border_radius)
-            
-            # Inner highlight for depth
-            inner_rect = button_surface.get_rect().inflate(-4, -4)
-            pygame.draw.rect(button_surface, (255, 255, 255, 30), inner_rect, 1, 
-                          border_radius=border_radius-2)
-            
-            # Bottom shadow for 3D effect
-            shadow_rect = pygame.Rect(2, self.rect.height-3, self.rect.width-4, 2)
-            pygame.draw.rect(button_surface, (0, 0, 0, 60), shadow_rect, 0, 
-                          border_radius=2)
-            
-            # Add dot if needed
-            if self.has_dot:
-                dot_x = 15
-                dot_y = self.rect.height // 2
-                # Draw dot with subtle gradient
-                for r in range(5, 0, -1):
-                    alpha = 220 - ((5 - r) * 40)
-                    pygame.draw.circle(button_surface, (*self.color, alpha), (dot_x, dot_y), r)
-                # Add highlight to dot
-                pygame.draw.circle(button_surface, (255, 255, 255, 100), (dot_x-1, dot_y-1), 2)
-        else:
-            # Standard rectangle button with professional styling
-            border_radius = 5
-            
-            # Background fill with gradient
-            for y in range(self.rect.height):
-                alpha = 220 - int(y * 0.8)
-                if alpha < 160: alpha = 160
-                
-                color = self.color
-                if self.pressed:
-                    color = self.pressed_color
-                elif self.hover:
-                    color = self.hover_color
-                    
-                pygame.draw.line(button_surface, (*color, alpha), 
-                               (border_radius, y), (self.rect.width - border_radius, y))
+            else:
+                # Create a circular ripple mask
+                ripple_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
+                pygame.draw.circle(ripple_surface, self.ripple_color, 
+                                self.ripple_pos, self.ripple_radius)
                 
-                # Handle rounded corners
-                if y < border_radius:
-                    dx = int(border_radius - math.sqrt(border_radius**2 - (y - border_radius)**2))
-                    if dx < 0: dx = 0
-                    pygame.draw.line(button_surface, (*color, alpha), 
-                                   (dx, y), (border_radius, y))
-                    pygame.draw.line(button_surface, (*color, alpha), 
-                                   (self.rect.width - border_radius, y), (self.rect.width - dx, y))
-                    
-                if y > self.rect.height - border_radius:
-                    bottom_y = self.rect.height - y - 1
-                    dx = int(border_radius - math.sqrt(border_radius**2 - (bottom_y - border_radius)**2))
-                    if dx < 0: dx = 0
-                    pygame.draw.line(button_surface, (*color, alpha), 
-                                   (dx, y), (border_radius, y))
-                    pygame.draw.line(button_surface, (*color, alpha), 
-                                   (self.rect.width - border_radius, y), (self.rect.width - dx, y))
-            
-            # Draw borders
-            pygame.draw.rect(button_surface, self.color, button_surface.get_rect(), 2, 
-                          border_radius=border_radius)
-            
-            # Inner highlight
-            inner_rect = button_surface.get_rect().inflate(-4, -4)
-            pygame.draw.rect(button_surface, (255, 255, 255, 30), inner_rect, 1, 
-                          border_radius=border_radius-1)
-        
-        # Apply ripple effect if active (for all non-circular buttons)
-        if self.ripple_effect:
-            # Create a circular ripple mask
-            ripple_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-            pygame.draw.circle(ripple_surface, self.ripple_color, 
-                            self.ripple_pos, self.ripple_radius)
-            
-            # Apply the ripple to the button
-            button_surface.blit(ripple_surface, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+                # Apply the ripple to the button
+                button_surface.blit(ripple_surface, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+                self.ripple_radius += 2
+                self.ripple_alpha -= 3
             
             # Update ripple animation
-            self.ripple_radius += 2
-            self.ripple_alpha -= 3
             if self.ripple_alpha <= 0:
                 self.ripple_effect = False
             self.ripple_color = (255, 255, 255, self.ripple_alpha)
         
         # Apply to screen
         screen.blit(button_surface, self.rect)
+        if self.circle:
+            return
         
         # Draw text with proper positioning and shadow for depth
         if self.text:
             # Text shadow for depth
-            shadow_surface = self.text_surface.copy()
-            shadow_surface.set_alpha(100)
+            shadow_surface = render_text(self.font, self.text, WHITE, glow=100)
             shadow_rect = self.text_rect.copy()
             shadow_rect.x += 1
             shadow_rect.y += 1
@@ -615,40 +464,15 @@ class MiniGameDemo:
 
 def draw_section_header(screen, rect, text, border_color):
     """Draw a section header with the given border color"""
-    # Create a subtle gradient background
-    gradient_surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-    for y in range(rect.height):
-        # Gradually darken from top to bottom
-        alpha = 220 - int(y * 0.5)
-        if alpha < 0: alpha = 0
-        pygame.draw.line(gradient_surface, (*SECTION_BG, alpha), 
-                       (0, y), (rect.width, y))
-    
-    # Draw section background
-    pygame.draw.rect(screen, SECTION_BG, rect, border_radius=3)
-    screen.blit(gradient_surface, rect)
-    
-    # Draw a subtle inset shadow effect
-    shadow_width = 2
-    for i in range(shadow_width):
-        alpha = 40 - (i * 10)
-        if alpha < 0: alpha = 0
-        shadow_rect = rect.inflate(-(i*2), -(i*2))
-        pygame.draw.rect(screen, (0, 0, 0, alpha), shadow_rect, 1, border_radius=3)
-    
-    # Draw professional border (slightly rounded corners, thinner)
-    pygame.draw.rect(screen, border_color, rect, 2, border_radius=3)
-    
-    # Add an inner highlight for a premium look
-    highlight_rect = rect.inflate(-4, -4)
-    pygame.draw.rect(screen, (*border_color, 30), highlight_rect, 1, border_radius=2)
+    # Gradient background, inset shadow, border and inner highlight, prebuilt
+    screen.blit(widget_textures.section_panel(rect.width, rect.height, SECTION_BG, border_color), rect)
     
     # Draw header text with a more professional font style
-    header_text = FONT_MEDIUM.render(text.upper(), True, WHITE)
+    header_text = render_text(FONT_MEDIUM, text.upper(), WHITE)
     header_rect = header_text.get_rect(midtop=(rect.centerx, rect.top + 15))
     
     # Add subtle text shadow for depth
-    shadow_text = FONT_MEDIUM.render(text.upper(), True, (0, 0, 0))
+    shadow_text = render_text(FONT_MEDIUM, text.upper(), (0, 0, 0))
     shadow_rect = shadow_text.get_rect(midtop=(header_rect.centerx + 1, header_rect.top + 1))
     screen.blit(shadow_text, shadow_rect)
     screen.blit(header_text, header_rect)
@@ -658,19 +482,7 @@ def draw_section_header(screen, rect, text, border_color):
     line_width = rect.width - 60
     
     # Draw line with gradient effect
-    line_surf = pygame.Surface((line_width, 2), pygame.SRCALPHA)
-    for x in range(line_width):
-        # Create gradient along the line
-        position = x / line_width
-        if position < 0.5:
-            alpha = int(position * 510)  # 0 to 255
-        else:
-            alpha = int((1 - position) * 510)  # 255 to 0
-        
-        if alpha > 255: alpha = 255
-        pygame.draw.line(line_surf, (*border_color, alpha), (x, 0), (x, 1))
-    
-    screen.blit(line_surf, (rect.left + 30, line_y))
+    screen.blit(widget_textures.divider(line_width, border_color), (rect.left + 30, line_y))
 
 def draw_score_item(screen, x, y, username, score, index, width):
     """Draw a single score item in the scores section as a square icon with professional styling"""
@@ -683,8 +495,6 @@ def draw_score_item(screen, x, y, username, score, index, width):
     item_x = x + col * (item_size + margin)
     item_y = y + row * (item_size + margin)
     
-    item_rect = pygame.Rect(item_x, item_y, item_size, item_size)
-    
     # Professional color scheme based on position
     if index < 8:  # First row uses lighter colors
         base_color = (210, 210, 210) if index == 0 else (180, 180, 180)
@@ -699,15 +509,6 @@ def draw_score_item(screen, x, y, username, score, index, width):
     brightness_factor = 1.0 - (col * 0.05)  # Subtle gradient across columns
     base_color = tuple(int(c * brightness_factor) for c in base_color)
     
-    # Create gradient surface for professional look
-    gradient_surface = pygame.Surface((item_size, item_size), pygame.SRCALPHA)
-    for y_offset in range(item_size):
-        # Calculate gradient intensity
-        gradient_factor = 1.0 - (y_offset / item_size * 0.2)  # Top to bottom gradient
-        pixel_color = tuple(int(c * gradient_factor) for c in base_color)
-        pygame.draw.line(gradient_surface, (*pixel_color, 255), 
-                       (0, y_offset), (item_size, y_offset))
-    
     # Border colors with premium styling
     if index == 0:  # First place
         border_color = NEON_RED
@@ -726,88 +527,50 @@ def draw_score_item(screen, x, y, username, score, index, width):
         glow_color = (120, 120, 120, 30)
         has_glow = False
     
-    # Draw base with rounded corners
-    pygame.draw.rect(screen, base_color, item_rect, border_radius=8)
-    screen.blit(gradient_surface, item_rect)
-    
-    # Add subtle shadow at bottom
-    shadow_rect = pygame.Rect(item_x + 2, item_y + item_size - 4, item_size - 4, 4)
-    shadow_surface = pygame.Surface((shadow_rect.width, shadow_rect.height), pygame.SRCALPHA)
-    for i in range(shadow_rect.height):
-        alpha = 40 - (i * 10)
-        if alpha < 0: alpha = 0
-        pygame.draw.line(shadow_surface, (0, 0, 0, alpha), 
-                       (0, i), (shadow_rect.width, i))
-    screen.blit(shadow_surface, shadow_rect)
-    
-    # Add subtle inner highlight at top
-    highlight_rect = pygame.Rect(item_x + 2, item_y + 2, item_size - 4, 2)
-    highlight_surf = pygame.Surface((highlight_rect.width, highlight_rect.height), pygame.SRCALPHA)
-    pygame.draw.rect(highlight_surf, (255, 255, 255, 30), 
-                   (0, 0, highlight_rect.width, highlight_rect.height))
-    screen.blit(highlight_surf, highlight_rect)
-    
-    # Draw premium border
-    pygame.draw.rect(screen, border_color, item_rect, 2, border_radius=8)
-    
-    # Add glow effect for top 3
-    if has_glow:
-        for i in range(1, 4):
-            glow_rect = item_rect.inflate(i*2, i*2)
-            glow_alpha = 30 - (i * 10)
-            if glow_alpha > 0:
-                pygame.draw.rect(screen, (*border_color, glow_alpha), 
-                               glow_rect, 1, border_radius=8 + i)
+    # Gradient, bottom shadow, top highlight, border and glow, prebuilt
+    pad = widget_textures.TILE_PAD
+    screen.blit(widget_textures.score_tile(item_size, base_color, border_color, has_glow),
+                (item_x - pad, item_y - pad))
     
     # Draw rank number with subtle shadow for depth
     rank_text = f"#{index + 1}"
     if index < 3:  # Special styling for top 3
-        rank_surf = FONT_SMALL.render(rank_text, True, number_color)
-        rank_shadow = FONT_SMALL.render(rank_text, True, (0, 0, 0))
+        rank_surf = render_text(FONT_SMALL, rank_text, number_color)
+        rank_shadow = render_text(FONT_SMALL, rank_text, (0, 0, 0), glow=70)  # Shadow with reduced alpha
     else:
-        rank_surf = FONT_TINY.render(rank_text, True, number_color)
-        rank_shadow = FONT_TINY.render(rank_text, True, (0, 0, 0))
+        rank_surf = render_text(FONT_TINY, rank_text, number_color)
+        rank_shadow = render_text(FONT_TINY, rank_text, (0, 0, 0), glow=70)
     
     rank_rect = rank_surf.get_rect(midtop=(item_x + item_size//2, item_y + 5))
     shadow_rect = rank_shadow.get_rect(midtop=(rank_rect.x + 1, rank_rect.y + 1))
     shadow_rect.x = rank_rect.x + 1
     shadow_rect.y = rank_rect.y + 1
     
-    # Apply shadow with reduced alpha
-    shadow_temp = rank_shadow.copy()
-    shadow_temp.set_alpha(70)
-    screen.blit(shadow_temp, shadow_rect)
+    screen.blit(rank_shadow, shadow_rect)
     screen.blit(rank_surf, rank_rect)
     
     # Draw username with truncation and professional styling
     max_name_len = 8
     display_name = username if len(username) <= max_name_len else username[:max_name_len-1] + "…"
     
-    name_surf = FONT_TINY.render(display_name, True, text_color)
-    name_shadow = FONT_TINY.render(display_name, True, (0, 0, 0))
+    name_surf = render_text(FONT_TINY, display_name, text_color)
+    name_shadow = render_text(FONT_TINY, display_name, (0, 0, 0), glow=70)  # Shadow with reduced alpha
     
     name_rect = name_surf.get_rect(center=(item_x + item_size//2, item_y + item_size//2))
     shadow_rect = name_shadow.get_rect(center=(name_rect.x + 1, name_rect.y + 1))
     
-    # Apply shadow with reduced alpha
-    shadow_temp = name_shadow.copy()
-    shadow_temp.set_alpha(70)
-    screen.blit(shadow_temp, shadow_rect)
+    screen.blit(name_shadow, shadow_rect)
     screen.blit(name_surf, name_rect)
     
     # Draw score at bottom with subtle highlight
     score_text = str(score)
-    score_surf = FONT_TINY.render(score_text, True, border_color)
-    score_glow = FONT_TINY.render(score_text, True, (255, 255, 255))
+    score_surf = render_text(FONT_TINY, score_text, border_color)
+    score_glow = render_text(FONT_TINY, score_text, (255, 255, 255), glow=30)  # Glow with reduced alpha
     
     score_rect = score_surf.get_rect(midbottom=(item_x + item_size//2, item_y + item_size - 8))
     glow_rect = score_glow.get_rect(midbottom=(score_rect.x, score_rect.y))
     
-    # Apply glow with reduced alpha
-    glow_temp = score_glow.copy()
-    glow_temp.set_alpha(30)
-    
-    screen.blit(glow_temp, (glow_rect.x - 1, glow_rect.y - 1))
+    screen.blit(score_glow, (glow_rect.x - 1, glow_rect.y - 1))
     screen.blit(score_surf, score_rect)
     
     # Add subtle divider line above score
@@ -834,6 +597,7 @@ def get_login_choice():
         "INVISIBLE_ENEMY",       # Enemy paddle is invisible but still works
         "INVISIBLE_PLAYER",      # Player paddle is invisible but still works
         "BALL_MULTIPLY",         # Multiple balls appear
+        "BALL_SWARM",            # A swarm of decoy balls appears
         "INVISIBLE_BALL",        # Ball becomes invisible
         "REVERSE_CONTROLS",      # Player controls are reversed
         "SHRINKING_PADDLES",     # Paddles get smaller over time
@@ -1152,17 +916,17 @@ def get_login_choice():
             
             # Draw error message if any
             if error_timer > 0:
-                error_surf = FONT_TINY.render(error_message, True, NEON_RED)
+                error_surf = render_text(FONT_TINY, error_message, NEON_RED)
                 screen.blit(error_surf, (sidebar_rect.centerx - error_surf.get_width()//2, 
                                       button_y + button_height + 15))
         else:
             # Draw welcome message
-            welcome_text = FONT_SMALL.render(f"WELCOME, {username.upper()}", True, NEON_GREEN)
+            welcome_text = render_text(FONT_SMALL, f"WELCOME, {username.upper()}", NEON_GREEN)
             screen.blit(welcome_text, (sidebar_rect.centerx - welcome_text.get_width()//2, 
                                     sidebar_rect.top + 50))
             
             # Draw game mode selection prompt
-            mode_text = FONT_TINY.render("SELECT GAME MODE:", True, WHITE)
+            mode_text = render_text(FONT_TINY, "SELECT GAME MODE:", WHITE)
             screen.blit(mode_text, (sidebar_rect.centerx - mode_text.get_width()//2, 
                                  sidebar_rect.top + 100))
             
@@ -1177,17 +941,17 @@ def get_login_choice():
                 deception_pvp_button.draw(screen)
                 
                 # Draw info about deception mode
-                deception_info = FONT_TINY.render("DECEPTION MODE INCLUDES:", True, NEON_PURPLE)
+                deception_info = render_text(FONT_TINY, "DECEPTION MODE INCLUDES:", NEON_PURPLE)
                 screen.blit(deception_info, (sidebar_rect.centerx - deception_info.get_width()//2, 
                                           sidebar_rect.bottom - 200))
                 
                 # List some of the deception effects
                 effect_y = sidebar_rect.bottom - 180
                 for i, effect in enumerate(deception_effects[:5]):
-                    effect_text = FONT_TINY.render(f"• {effect.replace('_', ' ')}", True, WHITE)
+                    effect_text = render_text(FONT_TINY, f"• {effect.replace('_', ' ')}", WHITE)
                     screen.blit(effect_text, (sidebar_rect.left + 30, effect_y + i * 20))
                 
-                more_effects = FONT_TINY.render("...AND MORE SURPRISES!", True, NEON_RED)
+                more_effects = render_text(FONT_TINY, "...AND MORE SURPRISES!", NEON_RED)
                 screen.blit(more_effects, (sidebar_rect.centerx - more_effects.get_width()//2, 
                                         effect_y + 5 * 20 + 10))
             
@@ -1211,7 +975,7 @@ def get_login_choice():
                 hover_desc = "Deception Mode vs Player - Double the chaos, double the fun!"
             
             if hover_desc:
-                desc_surf = FONT_TINY.render(hover_desc, True, WHITE)
+                desc_surf = render_text(FONT_TINY, hover_desc, WHITE)
                 desc_rect = desc_surf.get_rect(center=(sidebar_rect.centerx, sidebar_rect.bottom - 50))
                 
                 # Draw description background
@@ -1222,9 +986,9 @@ def get_login_choice():
                 screen.blit(desc_surf, desc_rect)
         
         # Draw app title at the bottom with superimposition
-        title_text1 = FONT_MEDIUM.render("BRINK", True, NEON_PURPLE)
-        title_text2 = FONT_MEDIUM.render("BRINK", True, NEON_BLUE)
-        title_text3 = FONT_MEDIUM.render("BRINK", True, NEON_RED)
+        title_text1 = render_text(FONT_MEDIUM, "BRINK", NEON_PURPLE)
+        title_text2 = render_text(FONT_MEDIUM, "BRINK", NEON_BLUE)
+        title_text3 = render_text(FONT_MEDIUM, "BRINK", NEON_RED)
         
         # Position the title texts with slight offsets for superimposition effect
         title_rect1 = title_text1.get_rect(bottomleft=(20, HEIGHT - 20))
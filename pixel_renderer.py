@@ -0,0 +1,210 @@
+"""
+Small offscreen frames of a match as NumPy arrays.
+
+For vision-based agents and visual tests. PixelRenderer draws one match
+into a preallocated surface of any size, 84x84 grayscale by default,
+straight through the surface's pixel array: paddles, ball and decoys in
+the game's colours, hiding whatever the deception effect hides and
+washing the frame with colour chaos. frame is a zero-copy view of the
+surface's pixels (pygame.surfarray.pixels2d/pixels3d) indexed [y, x],
+so it is valid until the next render() and needs no display at all.
+
+BatchPixelRenderer does the same for every slot of a BatchSimulation at
+once and produces a (count, height, width) uint8 array; both renderers
+draw a state to the same pixels.
+
+    python pixel_renderer.py   # frames per second
+"""
+import random
+
+import numpy as np
+import pygame
+
+from effects import ColorChaos
+from table_view import TableView
+
+# Colours of the game window (see game.py)
+BACKGROUND = (0, 0, 0)
+LEFT_PADDLE = (0, 255, 0)
+RIGHT_PADDLE = (255, 0, 0)
+BALL = (255, 255, 255)
+
+# Grayscale weights of red, green and blue (ITU-R BT.601 luma)
+LUMA = np.array([0.299, 0.587, 0.114])
+
+
+def gray(color):
+    """Grayscale value of an RGB colour, as the renderers draw it."""
+    return int(round(float(np.dot(color, LUMA))))
+
+
+class PixelRenderer:
+    """Draws a MatchSimulation into width x height pixels."""
+
+    def __init__(self, width=84, height=84, grayscale=True, seed=0):
+        self.width = width
+        self.height = height
+        self.grayscale = grayscale
+        self.view = TableView(width, height)
+        # Colour chaos tints come from here, so observing never moves the match's random streams
+        self.rng = random.Random(seed)
+
+        if grayscale:
+            self.surface = pygame.Surface((width, height), depth=8)
+            self.surface.set_palette([(i, i, i) for i in range(256)])
+            self.pixels = pygame.surfarray.pixels2d(self.surface)
+            self.frame = self.pixels.T
+            self.colors = {name: gray(color) for name, color in
+                           (("background", BACKGROUND), ("left", LEFT_PADDLE), ("right", RIGHT_PADDLE),
+                            ("ball", BALL))}
+        else:
+            self.surface = pygame.Surface((width, height), depth=24)
+            self.pixels = pygame.surfarray.pixels3d(self.surface)
+            self.frame = self.pixels.transpose(1, 0, 2)
+            self.colors = {"background": BACKGROUND, "left": LEFT_PADDLE, "right": RIGHT_PADDLE, "ball": BALL}
+        self._blend = np.empty(self.pixels.shape, dtype=np.uint16)
+
+    def _fill(self, box, color):
+        rect = self.view.rect(box)
+        self.pixels[max(rect.left, 0):max(rect.right, 0), max(rect.top, 0):max(rect.bottom, 0)] = color
+
+    def _draw_decoys(self, pool):
+        alive = np.flatnonzero(pool.alive)
+        if alive.size == 0:
+            return
+        view = self.view
+        xs = np.rint(pool.x[alive] * view.scale_x).astype(np.intp)
+        ys = np.rint(pool.y[alive] * view.scale_y).astype(np.intp)
+        colors = pool.colors[pool.tint[alive]]
+        if self.grayscale:
+            colors = np.rint(colors @ LUMA).astype(np.uint8)
+        # Each decoy is a ball-sized square, like the real ball at this size
+        size = view.size(float(pool.size[alive].mean()))
+        for ox in range(size):
+            x = xs + ox
+            for oy in range(size):
+                y = ys + oy
+                inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+                self.pixels[x[inside], y[inside]] = colors[inside]
+
+    def _color_chaos(self, alpha):
+        rng = self.rng
+        tint = (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
+        if self.grayscale:
+            tint = gray(tint)
+        blend = self._blend
+        np.multiply(self.pixels, 255 - alpha, out=blend, dtype=np.uint16)
+        blend += np.asarray(tint, dtype=np.uint16) * alpha
+        blend //= 255
+        self.pixels[...] = blend
+
+    def render(self, match):
+        """Draw match and return frame."""
+        colors = self.colors
+        self.pixels[...] = colors["background"]
+        effect = match.deception_effect
+
+        # Paddles and ball unless the deception effect hides them
+        if not effect.hides_left_paddle:
+            self._fill(match.left_paddle, colors["left"])
+        if not effect.hides_right_paddle:
+            self._fill(match.right_paddle, colors["right"])
+        if not effect.hides_ball:
+            self._fill(match.ball, colors["ball"])
+
+        # Deception extras, drawn only while the match is on like in the game
+        if not match.game_over:
+            if effect.decoys:
+                self._draw_decoys(match.deception_balls)
+            if isinstance(effect, ColorChaos):
+                self._color_chaos(effect.alpha)
+        return self.frame
+
+
+class BatchPixelRenderer:
+    """Draws every slot of a BatchSimulation into one grayscale array."""
+
+    def __init__(self, batch, width=84, height=84):
+        self.batch = batch
+        self.width = width
+        self.height = height
+        self.view = view = TableView(width, height)
+        self.frames = np.zeros((batch.count, height, width), dtype=np.uint8)
+        self.slots = np.arange(batch.count)
+
+        # Paddles never move sideways, so their columns are fixed
+        self.left_columns = self._span(batch.left_x, batch.paddle_width, view.scale_x)
+        self.right_columns = self._span(batch.right_x, batch.paddle_width, view.scale_x)
+        self.left_gray = gray(LEFT_PADDLE)
+        self.right_gray = gray(RIGHT_PADDLE)
+        self.ball_gray = gray(BALL)
+
+    @staticmethod
+    def _span(start, length, scale):
+        return slice(max(round(start * scale), 0), max(round((start + length) * scale), 0))
+
+    def _rows(self, y, height):
+        """First row and row count of a box per slot, rounded like TableView.rect()."""
+        scale = self.view.scale_y
+        top = np.rint(y * scale).astype(np.intp)
+        return top, np.rint((y + height) * scale).astype(np.intp) - top
+
+    def _fill_paddles(self, y, columns, value):
+        top, rows = self._rows(y, self.batch.paddle_height)
+        for oy in range(int(rows.max())):
+            row = top + oy
+            inside = (oy < rows) & (row >= 0) & (row < self.height)
+            self.frames[self.slots[inside], row[inside], columns] = value
+
+    def _fill_balls(self, value):
+        batch = self.batch
+        size = batch.ball_size
+        top, rows = self._rows(batch.ball_y, size)
+        scale = self.view.scale_x
+        left = np.rint(batch.ball_x * scale).astype(np.intp)
+        cols = np.rint((batch.ball_x + size) * scale).astype(np.intp) - left
+        for oy in range(int(rows.max())):
+            row = top + oy
+            inside = (oy < rows) & (row >= 0) & (row < self.height)
+            for ox in range(int(cols.max())):
+                col = left + ox
+                fill = inside & (ox < cols) & (col >= 0) & (col < self.width)
+                self.frames[self.slots[fill], row[fill], col[fill]] = value
+
+    def render(self):
+        """Draw every slot and return frames, (count, height, width) uint8."""
+        batch = self.batch
+        self.frames[...] = gray(BACKGROUND)
+        self._fill_paddles(batch.left_y, self.left_columns, self.left_gray)
+        self._fill_paddles(batch.right_y, self.right_columns, self.right_gray)
+        self._fill_balls(self.ball_gray)
+        return self.frames
+
+
+def benchmark(frames=2000, count=1024):
+    """Print frames per second for both renderers."""
+    import time
+
+    from batch_simulation import BatchSimulation
+    from simulation import MatchSimulation
+
+    match = MatchSimulation("DECEPTION", "Deception", seed=0)
+    renderer = PixelRenderer()
+    start = time.perf_counter()
+    for _ in range(frames):
+        match.step()
+        renderer.render(match)
+    print(f"PixelRenderer      {frames / (time.perf_counter() - start):>10.0f} frames/s (with DECEPTION steps)")
+
+    batch = BatchSimulation(count, "Normie", seed=0)
+    renderer = BatchPixelRenderer(batch)
+    ticks = max(frames // 20, 10)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        batch.step()
+        renderer.render()
+    print(f"BatchPixelRenderer {ticks * count / (time.perf_counter() - start):>10.0f} frames/s ({count} matches)")
+
+
+if __name__ == "__main__":
+    benchmark()
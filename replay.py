@@ -0,0 +1,373 @@
+"""
+Compact match replays.
+
+A match is fully determined by its mode, difficulty, seed, the computer
+players' tunables (ai.active_params()) and the input bits of every tick,
+so that is all a replay stores. Ticks with
+the same inputs are merged into runs and each run is written as one
+varint holding (length << 5 | inputs), then the runs are zlib-compressed.
+A whole Knight of Hell match takes a few kilobytes.
+
+Replays can also carry keyframes: the full match state, random streams
+included, every few thousand ticks. seek() restores the nearest keyframe
+and only re-simulates the ticks after it. Keyframes are usually added
+when replays are packed into an archive (see replay_archive.py).
+
+They can also carry state checksums every few hundred ticks; checksum.py
+plays a replay back and reports where the state stopped matching.
+
+Playing a replay feeds the inputs back into a MatchSimulation with the
+same seed, either headless as fast as possible or through run_game().
+
+    python replay.py FILE           # headless playback, prints the result
+    python replay.py FILE --watch   # real-time playback in the game window
+"""
+
+import json
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from ai import active_params, use_params
+from checksum import state_checksums, GROUP_NAMES, DEFAULT_CHECKSUM_INTERVAL
+from simulation import MatchSimulation, RNG_STREAMS
+
+# Restart the match instead of stepping it on this tick
+INPUT_RESTART = 16
+INPUT_BITS = 5
+
+MAGIC = b"BRPL"
+VERSION = 7
+CHECKSUMS = struct.Struct(f"<{len(GROUP_NAMES)}I")
+
+# Ticks between keyframes when they are added; about 30 seconds of play
+DEFAULT_KEYFRAME_INTERVAL = 1800
+
+# Mersenne Twister state words of a random.Random
+_MT_WORDS = 625
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_text(out, text):
+    raw = (text or "").encode("utf-8")[:255]
+    out.append(len(raw))
+    out += raw
+
+
+def _read_text(data, pos):
+    length = data[pos]
+    text = bytes(data[pos + 1:pos + 1 + length]).decode("utf-8")
+    return text or None, pos + 1 + length
+
+
+def save_keyframe(match, buffer):
+    """
+    Compressed full state of match: its GameState snapshot plus the state
+    of every random stream. buffer comes from match.new_state_buffer().
+    """
+    match.snapshot(buffer)
+    parts = [buffer.tobytes()]
+    for name in RNG_STREAMS:
+        _, words, gauss_next = getattr(match, "rng_" + name).getstate()
+        parts.append(np.array(words, dtype=np.uint32).tobytes())
+        parts.append(struct.pack("<?d", gauss_next is not None, gauss_next or 0.0))
+    pcg = match.deception_balls.rng.bit_generator.state
+    parts.append(pcg["state"]["state"].to_bytes(16, "little"))
+    parts.append(pcg["state"]["inc"].to_bytes(16, "little"))
+    parts.append(struct.pack("<BQ", pcg["has_uint32"], pcg["uinteger"]))
+    return zlib.compress(b"".join(parts))
+
+
+def load_keyframe(match, buffer, data):
+    """Put match back into the state saved by save_keyframe()."""
+    data = zlib.decompress(data)
+    pos = buffer.nbytes
+    buffer[:] = np.frombuffer(data, dtype=buffer.dtype, count=buffer.size)
+    match.restore(buffer)
+    for name in RNG_STREAMS:
+        words = tuple(np.frombuffer(data, dtype=np.uint32, count=_MT_WORDS, offset=pos).tolist())
+        pos += 4 * _MT_WORDS
+        has_gauss, gauss_next = struct.unpack_from("<?d", data, pos)
+        pos += 9
+        getattr(match, "rng_" + name).setstate((3, words, gauss_next if has_gauss else None))
+    bit_generator = match.deception_balls.rng.bit_generator
+    has_uint32, uinteger = struct.unpack_from("<BQ", data, pos + 32)
+    bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": int.from_bytes(data[pos:pos + 16], "little"),
+                  "inc": int.from_bytes(data[pos + 16:pos + 32], "little")},
+        "has_uint32": has_uint32,
+        "uinteger": uinteger,
+    }
+
+
+def _encode(replay):
+    header = bytearray(MAGIC)
+    header.append(VERSION)
+    _write_varint(header, replay.seed)
+    _write_text(header, replay.mode)
+    _write_text(header, replay.difficulty)
+    _write_text(header, replay.user)
+    params = json.dumps(replay.params, sort_keys=True, separators=(",", ":")).encode()
+    _write_varint(header, len(params))
+    header += params
+    _write_varint(header, replay.ticks)
+
+    _write_varint(header, len(replay.keyframes))
+    for tick, data in replay.keyframes:
+        _write_varint(header, tick)
+        _write_varint(header, len(data))
+        header += data
+
+    _write_varint(header, len(replay.checksums))
+    for tick, checksums in replay.checksums:
+        _write_varint(header, tick)
+        header += CHECKSUMS.pack(*checksums)
+
+    body = bytearray()
+    for inputs, length in replay.runs:
+        _write_varint(body, length << INPUT_BITS | inputs)
+    return bytes(header) + zlib.compress(bytes(body), 9)
+
+
+class ReplayRecorder:
+    """Collects the per-tick inputs of a match as runs."""
+
+    def __init__(self, mode, difficulty, seed, user=None, checksum_interval=DEFAULT_CHECKSUM_INTERVAL):
+        self.mode = mode
+        self.difficulty = difficulty
+        self.seed = seed
+        self.user = user
+        self.params = active_params()  # The AI tunables this match is played with
+        self.runs = []  # [inputs, length] pairs
+        self.ticks = 0
+        self.keyframes = []  # Recordings are kept small; keyframes are added later
+        self.checksum_interval = checksum_interval  # 0 turns checksums off
+        self.checksums = []  # (tick, group checksums) pairs
+        self.buffer = None
+
+    @classmethod
+    def for_match(cls, match, user=None, checksum_interval=DEFAULT_CHECKSUM_INTERVAL):
+        return cls(match.mode, match.difficulty, match.seed, user, checksum_interval)
+
+    def record(self, inputs, match=None):
+        """
+        Log the inputs of one tick (or INPUT_RESTART for a restart). Pass
+        the match after the tick was played to sample checksums.
+        """
+        runs = self.runs
+        if runs and runs[-1][0] == inputs:
+            runs[-1][1] += 1
+        else:
+            runs.append([inputs, 1])
+        self.ticks += 1
+
+        if match is not None and self.checksum_interval and self.ticks % self.checksum_interval == 0:
+            if self.buffer is None:
+                self.buffer = match.new_state_buffer()
+            self.checksums.append((self.ticks, state_checksums(match, self.buffer)))
+
+    def to_bytes(self):
+        return _encode(self)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+
+class Replay:
+    """A loaded replay: match settings, input runs and optional keyframes."""
+
+    def __init__(self, mode, difficulty, seed, runs, ticks, user=None, keyframes=None, checksums=None, params=None):
+        self.mode = mode
+        self.difficulty = difficulty
+        self.seed = seed
+        self.user = user
+        self.params = params  # Recorded AI tunables, None for the current ones
+        self.runs = runs
+        self.ticks = ticks
+        self.keyframes = keyframes or []  # (replay tick, compressed state) pairs
+        self.checksums = checksums or []  # (replay tick, group checksums) pairs
+
+    @classmethod
+    def from_bytes(cls, data):
+        if bytes(data[:4]) != MAGIC:
+            raise ValueError("not a replay file")
+        version = data[4]
+        if version < 4:
+            # Versions 1-3 stored a table size in pixels and replayed pixel physics
+            raise ValueError(f"replay version {version} was recorded with the old pixel physics")
+        if version < 6:
+            # Version 4 played the computer paddle with the per-tick AI and
+            # version 5 with coin-flip Knight of Hell trick shots
+            raise ValueError(f"replay version {version} was recorded with the old computer AI")
+        if version > VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        pos = 5
+        seed, pos = _read_varint(data, pos)
+        mode, pos = _read_text(data, pos)
+        difficulty, pos = _read_text(data, pos)
+        user, pos = _read_text(data, pos)
+        # Version 6 did not record the AI tunables; it plays with the current ones
+        params = None
+        if version >= 7:
+            length, pos = _read_varint(data, pos)
+            params = json.loads(bytes(data[pos:pos + length]))
+            pos += length
+        ticks, pos = _read_varint(data, pos)
+
+        keyframes = []
+        count, pos = _read_varint(data, pos)
+        for _ in range(count):
+            tick, pos = _read_varint(data, pos)
+            length, pos = _read_varint(data, pos)
+            keyframes.append((tick, bytes(data[pos:pos + length])))
+            pos += length
+
+        checksums = []
+        count, pos = _read_varint(data, pos)
+        for _ in range(count):
+            tick, pos = _read_varint(data, pos)
+            checksums.append((tick, CHECKSUMS.unpack_from(data, pos)))
+            pos += CHECKSUMS.size
+
+        body = zlib.decompress(data[pos:])
+        runs = []
+        pos = 0
+        mask = (1 << INPUT_BITS) - 1
+        while pos < len(body):
+            value, pos = _read_varint(body, pos)
+            runs.append((value & mask, value >> INPUT_BITS))
+        return cls(mode, difficulty, seed, runs, ticks, user, keyframes, checksums, params)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def to_bytes(self):
+        return _encode(self)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    def new_match(self):
+        """
+        A fresh MatchSimulation set up exactly like the recorded one, its
+        computer players on the recorded tunables.
+        """
+        match = MatchSimulation(self.mode, self.difficulty, seed=self.seed)
+        if self.params is not None:
+            for strategy in (match.left_ai, match.right_ai):
+                if strategy is not None:
+                    use_params(strategy, self.params)
+        return match
+
+    def inputs(self, start=0):
+        """Yield the inputs tick by tick, beginning at replay tick start."""
+        for inputs, length in self.runs:
+            if start >= length:
+                start -= length
+                continue
+            for _ in range(length - start):
+                yield inputs
+            start = 0
+
+    def add_keyframes(self, interval=DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Play the replay once and keep a keyframe every interval ticks.
+        Returns the match as it ends.
+        """
+        match = self.new_match()
+        buffer = match.new_state_buffer()
+        self.keyframes = []
+        for tick, inputs in enumerate(self.inputs()):
+            if tick and tick % interval == 0:
+                self.keyframes.append((tick, save_keyframe(match, buffer)))
+            apply_inputs(match, inputs)
+        return match
+
+    def seek(self, tick, match=None):
+        """
+        The match as it was after tick recorded ticks: restores the last
+        keyframe at or before tick and re-simulates from there.
+        """
+        if match is None:
+            match = self.new_match()
+        start = 0
+        for keyframe_tick, data in self.keyframes:
+            if keyframe_tick > tick:
+                break
+            start, keyframe = keyframe_tick, data
+        if start:
+            load_keyframe(match, match.new_state_buffer(), keyframe)
+        inputs = self.inputs(start)
+        for _ in range(min(tick, self.ticks) - start):
+            apply_inputs(match, next(inputs))
+        return match
+
+
+def apply_inputs(match, inputs):
+    """Play one recorded tick on match; returns the step events."""
+    if inputs & INPUT_RESTART:
+        match.reset()
+        return 0
+    return match.step(inputs)
+
+
+def play(replay, match=None):
+    """Run a replay headless and uncapped; returns the match at the end."""
+    if match is None:
+        match = replay.new_match()
+    for inputs, length in replay.runs:
+        if inputs & INPUT_RESTART:
+            for _ in range(length):
+                match.reset()
+            continue
+        step = match.step
+        for _ in range(length):
+            step(inputs)
+    return match
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python replay.py FILE [--watch]")
+        sys.exit(1)
+    try:
+        replay = Replay.load(sys.argv[1])
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"Error loading replay: {e}")
+        sys.exit(1)
+
+    if "--watch" in sys.argv[2:]:
+        from game import run_game
+        run_game(replay=replay)
+    else:
+        start = time.perf_counter()
+        match = play(replay)
+        elapsed = time.perf_counter() - start
+        print(f"{replay.mode} {replay.difficulty or ''} seed {replay.seed}: "
+              f"{match.left_score} - {match.right_score}, winner {match.winner}, "
+              f"{replay.ticks} ticks in {elapsed:.2f}s ({replay.ticks / elapsed:.0f} ticks/s)")
@@ -0,0 +1,225 @@
+"""
+Single-file archive for thousands of replays.
+
+Layout: a 24-byte header (magic, version, replay count, index offset),
+the replay blobs back to back, then a fixed-size index record per replay
+(match id, user, mode, difficulty, duration, final score, blob offset and
+length). The archive is memory-mapped and the index is read straight out
+of the map as a NumPy record array, so listing and filtering never touch
+the replay data and extracting or seeking one replay only reads its blob.
+
+Packing more replays appends their blobs and a new index after the old
+index and only then points the header at it, so an interrupted pack
+leaves the archive as it was. The old index stays behind as unused bytes.
+
+    python replay_archive.py pack ARCHIVE FILE... [--keyframe-interval N]
+    python replay_archive.py list ARCHIVE [--user U] [--mode M] [--min-ticks N]
+    python replay_archive.py extract ARCHIVE MATCH_ID OUT
+    python replay_archive.py seek ARCHIVE MATCH_ID TICK
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from replay import Replay, DEFAULT_KEYFRAME_INTERVAL, play
+
+MAGIC = b"BRAR"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQ")  # magic, version, count, index offset
+
+INDEX_DTYPE = np.dtype([
+    ("match_id", "<u8"),
+    ("user", "S32"),
+    ("mode", "S16"),
+    ("difficulty", "S16"),
+    ("ticks", "<u4"),
+    ("left_score", "<u2"),
+    ("right_score", "<u2"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+])
+
+
+class ReplayArchive:
+    """Read-only, memory-mapped view of an archive file."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, index_offset = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a replay archive")
+        self.index = np.frombuffer(self.map, dtype=INDEX_DTYPE, count=count, offset=index_offset)
+
+    def close(self):
+        self.index = None
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # Records still point into the map; it goes away with them
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def select(self, user=None, mode=None, min_ticks=0):
+        """Index records matching every given filter."""
+        keep = self.index["ticks"] >= min_ticks
+        if user is not None:
+            keep &= self.index["user"] == _field(user, "user")
+        if mode is not None:
+            keep &= self.index["mode"] == _field(mode, "mode")
+        return self.index[keep]
+
+    def find(self, match_id):
+        """Index record of match_id, or None."""
+        hits = np.flatnonzero(self.index["match_id"] == match_id)
+        return self.index[hits[0]].copy() if hits.size else None
+
+    def blob(self, record):
+        """Raw replay bytes of an index record."""
+        offset = int(record["offset"])
+        return self.map[offset:offset + int(record["length"])]
+
+    def replay(self, match_id):
+        record = self.find(match_id)
+        if record is None:
+            raise KeyError(match_id)
+        return Replay.from_bytes(self.blob(record))
+
+
+def _field(text, name):
+    """text as UTF-8 cut to the index field's size, on a character boundary."""
+    raw = (text or "").encode("utf-8")[:INDEX_DTYPE[name].itemsize]
+    return raw.decode("utf-8", "ignore").encode("utf-8")
+
+
+def _index_record(replay, match, offset, length):
+    return (replay.seed, _field(replay.user, "user"), _field(replay.mode, "mode"),
+            _field(replay.difficulty, "difficulty"), replay.ticks,
+            match.left_score, match.right_score, offset, length)
+
+
+def pack(path, replay_files, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+    """
+    Append replay files to the archive at path, creating it if needed.
+    Keyframes are added to replays that have none. Returns how many were added.
+    """
+    records = []
+    if os.path.exists(path):
+        with ReplayArchive(path) as archive:
+            records = [tuple(record) for record in archive.index]
+        f = open(path, "r+b")
+        f.seek(0, os.SEEK_END)  # The old index stays valid until the header moves on
+    else:
+        f = open(path, "wb")
+        f.write(HEADER.pack(MAGIC, VERSION, 0, HEADER.size))
+
+    added = 0
+    known = {record[0] for record in records}
+    with f:
+        for name in replay_files:
+            try:
+                replay = Replay.load(name)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {name}: {e}")
+                continue
+            if replay.seed in known:
+                print(f"Skipping {name}: match {replay.seed} already archived")
+                continue
+            if keyframe_interval and not replay.keyframes:
+                match = replay.add_keyframes(keyframe_interval)
+            else:
+                match = play(replay)
+            data = replay.to_bytes()
+            offset = f.tell()
+            f.write(data)
+            records.append(_index_record(replay, match, offset, len(data)))
+            known.add(replay.seed)
+            added += 1
+
+        index_offset = f.tell()
+        f.write(np.array(records, dtype=INDEX_DTYPE).tobytes())
+        # Everything the new header points at is on disk before it is written
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), index_offset))
+        f.flush()
+        os.fsync(f.fileno())
+    return added
+
+
+def _text(value):
+    return value.decode("utf-8", "replace") or "-"  # Archives packed before the cut was fixed may hold half characters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack, list, extract and seek replays in an archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = commands.add_parser("pack", help="add replay files to an archive")
+    pack_parser.add_argument("archive")
+    pack_parser.add_argument("files", nargs="+")
+    pack_parser.add_argument("--keyframe-interval", type=int, default=DEFAULT_KEYFRAME_INTERVAL)
+
+    list_parser = commands.add_parser("list", help="list archived replays")
+    list_parser.add_argument("archive")
+    list_parser.add_argument("--user")
+    list_parser.add_argument("--mode")
+    list_parser.add_argument("--min-ticks", type=int, default=0)
+
+    extract_parser = commands.add_parser("extract", help="write one replay to a file")
+    extract_parser.add_argument("archive")
+    extract_parser.add_argument("match_id", type=int)
+    extract_parser.add_argument("out")
+
+    seek_parser = commands.add_parser("seek", help="show the match state at a tick")
+    seek_parser.add_argument("archive")
+    seek_parser.add_argument("match_id", type=int)
+    seek_parser.add_argument("tick", type=int)
+
+    args = parser.parse_args()
+    try:
+        if args.command == "pack":
+            added = pack(args.archive, args.files, args.keyframe_interval)
+            print(f"Added {added} replays to {args.archive}")
+            sys.exit(0)
+
+        with ReplayArchive(args.archive) as archive:
+            if args.command == "list":
+                for record in archive.select(args.user, args.mode, args.min_ticks):
+                    print(f"{int(record['match_id']):>20}  {_text(record['user']):<16} {_text(record['mode']):<10} "
+                          f"{_text(record['difficulty']):<15} {int(record['ticks']):>8} ticks  "
+                          f"{record['left_score']} - {record['right_score']}")
+            elif args.command == "extract":
+                record = archive.find(args.match_id)
+                if record is None:
+                    print(f"No match {args.match_id} in {args.archive}")
+                    sys.exit(1)
+                with open(args.out, "wb") as out:
+                    out.write(archive.blob(record))
+            else:
+                replay = archive.replay(args.match_id)
+                start = time.perf_counter()
+                match = replay.seek(args.tick)
+                elapsed = time.perf_counter() - start
+                print(f"Tick {args.tick}: {match.left_score} - {match.right_score}, "
+                      f"ball at {match.ball.center}, effect {match.current_deception_effect} "
+                      f"({elapsed * 1000:.1f} ms)")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,44 @@
+"""
+Mapping from table units to screen pixels.
+
+The simulation works on a table 1 unit high and 16:9 units wide (see
+simulation.py). A TableView stretches that table over the whole screen,
+so positions are converted exactly once, at render time.
+"""
+
+import pygame
+
+from units import TABLE_WIDTH, TABLE_HEIGHT
+
+
+class TableView:
+    """Scales table coordinates to a screen of the given pixel size."""
+
+    def __init__(self, screen_width, screen_height):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.scale_x = screen_width / TABLE_WIDTH
+        self.scale_y = screen_height / TABLE_HEIGHT
+        # Round things (ball radius, decoys) use the smaller scale so they stay round
+        self.scale = min(self.scale_x, self.scale_y)
+
+    def x(self, x):
+        return round(x * self.scale_x)
+
+    def y(self, y):
+        return round(y * self.scale_y)
+
+    def point(self, x, y):
+        return round(x * self.scale_x), round(y * self.scale_y)
+
+    def size(self, length):
+        """Pixel size of a round object length units across."""
+        return max(round(length * self.scale), 1)
+
+    def rect(self, box):
+        """pygame.Rect covering a Box."""
+        left = round(box.x * self.scale_x)
+        top = round(box.y * self.scale_y)
+        return pygame.Rect(left, top,
+                           round((box.x + box.width) * self.scale_x) - left,
+                           round((box.y + box.height) * self.scale_y) - top)
@@ -0,0 +1,102 @@
+"""
+Shared cache of rendered text for the game and login screens.
+
+Menus and the match HUD draw the same few strings every frame, often
+several times over for glow layers and shadows. render_text() hands out
+the surface rendered the first time a (font, text, color, antialias,
+glow) combination was asked for, converted to the screen's format, and
+keeps the most recently used DEFAULT_CAPACITY of them. TEXT_CACHE.hits
+and .misses count lookups, so a steady-state frame should only add hits.
+
+    python text_cache.py   # hit rate and speed-up on a HUD-like frame
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+# Rendered strings kept; a menu frame uses a few dozen
+DEFAULT_CAPACITY = 512
+
+
+class TextCache:
+    """Least recently used cache of font.render() results."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True, glow=None):
+        """
+        font.render(text, antialias, color), cached. glow is the alpha to
+        draw it with, for glow layers and shadows, None for opaque text.
+        Treat the surface as read-only, it is shared.
+        """
+        key = (font, text, color, antialias, glow)
+        surfaces = self.surfaces
+        surface = surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()  # Match the screen format for faster blits
+        if glow is not None:
+            surface.set_alpha(glow)
+        surfaces[key] = surface
+        if len(surfaces) > self.capacity:
+            surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Drop every surface, e.g. after the display mode changed."""
+        self.surfaces.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.surfaces),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# The one cache the game and login screens share
+TEXT_CACHE = TextCache()
+
+
+def render_text(font, text, color, antialias=True, glow=None):
+    """TEXT_CACHE.render(); see TextCache.render()."""
+    return TEXT_CACHE.render(font, text, color, antialias, glow)
+
+
+def benchmark(frames=2000):
+    """Print the cost of a frame's worth of HUD text with and without the cache."""
+    import time
+
+    pygame.init()
+    pygame.display.set_mode((1280, 720))
+    font = pygame.font.SysFont("Arial", 48)
+    lines = [("7", (255, 255, 255)), ("12", (255, 255, 255)), ("Player", (0, 255, 0)),
+             ("Computer", (255, 0, 0)), ("Effect changes in: 5s", (0, 195, 255))]
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for text, color in lines:
+            font.render(text, True, color)
+    uncached = time.perf_counter() - start
+
+    cache = TextCache()
+    start = time.perf_counter()
+    for _ in range(frames):
+        for text, color in lines:
+            cache.render(font, text, color)
+    cached = time.perf_counter() - start
+    print(f"uncached {uncached / frames * 1e6:.1f} us/frame, cached {cached / frames * 1e6:.1f} us/frame, "
+          f"{cache.stats()}")
+
+
+if __name__ == "__main__":
+    benchmark()
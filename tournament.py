@@ -0,0 +1,257 @@
+"""
+Round-robin tournaments between computer strategies on the headless engine.
+
+Every pair of strategies (see ai.STRATEGIES) plays the same number of
+matches, half with each on the left, spread over one worker process per
+core. Each match gets its own seed derived from the tournament seed, the
+pairing and the game number, so any single match can be replayed with
+MatchSimulation on its own. Results are appended to a JSON lines file as
+matches finish; running the same command again skips the matches already
+in it, so an interrupted tournament picks up where it stopped. Matches
+also record ai.params_digest() of the tunables they were played with, so
+results from before a calibration are played again, not mixed in.
+
+    python tournament.py --games 200 --results koh.jsonl
+    python tournament.py --plugin my_bots --strategies Normie MyBot
+
+--plugin imports a module first, which can call ai.register_strategy() to
+enter its own strategies. Matches that reach --max-ticks are draws.
+"""
+import argparse
+import importlib
+import itertools
+import json
+import math
+import os
+import random
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai import STRATEGIES, params_digest
+from simulation import MatchSimulation, TICK_RATE, EVENT_PADDLE_HIT
+
+# Ten minutes of play; long enough for any match that is going to end
+DEFAULT_MAX_TICKS = 10 * 60 * TICK_RATE
+
+# z for 95% confidence intervals
+Z_95 = 1.96
+
+
+def match_seed(seed, left, right, game):
+    """Seed of one tournament match, stable across runs and processes."""
+    return random.Random(f"{seed}/{left}/{right}/{game}").getrandbits(63)
+
+
+# What makes two scheduled matches the same match
+MATCH_FIELDS = ("left", "right", "game", "seed", "mode", "points", "max_ticks", "exact", "params")
+
+
+def schedule(strategies, games, seed, mode="PVC", points=10, max_ticks=DEFAULT_MAX_TICKS, exact=False):
+    """
+    Every match of the tournament as a dict of MATCH_FIELDS. Each pairing
+    plays games matches, alternating who starts on the left.
+    """
+    params = params_digest()
+    matches = []
+    for a, b in itertools.combinations(strategies, 2):
+        for game in range(games):
+            left, right = (a, b) if game % 2 == 0 else (b, a)
+            matches.append({"left": left, "right": right, "game": game,
+                            "seed": match_seed(seed, left, right, game),
+                            "mode": mode, "points": points, "max_ticks": max_ticks, "exact": exact,
+                            "params": params})
+    return matches
+
+
+def match_key(match):
+    return tuple(match.get(field) for field in MATCH_FIELDS)
+
+
+def play_match(match):
+    """Play one scheduled match headless and return its result."""
+    if params_digest() != match["params"]:
+        raise ValueError(f"AI parameters {params_digest()} differ from the scheduled {match['params']}")
+    sim = MatchSimulation(match["mode"], "Normie", seed=match["seed"],
+                          left_ai=match["left"], right_ai=match["right"])
+    sim.win_score = match["points"]
+    max_ticks = match["max_ticks"]
+    exact = match["exact"]
+    step = sim.step
+    advance = sim.advance
+    hits = 0
+    while not sim.game_over and sim.tick < max_ticks:
+        if exact:
+            events = step()
+        else:
+            events = advance(0, max_ticks - sim.tick)[0]
+        if events & EVENT_PADDLE_HIT:
+            hits += 1
+    result = dict(match)
+    result.update(winner=sim.winner, left_score=sim.left_score, right_score=sim.right_score,
+                  ticks=sim.tick, hits=hits)
+    return result
+
+
+def load_results(path):
+    """Results already written to path; lines torn by an interrupted run are skipped."""
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                continue
+    return results
+
+
+def wilson_interval(wins, games, z=Z_95):
+    """Wilson score interval for a win rate of wins out of games."""
+    if games == 0:
+        return 0.0, 1.0
+    rate = wins / games
+    denominator = 1 + z * z / games
+    center = (rate + z * z / (2 * games)) / denominator
+    spread = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(center - spread, 0.0), min(center + spread, 1.0)
+
+
+def summarize(results):
+    """
+    Per strategy and per pairing totals. Draws count as half a win for
+    both sides in win rates.
+    """
+    def new_totals():
+        return {"games": 0, "wins": 0, "draws": 0, "points": 0, "ticks": 0, "hits": 0}
+
+    players = {}
+    pairings = {}
+    for result in results:
+        points = result["left_score"] + result["right_score"]
+        for side, other in (("left", "right"), ("right", "left")):
+            name = result[side]
+            for totals in (players.setdefault(name, new_totals()),
+                           pairings.setdefault((name, result[other]), new_totals())):
+                totals["games"] += 1
+                totals["wins"] += result["winner"] == side
+                totals["draws"] += result["winner"] is None
+                totals["points"] += points
+                totals["ticks"] += result["ticks"]
+                totals["hits"] += result["hits"]
+    return players, pairings
+
+
+def _rates(totals):
+    games = totals["games"]
+    score = totals["wins"] + totals["draws"] / 2
+    low, high = wilson_interval(score, games)
+    points = totals["points"] or 1
+    rally_seconds = totals["ticks"] / points / TICK_RATE
+    return score / games, low, high, rally_seconds, totals["hits"] / points
+
+
+def print_report(results):
+    players, pairings = summarize(results)
+    print(f"{len(results)} matches")
+    print(f"{'strategy':<16} {'games':>6} {'wins':>6} {'draws':>6} {'win rate':>9} {'95% CI':>15} "
+          f"{'rally s':>8} {'hits':>6}")
+    ranked = sorted(players.items(), key=lambda item: -_rates(item[1])[0])
+    for name, totals in ranked:
+        rate, low, high, rally, hits = _rates(totals)
+        print(f"{name:<16} {totals['games']:>6} {totals['wins']:>6} {totals['draws']:>6} {rate:>9.1%} "
+              f"{low:>7.1%}-{high:<7.1%} {rally:>8.2f} {hits:>6.1f}")
+
+    print()
+    print(f"{'strategy':<16} {'vs':<16} {'games':>6} {'win rate':>9} {'95% CI':>15} {'rally s':>8}")
+    for (name, other), totals in sorted(pairings.items()):
+        rate, low, high, rally, _ = _rates(totals)
+        print(f"{name:<16} {other:<16} {totals['games']:>6} {rate:>9.1%} {low:>7.1%}-{high:<7.1%} {rally:>8.2f}")
+
+
+def _load_plugins(plugins):
+    for plugin in plugins:
+        importlib.import_module(plugin)
+
+
+def _init_worker(plugins):
+    # Ctrl+C is for the parent, which stops handing out matches
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _load_plugins(plugins)
+
+
+def run_tournament(strategies, games, results_path, seed=0, mode="PVC", points=10,
+                   max_ticks=DEFAULT_MAX_TICKS, exact=False, workers=None, plugins=()):
+    """
+    Play every scheduled match not yet in results_path and append each
+    result to it as it finishes. Returns all results, old and new.
+    """
+    for name in strategies:
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown AI strategy: {name}")
+
+    # Only results of this schedule count, in case the file holds others
+    scheduled = schedule(strategies, games, seed, mode, points, max_ticks, exact)
+    keys = {match_key(match) for match in scheduled}
+    results = [result for result in load_results(results_path) if match_key(result) in keys]
+    done = {match_key(result) for result in results}
+    pending = [match for match in scheduled if match_key(match) not in done]
+    if not pending:
+        return results
+    print(f"{len(pending)} matches to play, {len(done)} already done")
+
+    # Start on a fresh line if the last run died halfway through one
+    if os.path.exists(results_path) and os.path.getsize(results_path):
+        with open(results_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+        if torn:
+            with open(results_path, "a") as out:
+                out.write("\n")
+
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(workers or os.cpu_count(), initializer=_init_worker, initargs=(tuple(plugins),))
+    try:
+        with open(results_path, "a") as out:
+            futures = [pool.submit(play_match, match) for match in pending]
+            for finished, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                results.append(result)
+                # One line per match, flushed so an interrupted run loses nothing finished
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                if finished % 100 == 0 or finished == len(futures):
+                    elapsed = time.perf_counter() - start
+                    print(f"{finished}/{len(futures)} matches, {finished / elapsed:.1f}/s")
+    except KeyboardInterrupt:
+        print("Interrupted; run again to resume")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round-robin tournament between AI strategies")
+    parser.add_argument("--strategies", nargs="+", help="names in ai.STRATEGIES (default: all but Idle)")
+    parser.add_argument("--games", type=int, default=100, help="matches per pairing")
+    parser.add_argument("--results", default="tournament.jsonl", help="JSON lines file to append to and resume from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=("PVC", "DECEPTION"), default="PVC",
+                        help="DECEPTION plays with the deception effects")
+    parser.add_argument("--points", type=int, default=10, help="points needed to win a match")
+    parser.add_argument("--max-ticks", type=int, default=DEFAULT_MAX_TICKS)
+    parser.add_argument("--exact", action="store_true", help="step every tick instead of fast-forwarding")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--plugin", action="append", default=[], help="module that registers strategies")
+    parser.add_argument("--report", action="store_true", help="only print the report for --results")
+    args = parser.parse_args()
+
+    _load_plugins(args.plugin)
+    if args.report:
+        results = load_results(args.results)
+    else:
+        strategies = args.strategies or [name for name in STRATEGIES if name != "Idle"]
+        results = run_tournament(strategies, args.games, args.results, args.seed, args.mode, args.points,
+                                 args.max_ticks, args.exact, args.workers, args.plugin)
+    print_report(results)
@@ -0,0 +1,173 @@
+"""
+Reinforcement learning environments on the headless engine.
+
+PongEnv wraps one MatchSimulation and VectorPongEnv steps many matches at
+once on BatchSimulation; both follow the Gymnasium API without needing
+it installed. The agent plays the left paddle against a computer player
+on the right:
+
+    reset(seed=None)  -> observation, info
+    step(action)      -> observation, reward, terminated, truncated, info
+
+An action is STAY, UP or DOWN. The observation is a float32 vector of
+OBSERVATION_SIZE: ball x and y, ball dx and dy, then the agent's and the
+opponent's paddle tops. Positions are fractions of the table and speeds
+fractions of the maximum ball speed. The reward is +1 for every point
+the agent wins and -1 for every point it loses. An episode is one match
+and is truncated after max_steps.
+
+Nothing here opens a window or touches pygame while stepping.
+
+    python training_env.py   # steps per second, single and vectorized
+"""
+import numpy as np
+
+from batch_simulation import BatchSimulation
+from simulation import (MatchSimulation, INPUT_LEFT_UP, INPUT_LEFT_DOWN, EVENT_LEFT_SCORED,
+                        EVENT_RIGHT_SCORED, table_constants)
+
+# Actions
+STAY = 0
+UP = 1
+DOWN = 2
+ACTION_COUNT = 3
+
+# Input bits for each action
+ACTION_INPUTS = (0, INPUT_LEFT_UP, INPUT_LEFT_DOWN)
+
+OBSERVATION_SIZE = 6
+
+# Episode length cap in ticks; five minutes of play
+DEFAULT_MAX_STEPS = 5 * 60 * 60
+
+_CONSTANTS = table_constants()
+# Divisors turning the observed values into table fractions
+OBSERVATION_SCALE = np.array([
+    _CONSTANTS["width"], _CONSTANTS["height"],
+    _CONSTANTS["max_ball_speed"], _CONSTANTS["max_ball_speed"],
+    _CONSTANTS["height"], _CONSTANTS["height"],
+])
+_OBSERVATION_FACTORS = (1 / OBSERVATION_SCALE).astype(np.float32)
+
+
+class PongEnv:
+    """One match, agent on the left against the difficulty's AI."""
+
+    action_count = ACTION_COUNT
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, difficulty="Knight of Hell", max_steps=DEFAULT_MAX_STEPS):
+        self.difficulty = difficulty
+        self.max_steps = max_steps
+        self.sim = None
+
+    def _observation(self):
+        sim = self.sim
+        ball = sim.ball
+        obs = np.array((ball.x, ball.y, sim.ball_dx, sim.ball_dy, sim.left_paddle.y, sim.right_paddle.y),
+                       dtype=np.float32)
+        obs *= _OBSERVATION_FACTORS
+        return obs
+
+    def reset(self, seed=None):
+        """Start a new match; the same seed plays out the same against the same actions."""
+        self.sim = MatchSimulation("PVC", self.difficulty, seed=seed)
+        return self._observation(), {"seed": self.sim.seed}
+
+    def step(self, action):
+        sim = self.sim
+        events = sim.step(ACTION_INPUTS[action])
+        reward = 0.0
+        if events & EVENT_LEFT_SCORED:
+            reward += 1.0
+        if events & EVENT_RIGHT_SCORED:
+            reward -= 1.0
+        terminated = sim.game_over
+        truncated = not terminated and sim.tick >= self.max_steps
+        info = {"winner": sim.winner} if terminated else {}
+        return self._observation(), reward, terminated, truncated, info
+
+
+class VectorPongEnv:
+    """
+    count matches stepped together. Takes an array of count actions and
+    returns arrays; a match that ends is reset in the same call, so its
+    observation is already the first of the next episode, as in
+    Gymnasium's autoreset vector envs.
+    """
+
+    action_count = ACTION_COUNT
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, count, difficulty="Knight of Hell", max_steps=DEFAULT_MAX_STEPS):
+        self.count = count
+        self.difficulty = difficulty
+        self.max_steps = max_steps
+        self.batch = None
+        self.episode_steps = np.zeros(count, dtype=np.int64)
+        self.observations = np.empty((count, OBSERVATION_SIZE))
+        self.action_inputs = np.array(ACTION_INPUTS)
+
+    def _observation(self):
+        batch = self.batch
+        obs = self.observations
+        obs[:, 0] = batch.ball_x
+        obs[:, 1] = batch.ball_y
+        obs[:, 2] = batch.ball_dx
+        obs[:, 3] = batch.ball_dy
+        obs[:, 4] = batch.left_y
+        obs[:, 5] = batch.right_y
+        obs /= OBSERVATION_SCALE
+        return obs.astype(np.float32)
+
+    def reset(self, seed=None):
+        self.batch = BatchSimulation(self.count, self.difficulty, "Idle", seed=seed)
+        self.episode_steps[:] = 0
+        return self._observation(), {}
+
+    def step(self, actions):
+        batch = self.batch
+        left_points = batch.left_points.copy()
+        right_points = batch.right_points.copy()
+        left_wins = batch.left_wins.copy()
+        right_wins = batch.right_wins.copy()
+
+        batch.step(self.action_inputs[actions])
+        self.episode_steps += 1
+
+        reward = (batch.left_points - left_points) - (batch.right_points - right_points)
+        terminated = (batch.left_wins != left_wins) | (batch.right_wins != right_wins)
+        truncated = ~terminated & (self.episode_steps >= self.max_steps)
+        ended = np.flatnonzero(terminated | truncated)
+        if len(ended):
+            batch.reset(ended[truncated[ended]])
+            self.episode_steps[ended] = 0
+        return self._observation(), reward.astype(np.float32), terminated, truncated, {}
+
+
+def benchmark(steps=200000, count=4096):
+    """Print environment steps per second with random actions."""
+    import time
+
+    rng = np.random.default_rng(0)
+    env = PongEnv()
+    env.reset(seed=0)
+    actions = rng.integers(0, ACTION_COUNT, steps)
+    start = time.perf_counter()
+    for action in actions:
+        if any(env.step(action)[2:4]):
+            env.reset()
+    print(f"PongEnv {steps / (time.perf_counter() - start):>14.0f} steps/s")
+
+    env = VectorPongEnv(count)
+    env.reset(seed=0)
+    ticks = max(steps // count, 10)
+    actions = rng.integers(0, ACTION_COUNT, (ticks, count))
+    start = time.perf_counter()
+    for tick_actions in actions:
+        env.step(tick_actions)
+    print(f"VectorPongEnv {ticks * count / (time.perf_counter() - start):>8.0f} steps/s ({count} matches)")
+
+
+if __name__ == "__main__":
+    benchmark()
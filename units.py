@@ -0,0 +1,39 @@
+"""
+Table units, shared by the engine, the AI and the renderers.
+
+The table is 1 unit high and 16:9 units wide whatever the screen; see
+simulation.py for how the match uses it and table_view.py for how it is
+drawn. table_constants() sizes the paddles and ball and sets the speeds
+on it.
+"""
+
+# Table size in table units; renderers scale this to the screen
+TABLE_WIDTH = 16 / 9
+TABLE_HEIGHT = 1.0
+
+# One pixel of the 1920x1080 table the game was tuned on, for the few
+# tunables that were written in pixels (paddle insets, AI dead zones, ...)
+PIXEL = TABLE_HEIGHT / 1080
+
+
+def table_constants():
+    """
+    Paddle, ball and speed parameters in table units.
+    Every engine derives its tunables from here so they cannot drift apart.
+    """
+    width, height = TABLE_WIDTH, TABLE_HEIGHT
+    return {
+        "width": width,
+        "height": height,
+        "paddle_width": width * 0.01,  # 1% of table width
+        "paddle_height": height * 0.15,  # 15% of table height
+        "ball_size": min(width, height) * 0.025,  # 2.5% of smaller dimension
+        "paddle_speed": height * 0.01,  # 1% of table height
+        "ball_speed_x": width * 0.005,  # 0.5% of table width
+        "ball_speed_y": height * 0.01,  # 1% of table height
+        # Maximum ball speed to prevent instability
+        "max_ball_speed": min(width, height) * 0.02,  # Cap at 2% of table dimension
+        # Paddle columns, inset from the table edges
+        "left_paddle_x": 30 * PIXEL,
+        "right_paddle_x": width - 40 * PIXEL,
+    }
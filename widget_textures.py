@@ -0,0 +1,240 @@
+"""
+Prebuilt textures for the login screen widgets.
+
+The input boxes, buttons, section panels and score tiles of login.py are
+gradients and glows that used to be drawn a row or a ring at a time with
+pygame.draw every frame. Here each one is built once with NumPy, written
+straight into the surface's pixel and alpha arrays through
+pygame.surfarray, and kept in a small LRU cache keyed by size, colours
+and state (idle, hover, pressed, active, error, ...: whatever changes the
+look), so drawing a widget is a blit or two.
+
+Outlines and highlights are still drawn with pygame.draw, once, while a
+texture is built. Where the old code drew translucent colours straight
+onto the screen, which ignores their alpha, they are drawn opaque here
+so the widgets look the same.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+# Textures kept; input boxes grow with their text, so sizes come and go
+DEFAULT_CAPACITY = 256
+
+
+class TextureCache:
+    """Least recently used cache of built textures."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.textures = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build, *args):
+        """The texture for key, calling build(*args) the first time."""
+        textures = self.textures
+        texture = textures.get(key)
+        if texture is not None:
+            self.hits += 1
+            textures.move_to_end(key)
+            return texture
+
+        self.misses += 1
+        texture = build(*args)
+        if pygame.display.get_surface() is not None:
+            texture = texture.convert_alpha()  # Match the screen format for faster blits
+        textures[key] = texture
+        if len(textures) > self.capacity:
+            textures.popitem(last=False)
+        return texture
+
+    def clear(self):
+        self.textures.clear()
+
+
+# The one cache the login widgets share
+TEXTURES = TextureCache()
+
+
+def _surface(width, height, rgb, alpha):
+    """
+    SRCALPHA surface of the given colour and alpha; either can be a single
+    value or an array indexed [x, y] like surfarray, broadcast to the size.
+    """
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    if width and height:
+        pixels = pygame.surfarray.pixels3d(surface)
+        pixels[...] = np.broadcast_to(rgb, pixels.shape)
+        del pixels
+        alphas = pygame.surfarray.pixels_alpha(surface)
+        alphas[...] = np.broadcast_to(alpha, alphas.shape)
+        del alphas
+    return surface
+
+
+def _row_alpha(height, top, slope, lowest):
+    """Per-row alpha fading from top by slope a row, never below lowest; shape (1, height)."""
+    rows = np.arange(height)
+    return np.maximum(top - (rows * slope).astype(np.int64), lowest)[np.newaxis, :]
+
+
+def _rounded_rows(width, height, radius):
+    """
+    Which pixels the row-by-row fill of Button.draw() covered: the middle
+    of every row, plus the rounded ends on the top and bottom radius rows.
+    Indexed [x, y].
+    """
+    xs = np.arange(width)[:, np.newaxis]
+    ys = np.arange(height)[np.newaxis, :]
+    mask = np.broadcast_to((xs >= radius) & (xs <= width - radius), (width, height)).copy()
+    with np.errstate(invalid="ignore"):
+        top = ys < radius
+        dx_top = np.maximum((radius - np.sqrt(radius ** 2 - (ys - radius) ** 2)).astype(np.int64), 0)
+        bottom = ys > height - radius
+        bottom_y = height - ys - 1
+        dx_bottom = np.maximum((radius - np.sqrt(radius ** 2 - (bottom_y - radius) ** 2)).astype(np.int64), 0)
+    for rows, dx in ((top, dx_top), (bottom, dx_bottom)):
+        ends = ((xs >= dx) & (xs <= radius)) | ((xs >= width - radius) & (xs <= width - dx))
+        mask |= rows & ends
+    return mask
+
+
+def input_box(width, height, color, border_color, border_thickness):
+    """Input box body with its border; border_color and thickness carry the state."""
+    key = ("input_box", width, height, color, border_color, border_thickness)
+    return TEXTURES.get(key, _build_input_box, width, height, color, border_color, border_thickness)
+
+
+def _build_input_box(width, height, color, border_color, border_thickness):
+    # Fading rows, over a solid rounded box in the same colour
+    surface = _surface(width, height, color, _row_alpha(height, 220, 0.5, 180))
+    rect = surface.get_rect()
+    pygame.draw.rect(surface, (*color, 255), rect, border_radius=4)
+    pygame.draw.rect(surface, border_color, rect, border_thickness, border_radius=4)
+    # Subtle inner highlight
+    pygame.draw.rect(surface, (255, 255, 255), rect.inflate(-4, -4), 1, border_radius=3)
+    return surface
+
+
+def button(width, height, color, fill_color, pill_shaped, has_dot):
+    """
+    Pill or rounded rectangle button; fill_color is the colour for its
+    state (idle, hover or pressed) and color the border's.
+    """
+    key = ("button", width, height, color, fill_color, pill_shaped, has_dot)
+    return TEXTURES.get(key, _build_button, width, height, color, fill_color, pill_shaped, has_dot)
+
+
+def _build_button(width, height, color, fill_color, pill_shaped, has_dot):
+    radius = height // 2 if pill_shaped else 5
+    alpha = np.where(_rounded_rows(width, height, radius), _row_alpha(height, 220, 0.8, 160), 0)
+    surface = _surface(width, height, fill_color, alpha)
+    rect = surface.get_rect()
+
+    pygame.draw.rect(surface, color, rect, 2, border_radius=radius)
+    if pill_shaped:
+        # Inner highlight for depth
+        pygame.draw.rect(surface, (255, 255, 255, 30), rect.inflate(-4, -4), 1, border_radius=radius - 2)
+        # Bottom shadow for 3D effect
+        pygame.draw.rect(surface, (0, 0, 0, 60), pygame.Rect(2, height - 3, width - 4, 2), 0, border_radius=2)
+        if has_dot:
+            dot = (15, height // 2)
+            for r in range(5, 0, -1):
+                pygame.draw.circle(surface, (*color, 220 - (5 - r) * 40), dot, r)
+            pygame.draw.circle(surface, (255, 255, 255, 100), (dot[0] - 1, dot[1] - 1), 2)
+    else:
+        pygame.draw.rect(surface, (255, 255, 255, 30), rect.inflate(-4, -4), 1, border_radius=radius - 1)
+    return surface
+
+
+def circle_button(width, height, color, hover):
+    """Round button with a radial gradient, glowing while hovered."""
+    key = ("circle_button", width, height, color, hover)
+    return TEXTURES.get(key, _build_circle_button, width, height, color, hover)
+
+
+def _build_circle_button(width, height, color, hover):
+    radius = min(width, height) // 2
+    center = (width // 2, height // 2)
+
+    # Filled circles fading outwards from the centre; pygame's circle
+    # rasterization has no closed form to do this as an array, but it is
+    # only run once per texture
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    for r in range(radius, 0, -1):
+        pygame.draw.circle(surface, (*color, max(180 - int((radius - r) * 1.5), 0)), center, r)
+
+    if hover:
+        for r in range(radius + 3, radius, -1):
+            pygame.draw.circle(surface, (*color, max(40 - (r - radius) * 10, 0)), center, r)
+    pygame.draw.circle(surface, (*color, 255), center, radius, 2)
+    pygame.draw.circle(surface, (255, 255, 255, 120), center, radius, 1)
+    pygame.draw.circle(surface, (255, 255, 255, 30), (center[0] - 1, center[1] - 1), radius - 2, 1)
+    return surface
+
+
+def section_panel(width, height, color, border_color):
+    """Section background with inset shadow, border and highlight."""
+    key = ("section_panel", width, height, color, border_color)
+    return TEXTURES.get(key, _build_section_panel, width, height, color, border_color)
+
+
+def _build_section_panel(width, height, color, border_color):
+    surface = _surface(width, height, color, _row_alpha(height, 220, 0.5, 0))
+    rect = surface.get_rect()
+    pygame.draw.rect(surface, (*color, 255), rect, border_radius=3)
+    # Inset shadow
+    for i in range(2):
+        pygame.draw.rect(surface, (0, 0, 0), rect.inflate(-(i * 2), -(i * 2)), 1, border_radius=3)
+    pygame.draw.rect(surface, border_color, rect, 2, border_radius=3)
+    pygame.draw.rect(surface, border_color, rect.inflate(-4, -4), 1, border_radius=2)
+    return surface
+
+
+def divider(width, color):
+    """Two pixel line fading in from the ends to full alpha in the middle."""
+    return TEXTURES.get(("divider", width, color), _build_divider, width, color)
+
+
+def _build_divider(width, color):
+    position = np.arange(width) / width
+    alpha = np.where(position < 0.5, position * 510, (1 - position) * 510).astype(np.int64)
+    return _surface(width, 2, color, np.minimum(alpha, 255)[:, np.newaxis])
+
+
+# Room around a score tile for its glow
+TILE_PAD = 3
+
+
+def score_tile(size, base_color, border_color, has_glow):
+    """
+    Score tile: vertical gradient, bottom shadow, top highlight, border and
+    for the top three a glow, TILE_PAD pixels around the tile.
+    """
+    key = ("score_tile", size, base_color, border_color, has_glow)
+    return TEXTURES.get(key, _build_score_tile, size, base_color, border_color, has_glow)
+
+
+def _build_score_tile(size, base_color, border_color, has_glow):
+    pad = TILE_PAD
+    surface = pygame.Surface((size + 2 * pad, size + 2 * pad), pygame.SRCALPHA)
+
+    # Top to bottom gradient down to 80% brightness
+    factor = 1.0 - (np.arange(size) / size * 0.2)
+    rows = (np.asarray(base_color, dtype=np.float64)[np.newaxis, :] * factor[:, np.newaxis]).astype(np.uint8)
+    surface.blit(_surface(size, size, rows[np.newaxis, :, :], 255), (pad, pad))
+
+    # Shadow along the bottom, highlight along the top
+    shadow_alpha = np.maximum(40 - np.arange(4) * 10, 0)[np.newaxis, :]
+    surface.blit(_surface(size - 4, 4, 0, shadow_alpha), (pad + 2, pad + size - 4))
+    surface.blit(_surface(size - 4, 2, 255, 30), (pad + 2, pad + 2))
+
+    tile = pygame.Rect(pad, pad, size, size)
+    pygame.draw.rect(surface, border_color, tile, 2, border_radius=8)
+    if has_glow:
+        for i in range(1, 3):
+            pygame.draw.rect(surface, border_color, tile.inflate(i * 2, i * 2), 1, border_radius=8 + i)
+    return surface